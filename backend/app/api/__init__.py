@@ -7,6 +7,8 @@ from app.api import (
     menus,
     permisos,
     roles,
+    stream,
+    typeahead,
     usuarios,
 )
 from fastapi import APIRouter
@@ -32,3 +34,9 @@ api_router.include_router(
 api_router.include_router(
     interfaces.router, prefix="/monitoreo/interfaces", tags=["monitoreo-interfaces"]
 )
+api_router.include_router(
+    typeahead.router, prefix="/monitoreo/typeahead", tags=["monitoreo-typeahead"]
+)
+api_router.include_router(
+    stream.router, prefix="/monitoreo/stream", tags=["monitoreo-stream"]
+)
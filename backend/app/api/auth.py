@@ -1,32 +1,54 @@
 # backend/app/api/auth.py
 from datetime import timedelta
+from typing import Optional
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    verificar_clave,
     verify_token,
 )
 from app.models.usuario import Usuario
 from app.schemas.token import Token
 from app.schemas.usuario import UsuarioLogin, UsuarioResponse, UsuarioCompleto
+from app.services.usuario_service import UsuarioService
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
+async def _autenticar(db: AsyncSession, email: str, clave: str) -> Optional[Usuario]:
+    """Usuario con esas credenciales, o None
+
+    bcrypt corre en el pool de hilos de security. Si el hash usa una
+    política anterior se reemplaza por uno con el costo actual.
+    """
+    usuario = await db.run_sync(UsuarioService.get_by_email, email)
+    valida, nuevo_hash = await verificar_clave(
+        clave, str(usuario.clave_hash) if usuario else None
+    )
+    if not valida:
+        return None
+
+    if nuevo_hash:
+        usuario.clave_hash = nuevo_hash
+        await db.commit()
+
+    return usuario
+
+
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Buscar usuario por email
-    usuario = db.query(Usuario).filter(Usuario.email == form_data.username).first()
+    usuario = await _autenticar(db, form_data.username, form_data.password)
 
-    if not usuario or not verify_password(form_data.password, str(usuario.clave_hash)):
+    if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -50,11 +72,13 @@ async def login(
 
 
 @router.post("/login-form", response_model=Token)
-async def login_form(usuario_data: UsuarioLogin, db: Session = Depends(get_db)):
+async def login_form(
+    usuario_data: UsuarioLogin, db: AsyncSession = Depends(get_async_db)
+):
     # Versión alternativa que recibe JSON en lugar de form-data
-    usuario = db.query(Usuario).filter(Usuario.email == usuario_data.email).first()
+    usuario = await _autenticar(db, usuario_data.email, usuario_data.clave)
 
-    if not usuario or not verify_password(usuario_data.clave, str(usuario.clave_hash)):
+    if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
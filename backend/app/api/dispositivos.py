@@ -1,26 +1,58 @@
 # backend/app/api/dispositivos.py
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.etag import (
+    calcular_etag,
+    coincide_etag,
+    no_modificado,
+    respuesta_con_etag,
+)
+from app.core.mapa import ZOOM_MAXIMO, parsear_bbox
+from app.core.pagination import datos_paginacion
+from app.core.query_stats import medir_consultas
 from app.core.security import get_current_user
 from app.models import Usuario
 from app.schemas.dispositivos import (
+    CambiosDispositivosResponse,
     DispositivosDetallado,
+    DispositivosDetalleCompleto,
     DispositivosEstadisticas,
     DispositivosFiltros,
     DispositivosListResponse,
+    MapaCluster,
+    MapaDispositivo,
+    MapaResponse,
 )
+from app.schemas.interfaces import InterfacesDetalladoLista
+from app.services.cambios_service import CambiosService, CursorVencido
 from app.services.dispositivos_service import DispositivosService
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
 
+def _detallado(info: dict) -> DispositivosDetallado:
+    """Dispositivo + resumen de interfaces de get_with_interfaces_count"""
+    dispositivo_dict = info["dispositivo"].__dict__.copy()
+    dispositivo_dict.update({k: v for k, v in info.items() if k != "dispositivo"})
+    return DispositivosDetallado(**dispositivo_dict)
+
+
 @router.get("/", response_model=DispositivosListResponse)
 async def get_dispositivos(
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
     operador: Optional[str] = Query(None, description="Filtrar por operador"),
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     hub: Optional[str] = Query(None, description="Filtrar por hub"),
@@ -33,7 +65,18 @@ async def get_dispositivos(
     con_geolocalizacion: bool = Query(
         False, description="Solo dispositivos con geolocalización"
     ),
-    db: Session = Depends(get_db),
+    min_interfaces_down: Optional[int] = Query(
+        None, ge=0, description="Mínimo de interfaces caídas"
+    ),
+    min_utilizacion: Optional[float] = Query(
+        None, ge=0, le=100, description="Utilización máxima de interfaces (%) mínima"
+    ),
+    orden: str = Query(
+        "nombre",
+        pattern="^(nombre|interfaces_down|interfaces|utilizacion)$",
+        description="Orden: nombre, interfaces_down, interfaces o utilizacion",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener lista de dispositivos con filtros y paginación"""
@@ -48,54 +91,80 @@ async def get_dispositivos(
         devstatus=devstatus,
         solo_activos=solo_activos,
         con_geolocalizacion=con_geolocalizacion,
+        min_interfaces_down=min_interfaces_down,
+        min_utilizacion=min_utilizacion,
     )
 
     # Obtener dispositivos con información adicional
-    dispositivos_info, total = DispositivosService.get_with_interfaces_count(
-        db=db, skip=skip, limit=limit, filtros=filtros
-    )
+    try:
+        dispositivos_info, conteo, siguiente_cursor = await db.run_sync(
+            DispositivosService.get_with_interfaces_count,
+            skip=skip,
+            limit=limit,
+            filtros=filtros,
+            cursor=cursor,
+            modo_total=modo_total,
+            orden=orden,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    total_paginas = (total + limit - 1) // limit
-
-    # Convertir a response detallado
-    dispositivos_detallados = []
-    for info in dispositivos_info:
-        dispositivo = info["dispositivo"]
-        dispositivo_dict = dispositivo.__dict__.copy()
-        dispositivo_dict["interfaces_count"] = info["interfaces_count"]
-        dispositivo_dict["interfaces_activas"] = info["interfaces_activas"]
-        dispositivos_detallados.append(DispositivosDetallado(**dispositivo_dict))
+    dispositivos_detallados = [_detallado(info) for info in dispositivos_info]
 
     return DispositivosListResponse(
         dispositivos=dispositivos_detallados,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+        **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
         filtros_aplicados=filtros,
     )
 
 
+def _estadisticas_con_tiempos(db: Session):
+    with medir_consultas(db) as reporte:
+        estadisticas = DispositivosService.get_estadisticas(db)
+    return estadisticas, reporte
+
+
 @router.get("/estadisticas", response_model=DispositivosEstadisticas)
 async def get_estadisticas_dispositivos(
-    db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)
+    incluir_tiempos: bool = Query(
+        False, description="Incluir reporte de consultas y tiempos"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener estadísticas generales de dispositivos"""
 
-    estadisticas = DispositivosService.get_estadisticas(db)
+    if incluir_tiempos:
+        estadisticas, reporte = await db.run_sync(_estadisticas_con_tiempos)
+        estadisticas["tiempos_consulta"] = reporte.to_dict()
+    else:
+        # Sin listeners de medición en la conexión
+        estadisticas = await db.run_sync(DispositivosService.get_estadisticas)
 
     return DispositivosEstadisticas(**estadisticas)
 
 
 @router.get("/valores-filtros")
 async def get_valores_filtros(
-    db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
 ):
-    """Obtener valores únicos para filtros de dispositivos"""
+    """Obtener valores únicos para filtros de dispositivos
 
-    valores = DispositivosService.get_valores_filtros(db)
+    Responde con ETag; si el cliente envía If-None-Match con la versión
+    vigente se devuelve 304 sin cuerpo.
+    """
 
-    return valores
+    version, valores = await db.run_sync(
+        DispositivosService.get_valores_filtros_versionados
+    )
+
+    etag = calcular_etag("valores-filtros", version)
+    if coincide_etag(request, etag):
+        return no_modificado(etag)
+
+    return respuesta_con_etag(valores, etag)
 
 
 @router.get("/buscar", response_model=DispositivosListResponse)
@@ -103,16 +172,36 @@ async def buscar_dispositivos(
     q: str = Query(..., min_length=2, description="Término de búsqueda"),
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    orden: str = Query(
+        "nombre",
+        pattern="^(nombre|relevancia)$",
+        description="Orden: nombre o relevancia (similitud con el término)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Buscar dispositivos por término general"""
 
-    dispositivos, total = DispositivosService.buscar(
-        db=db, termino=q, skip=skip, limit=limit
-    )
-
-    total_paginas = (total + limit - 1) // limit
+    try:
+        dispositivos, conteo, siguiente_cursor = await db.run_sync(
+            DispositivosService.buscar,
+            termino=q,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+            orden=orden,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     # Convertir a response detallado
     dispositivos_detallados = [
@@ -121,53 +210,61 @@ async def buscar_dispositivos(
 
     return DispositivosListResponse(
         dispositivos=dispositivos_detallados,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+        **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
     )
 
 
-@router.get("/{devid}", response_model=DispositivosDetallado)
+@router.get("/cambios", response_model=CambiosDispositivosResponse)
+async def get_cambios_dispositivos(
+    cursor: Optional[str] = Query(
+        None, description="siguiente_cursor de la consulta anterior (vacío: todo)"
+    ),
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de filas por tipo"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Dispositivos modificados y eliminados desde el cursor
+
+    Sin cursor devuelve todos los dispositivos (carga inicial, paginada con
+    `hay_mas`). Un 410 indica que el cursor venció: se debe volver a cargar
+    sin cursor.
+    """
+
+    try:
+        cambios = await db.run_sync(
+            CambiosService.get_cambios, "dispositivos", cursor=cursor, limit=limit
+        )
+    except CursorVencido as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return CambiosDispositivosResponse(**cambios)
+
+
+@router.get("/{devid}", response_model=DispositivosDetalleCompleto)
 async def get_dispositivo(
     devid: int,
-    db: Session = Depends(get_db),
+    top_n: int = Query(5, ge=0, le=50, description="Interfaces más utilizadas"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
-    """Obtener dispositivo específico por ID"""
+    """Obtener dispositivo específico por ID con el resumen de sus interfaces"""
 
-    dispositivo = DispositivosService.get_by_id(db, devid)
+    detalle = await db.run_sync(DispositivosService.get_detalle, devid, top_n)
 
-    if not dispositivo:
+    if not detalle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Dispositivo no encontrado"
         )
 
-    # Obtener información adicional del dispositivo
-    dispositivos_info, _ = DispositivosService.get_with_interfaces_count(
-        db=db,
-        skip=0,
-        limit=1,
-        filtros=DispositivosFiltros(
-            devstatus=None
-        ),  # Sin filtros para obtener el específico
+    dispositivo_dict = detalle.pop("dispositivo").__dict__.copy()
+    dispositivo_dict.update(detalle)
+    dispositivo_dict["top_utilizadas"] = InterfacesDetalladoLista.validate_python(
+        detalle["top_utilizadas"], from_attributes=True
     )
 
-    # Buscar la info del dispositivo específico
-    dispositivo_info = None
-    for info in dispositivos_info:
-        if info["dispositivo"].devid == devid:
-            dispositivo_info = info
-            break
-
-    if dispositivo_info:
-        dispositivo_dict = dispositivo_info["dispositivo"].__dict__.copy()
-        dispositivo_dict["interfaces_count"] = dispositivo_info["interfaces_count"]
-        dispositivo_dict["interfaces_activas"] = dispositivo_info["interfaces_activas"]
-        return DispositivosDetallado(**dispositivo_dict)
-
-    # Fallback sin información adicional
-    return DispositivosDetallado(**dispositivo.__dict__)
+    return DispositivosDetalleCompleto(**dispositivo_dict)
 
 
 @router.get("/zona/{zona}", response_model=DispositivosListResponse)
@@ -175,54 +272,104 @@ async def get_dispositivos_por_zona(
     zona: str,
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
     solo_activos: bool = Query(False, description="Solo dispositivos activos"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener dispositivos de una zona específica"""
 
     filtros = DispositivosFiltros(zona=zona, solo_activos=solo_activos)
 
-    dispositivos_info, total = DispositivosService.get_with_interfaces_count(
-        db=db, skip=skip, limit=limit, filtros=filtros
-    )
-
-    total_paginas = (total + limit - 1) // limit
+    try:
+        dispositivos_info, conteo, siguiente_cursor = await db.run_sync(
+            DispositivosService.get_with_interfaces_count,
+            skip=skip,
+            limit=limit,
+            filtros=filtros,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    dispositivos_detallados = []
-    for info in dispositivos_info:
-        dispositivo = info["dispositivo"]
-        dispositivo_dict = dispositivo.__dict__.copy()
-        dispositivo_dict["interfaces_count"] = info["interfaces_count"]
-        dispositivo_dict["interfaces_activas"] = info["interfaces_activas"]
-        dispositivos_detallados.append(DispositivosDetallado(**dispositivo_dict))
+    dispositivos_detallados = [_detallado(info) for info in dispositivos_info]
 
     return DispositivosListResponse(
         dispositivos=dispositivos_detallados,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+        **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
         filtros_aplicados=filtros,
     )
 
 
-@router.get("/geolocalizados/mapa")
+@router.get("/geolocalizados/clusters", response_model=MapaResponse)
+async def get_dispositivos_clusters(
+    bbox: str = Query(
+        ..., description="Vista del mapa: oeste,sur,este,norte (lon/lat en grados)"
+    ),
+    zoom: int = Query(..., ge=0, le=ZOOM_MAXIMO, description="Nivel de zoom del mapa"),
+    zona: Optional[str] = Query(None, description="Filtrar por zona"),
+    area: Optional[str] = Query(None, description="Filtrar por área"),
+    solo_activos: bool = Query(False, description="Solo dispositivos activos"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Dispositivos geolocalizados de la vista del mapa
+
+    Con zoom bajo devuelve agrupaciones por celda con conteos por estado; con
+    zoom alto, los dispositivos individuales.
+    """
+
+    try:
+        vista = parsear_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filtros = DispositivosFiltros(zona=zona, area=area, solo_activos=solo_activos)
+    mapa = await db.run_sync(DispositivosService.get_mapa, vista, zoom, filtros)
+
+    return MapaResponse(
+        modo=mapa["modo"],
+        zoom=zoom,
+        total=mapa["total"],
+        truncado=mapa["truncado"],
+        tamano_celda=mapa.get("tamano_celda"),
+        clusters=[MapaCluster(**cluster) for cluster in mapa["clusters"]],
+        dispositivos=[
+            MapaDispositivo.model_validate(fila) for fila in mapa["dispositivos"]
+        ],
+    )
+
+
+@router.get("/geolocalizados/mapa", deprecated=True)
 async def get_dispositivos_mapa(
     solo_activos: bool = Query(False, description="Solo dispositivos activos"),
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
-    """Obtener dispositivos con geolocalización para visualización en mapa"""
+    """Obtener dispositivos con geolocalización para visualización en mapa
+
+    Obsoleto: trunca en 10000 dispositivos; usar /geolocalizados/clusters.
+    """
 
     filtros = DispositivosFiltros(
         zona=zona, solo_activos=solo_activos, con_geolocalizacion=True
     )
 
     # Obtener todos los dispositivos geolocalizados (sin paginación para mapa)
-    dispositivos, total = DispositivosService.get_all(
-        db=db, skip=0, limit=10000, filtros=filtros  # Límite alto para mapa
+    dispositivos, total = await db.run_sync(
+        DispositivosService.get_all,
+        skip=0,
+        limit=10000,  # Límite alto para mapa
+        filtros=filtros,
     )
 
     # Formatear para mapa
@@ -1,26 +1,80 @@
 # backend/app/api/interfaces.py
-from typing import Optional
+import io
+from datetime import datetime
+from typing import List, Optional, Sequence
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.pagination import datos_paginacion
 from app.core.security import get_current_user
 from app.models import Usuario
+from app.schemas.ingesta import IngestaResultado
+from app.schemas.interface_historico import (
+    SerieTemporalRequest,
+    SerieTemporalResponse,
+)
 from app.schemas.interfaces import (
+    CambiosInterfacesResponse,
     InterfacesDetallado,
+    InterfacesDetalladoLista,
     InterfacesFiltros,
     InterfacesListResponse,
     InterfacesMetricas,
 )
+from app.services.cambios_service import CambiosService, CursorVencido
+from app.services.ingesta_service import IngestaService
+from app.services.interface_historico_service import InterfaceHistoricoService
 from app.services.interfaces_service import InterfacesService
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
 
+def _detalladas(filas: Sequence[Row]) -> List[InterfacesDetallado]:
+    """Convertir filas proyectadas del servicio en InterfacesDetallado
+
+    Valida la página completa en una sola llamada al validador compilado.
+    """
+    return InterfacesDetalladoLista.validate_python(filas, from_attributes=True)
+
+
+def _respuesta_json(modelo: BaseModel) -> Response:
+    """Serializar el modelo directamente con pydantic-core
+
+    Al devolver un modelo, FastAPI lo convierte a dict y lo vuelve a validar
+    contra `response_model` antes de serializarlo; con una Response ya
+    construida ese paso se omite. `response_model` se mantiene en la ruta
+    para la documentación OpenAPI.
+    """
+    return Response(content=modelo.model_dump_json(), media_type="application/json")
+
+
 @router.get("/", response_model=InterfacesListResponse)
 async def get_interfaces(
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
     devid: Optional[int] = Query(None, description="Filtrar por ID de dispositivo"),
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     area: Optional[str] = Query(None, description="Filtrar por área"),
@@ -40,7 +94,7 @@ async def get_interfaces(
     ),
     speed_min: Optional[int] = Query(None, ge=0, description="Velocidad mínima (Mbps)"),
     speed_max: Optional[int] = Query(None, ge=0, description="Velocidad máxima (Mbps)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener lista de interfaces con filtros y paginación"""
@@ -60,55 +114,40 @@ async def get_interfaces(
         speed_max=speed_max,
     )
 
-    interfaces, total = InterfacesService.get_all(
-        db=db, skip=skip, limit=limit, filtros=filtros
-    )
-
-    total_paginas = (total + limit - 1) // limit
-
-    # Convertir a response detallado con información adicional
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        # Agregar información del dispositivo
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
-        filtros_aplicados=filtros,
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.get_all,
+            skip=skip,
+            limit=limit,
+            filtros=filtros,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+            filtros_aplicados=filtros,
+        )
     )
 
 
 @router.get("/metricas", response_model=InterfacesMetricas)
 async def get_metricas_interfaces(
-    db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener métricas generales de interfaces"""
 
-    metricas = InterfacesService.get_metricas(db)
+    metricas = await db.run_sync(InterfacesService.get_metricas)
 
     # Convertir top_utilizadas a formato detallado
-    top_utilizadas_detalladas = []
-    for interface in metricas["top_utilizadas"]:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        top_utilizadas_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    metricas["top_utilizadas"] = top_utilizadas_detalladas
+    metricas["top_utilizadas"] = _detalladas(metricas["top_utilizadas"])
 
-    return InterfacesMetricas(**metricas)
+    return _respuesta_json(InterfacesMetricas(**metricas))
 
 
 @router.get("/alta-utilizacion", response_model=InterfacesListResponse)
@@ -118,32 +157,36 @@ async def get_interfaces_alta_utilizacion(
     ),
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener interfaces con alta utilización"""
 
-    interfaces, total = InterfacesService.get_high_utilization(
-        db=db, threshold=threshold, skip=skip, limit=limit
-    )
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.get_high_utilization,
+            threshold=threshold,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    total_paginas = (total + limit - 1) // limit
-
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+        )
     )
 
 
@@ -151,30 +194,35 @@ async def get_interfaces_alta_utilizacion(
 async def get_interfaces_con_errores(
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener interfaces con errores"""
 
-    interfaces, total = InterfacesService.get_with_errors(db=db, skip=skip, limit=limit)
-
-    total_paginas = (total + limit - 1) // limit
-
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.get_with_errors,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+        )
     )
 
 
@@ -183,42 +231,53 @@ async def buscar_interfaces(
     q: str = Query(..., min_length=2, description="Término de búsqueda"),
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    orden: str = Query(
+        "dispositivo",
+        pattern="^(dispositivo|relevancia)$",
+        description="Orden: dispositivo o relevancia (similitud con el término)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Buscar interfaces por término general"""
 
-    interfaces, total = InterfacesService.buscar(
-        db=db, termino=q, skip=skip, limit=limit
-    )
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.buscar,
+            termino=q,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+            orden=orden,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    total_paginas = (total + limit - 1) // limit
-
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+        )
     )
 
 
 @router.get("/estadisticas-zona")
 async def get_estadisticas_por_zona(
-    db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener estadísticas de interfaces agrupadas por zona"""
 
-    estadisticas = InterfacesService.get_estadisticas_por_zona(db)
+    estadisticas = await db.run_sync(InterfacesService.get_estadisticas_por_zona)
 
     return estadisticas
 
@@ -229,7 +288,15 @@ async def get_interfaces_por_velocidad(
     speed_max: int = Query(..., ge=0, description="Velocidad máxima (Mbps)"),
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener interfaces por rango de velocidad"""
@@ -240,52 +307,119 @@ async def get_interfaces_por_velocidad(
             detail="La velocidad mínima no puede ser mayor que la máxima",
         )
 
-    interfaces, total = InterfacesService.get_by_speed_range(
-        db=db, speed_min=speed_min, speed_max=speed_max, skip=skip, limit=limit
-    )
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.get_by_speed_range,
+            speed_min=speed_min,
+            speed_max=speed_max,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    total_paginas = (total + limit - 1) // limit
-
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+        )
     )
 
 
+@router.get("/cambios", response_model=CambiosInterfacesResponse)
+async def get_cambios_interfaces(
+    cursor: Optional[str] = Query(
+        None, description="siguiente_cursor de la consulta anterior (vacío: todo)"
+    ),
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de filas por tipo"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Interfaces modificadas y eliminadas desde el cursor
+
+    Sin cursor devuelve todas las interfaces (carga inicial, paginada con
+    `hay_mas`). Un 410 indica que el cursor venció: se debe volver a cargar
+    sin cursor.
+    """
+
+    try:
+        cambios = await db.run_sync(
+            CambiosService.get_cambios, "interfaces", cursor=cursor, limit=limit
+        )
+    except CursorVencido as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cambios["cambios"] = _detalladas(cambios["cambios"])
+    return _respuesta_json(CambiosInterfacesResponse(**cambios))
+
+
 @router.get("/{interface_id}", response_model=InterfacesDetallado)
 async def get_interface(
     interface_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener interface específica por ID"""
 
-    interface = InterfacesService.get_by_id(db, interface_id)
+    interface = await db.run_sync(InterfacesService.get_detalle, interface_id)
+
+    if not interface:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Interface no encontrada"
+        )
+
+    return InterfacesDetallado.model_validate(interface, from_attributes=True)
+
+
+@router.get("/{interface_id}/serie", response_model=SerieTemporalResponse)
+async def get_serie_interface(
+    interface_id: int,
+    fecha_inicio: datetime = Query(..., description="Inicio del rango"),
+    fecha_fin: datetime = Query(..., description="Fin del rango (exclusivo)"),
+    metrica: str = Query("ifutil", description="Métrica: input, output, ifutil, ..."),
+    agregacion: str = Query(
+        "raw",
+        pattern="^(raw|5min|hourly|daily)$",
+        description="raw, 5min, hourly o daily",
+    ),
+    max_puntos: int = Query(
+        2000, ge=10, le=20000, description="Máximo de puntos para 'raw'"
+    ),
+    incluir_nulos: bool = Query(False, description="Incluir muestras sin valor"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Obtener serie temporal de una métrica de la interface"""
+
+    interface = await db.run_sync(InterfacesService.get_by_id, interface_id)
 
     if not interface:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Interface no encontrada"
         )
 
-    interface_dict = interface.__dict__.copy()
-    if interface.dispositivo:
-        interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-        interface_dict["dispositivo_area"] = interface.dispositivo.area
-        interface_dict["dispositivo_zona"] = interface.dispositivo.zona
+    solicitud = SerieTemporalRequest(
+        devif=interface.devif,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        metrica=metrica,
+        agregacion=agregacion,
+        incluir_nulos=incluir_nulos,
+        max_puntos=max_puntos,
+    )
+
+    try:
+        serie = await db.run_sync(
+            InterfaceHistoricoService.get_serie, interface, solicitud
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return InterfacesDetallado(**interface_dict)
+    return SerieTemporalResponse(**serie)
 
 
 @router.get("/dispositivo/{devid}", response_model=InterfacesListResponse)
@@ -293,30 +427,73 @@ async def get_interfaces_por_dispositivo(
     devid: int,
     skip: int = Query(0, ge=0, description="Registros a omitir"),
     limit: int = Query(50, ge=1, le=100, description="Máximo registros por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener interfaces de un dispositivo específico"""
 
-    interfaces, total = InterfacesService.get_by_dispositivo(
-        db=db, devid=devid, skip=skip, limit=limit
-    )
+    try:
+        interfaces, conteo, siguiente_cursor = await db.run_sync(
+            InterfacesService.get_by_dispositivo,
+            devid=devid,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    total_paginas = (total + limit - 1) // limit
-
-    interfaces_detalladas = []
-    for interface in interfaces:
-        interface_dict = interface.__dict__.copy()
-        if interface.dispositivo:
-            interface_dict["dispositivo_nombre"] = interface.dispositivo.devname
-            interface_dict["dispositivo_area"] = interface.dispositivo.area
-            interface_dict["dispositivo_zona"] = interface.dispositivo.zona
-        interfaces_detalladas.append(InterfacesDetallado(**interface_dict))
-
-    return InterfacesListResponse(
-        interfaces=interfaces_detalladas,
-        total=total,
-        pagina=(skip // limit) + 1,
-        por_pagina=limit,
-        total_paginas=total_paginas,
+    return _respuesta_json(
+        InterfacesListResponse(
+            interfaces=_detalladas(interfaces),
+            **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+        )
     )
+
+
+@router.post("/ingesta", response_model=IngestaResultado)
+async def ingerir_muestras(
+    archivo: UploadFile = File(..., description="Muestras en JSON lines o CSV"),
+    formato: Optional[str] = Query(
+        None,
+        pattern="^(jsonl|csv)$",
+        description="jsonl o csv (por defecto según la extensión del archivo)",
+    ),
+    tamano_lote: int = Query(
+        settings.INGESTA_TAMANO_LOTE,
+        ge=100,
+        le=100000,
+        description="Muestras por transacción",
+    ),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Cargar muestras de interfaces (estado actual + histórico)
+
+    El archivo se lee en streaming desde el spool de la subida; cada lote se
+    confirma en su propia transacción.
+    """
+
+    if formato is None:
+        formato = "csv" if (archivo.filename or "").endswith(".csv") else "jsonl"
+
+    lineas = io.TextIOWrapper(archivo.file, encoding="utf-8", newline="")
+
+    try:
+        # Carga síncrona (COPY) en un hilo para no bloquear el event loop
+        resultado = await run_in_threadpool(
+            IngestaService.ingerir, db, lineas, formato, tamano_lote
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return IngestaResultado(**resultado)
@@ -2,6 +2,7 @@
 from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.etag import coincide_etag, no_modificado, respuesta_con_etag
 from app.core.security import get_current_user
 from app.models import Usuario
 from app.schemas.menu import (
@@ -15,7 +16,7 @@ from app.schemas.menu import (
     MenuUpdate,
 )
 from app.services.menu_service import MenuService
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -160,11 +161,18 @@ async def get_menu_tree_by_role(
 
 @router.get("/tree/my-role")
 async def get_my_menu_tree(
-    db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
 ):
-    """Obtener estructura de menús para el usuario actual"""
-    tree = MenuService.get_menu_tree(db, rol_id=current_user.rol_id)
-    return {"menu_tree": tree}
+    """Obtener estructura de menús para el usuario actual
+
+    Responde 304 si el cliente envía el ETag del árbol vigente.
+    """
+    etag, tree = MenuService.get_menu_tree_versionado(db, rol_id=current_user.rol_id)
+    if coincide_etag(request, etag):
+        return no_modificado(etag)
+    return respuesta_con_etag({"menu_tree": tree}, etag)
 
 
 # ========== REORDENAMIENTO ==========
@@ -180,7 +188,10 @@ async def reorder_menus(
 
     Body: [{"id": 1, "orden": 1}, {"id": 2, "orden": 2}, ...]
     """
-    success = MenuService.reorder_menus(db, menu_orders)
+    try:
+        success = MenuService.reorder_menus(db, menu_orders)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Error reordenando menús"
@@ -199,7 +210,10 @@ async def reorder_grupos(
 
     Body: [{"id": 1, "orden": 1}, {"id": 2, "orden": 2}, ...]
     """
-    success = MenuService.reorder_grupos(db, grupo_orders)
+    try:
+        success = MenuService.reorder_grupos(db, grupo_orders)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Error reordenando grupos"
@@ -2,12 +2,19 @@
 from typing import List
 
 from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models import Permiso, Usuario
+from app.core.security import get_current_user, invalidar_rol
+from app.models import Permiso, RolPermiso, Usuario
 from app.schemas.permiso import PermisoCreate, PermisoResponse, PermisoUpdate
+from app.services.rol_service import invalidar_autorizacion
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+
+def _roles_con_permiso(db: Session, permiso_id: int) -> List[int]:
+    """Roles cuyos usuarios cacheados incluyen el permiso"""
+    filas = db.query(RolPermiso.rol_id).filter(RolPermiso.permiso_id == permiso_id)
+    return [rol_id for (rol_id,) in filas]
+
 router = APIRouter()
 
 
@@ -70,7 +77,11 @@ async def update_permiso(
     for field, value in update_data.items():
         setattr(permiso, field, value)
 
+    roles = _roles_con_permiso(db, permiso_id)
     db.commit()
+    for rol_id in roles:
+        invalidar_rol(rol_id)
+    invalidar_autorizacion()
     db.refresh(permiso)
     return permiso
 
@@ -88,6 +99,10 @@ async def delete_permiso(
             status_code=status.HTTP_404_NOT_FOUND, detail="Permiso no encontrado"
         )
 
+    roles = _roles_con_permiso(db, permiso_id)
     db.delete(permiso)
     db.commit()
+    for rol_id in roles:
+        invalidar_rol(rol_id)
+    invalidar_autorizacion()
     return {"message": "Permiso eliminado correctamente"}
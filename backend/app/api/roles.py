@@ -7,10 +7,14 @@ from app.models import Usuario
 from app.schemas.menu import MenuResponse, RolMenuCreate
 from app.schemas.permiso import PermisoResponse
 from app.schemas.rol import (
+    AsignacionMasiva,
+    AsignacionMasivaResponse,
     RolCreate,
     RolPermisoCreate,
     RolResponse,
     RolUpdate,
+    VerificacionAccesos,
+    VerificacionAccesosResponse,
 )
 from app.services.rol_service import RolService
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -125,6 +129,29 @@ async def assign_permiso_to_rol(
     return {"message": "Permiso asignado correctamente"}
 
 
+@router.post("/{rol_id}/permisos/bulk", response_model=AsignacionMasivaResponse)
+async def sync_permisos_rol(
+    rol_id: int,
+    asignacion: AsignacionMasiva,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Reemplazar los permisos del rol por `ids` (agrega, actualiza y quita)"""
+    try:
+        resultado = RolService.sync_permisos(
+            db, rol_id, asignacion.ids, asignacion.estado_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if resultado is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Rol no encontrado"
+        )
+
+    return AsignacionMasivaResponse(rol_id=rol_id, **resultado)
+
+
 @router.delete("/{rol_id}/permisos/{permiso_id}")
 async def remove_permiso_from_rol(
     rol_id: int,
@@ -177,6 +204,29 @@ async def assign_menu_to_rol(
     return {"message": "Menú asignado correctamente"}
 
 
+@router.post("/{rol_id}/menus/bulk", response_model=AsignacionMasivaResponse)
+async def sync_menus_rol(
+    rol_id: int,
+    asignacion: AsignacionMasiva,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Reemplazar los menús del rol por `ids` (agrega, actualiza y quita)"""
+    try:
+        resultado = RolService.sync_menus(
+            db, rol_id, asignacion.ids, asignacion.estado_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if resultado is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Rol no encontrado"
+        )
+
+    return AsignacionMasivaResponse(rol_id=rol_id, **resultado)
+
+
 @router.delete("/{rol_id}/menus/{menu_id}")
 async def remove_menu_from_rol(
     rol_id: int,
@@ -220,3 +270,17 @@ async def check_menu_access(
     """Verificar si un rol tiene acceso a un menú específico"""
     has_access = RolService.has_menu_access(db, rol_id, menu_url)
     return {"has_access": has_access}
+
+
+@router.post("/{rol_id}/verificar", response_model=VerificacionAccesosResponse)
+async def verificar_accesos(
+    rol_id: int,
+    verificacion: VerificacionAccesos,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Verificar varios permisos y URLs de menú de un rol en una petición"""
+    resultado = RolService.verificar_accesos(
+        db, rol_id, verificacion.permisos, verificacion.menus
+    )
+    return VerificacionAccesosResponse(rol_id=rol_id, **resultado)
@@ -0,0 +1,100 @@
+# backend/app/api/stream.py
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+from app.core.config import settings
+from app.core.eventos import Suscripcion
+from app.core.security import get_current_user
+from app.models import Usuario
+from app.services.stream_service import difusor_estado
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+router = APIRouter()
+
+# Eventos escritos juntos en cada envío cuando el cliente está atrasado
+MAX_EVENTOS_POR_ENVIO = 100
+
+
+async def _eventos_sse(
+    request: Request, suscripcion: Suscripcion
+) -> AsyncIterator[str]:
+    """Formato text/event-stream de los eventos de la suscripción
+
+    Sin eventos envía un comentario cada STREAM_LATIDO_SEGUNDOS para que los
+    proxies no corten la conexión y detectar clientes desconectados. Si la
+    cola del cliente desbordó, antes del siguiente evento se envía
+    `event: retraso` con la cantidad descartada.
+    """
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(
+                    suscripcion.cola.get(), settings.STREAM_LATIDO_SEGUNDOS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": latido\n\n"
+                continue
+
+            eventos = [evento]
+            while len(eventos) < MAX_EVENTOS_POR_ENVIO and not suscripcion.cola.empty():
+                eventos.append(suscripcion.cola.get_nowait())
+
+            partes = []
+            descartados = suscripcion.tomar_descartados()
+            if descartados:
+                partes.append(
+                    f"event: retraso\ndata: {json.dumps({'descartados': descartados})}\n\n"
+                )
+            partes.extend(f"event: {e.tipo}\ndata: {e.datos}\n\n" for e in eventos)
+            yield "".join(partes)
+    finally:
+        difusor_estado.cancelar(suscripcion)
+
+
+@router.get("")
+async def stream_estado(
+    request: Request,
+    zona: Optional[str] = Query(None, description="Sólo eventos de esta zona"),
+    area: Optional[str] = Query(None, description="Sólo eventos de esta área"),
+    devid: Optional[List[int]] = Query(
+        None, description="Sólo eventos de estos dispositivos (repetible)"
+    ),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Cambios de estado de interfaces y dispositivos (Server-Sent Events)
+
+    Eventos `interface` y `dispositivo` con el nuevo estado, zona y área. El
+    backend los calcula una vez (ingesta y trigger de dispositivos) y los
+    reparte a todos los suscriptores. Cada cliente tiene una cola acotada
+    (STREAM_COLA_MAXIMO): si no consume a tiempo se descartan sus eventos
+    más antiguos y recibe `retraso`; debe resincronizarse con
+    `/dispositivos/cambios` e `/interfaces/cambios`.
+    """
+
+    if not settings.STREAM_HABILITADO:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Stream deshabilitado",
+        )
+
+    try:
+        suscripcion = difusor_estado.suscribir(zona=zona, area=area, devids=devid)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+
+    # El finally del generador no corre si el cliente se desconecta antes de
+    # la primera iteración: la tarea de fondo cancela la suscripción siempre
+    return StreamingResponse(
+        _eventos_sse(request, suscripcion),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(difusor_estado.cancelar, suscripcion),
+    )
@@ -0,0 +1,40 @@
+# backend/app/api/typeahead.py
+from typing import Optional
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user
+from app.models import Usuario
+from app.schemas.typeahead import TypeaheadResponse
+from app.services.typeahead_service import TypeaheadService
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter()
+
+
+@router.get("/", response_model=TypeaheadResponse)
+async def typeahead(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto escrito"),
+    limit: int = Query(10, ge=1, le=50, description="Máximo de sugerencias"),
+    tipo: Optional[str] = Query(
+        None,
+        pattern="^(dispositivo|interface)$",
+        description="Restringir a dispositivos o interfaces",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Usuario = Depends(get_current_user),
+):
+    """Sugerencias de dispositivos e interfaces para el cuadro de búsqueda
+
+    Se responden desde el índice en memoria del proceso (por nombre, IP,
+    ifname e ifalias). Si el índice está deshabilitado o aún no se construyó
+    se usan las búsquedas de la base de datos.
+    """
+
+    if TypeaheadService.listo():
+        return TypeaheadResponse(
+            resultados=TypeaheadService.buscar(q, limit, tipo), fuente="memoria"
+        )
+
+    resultados = await db.run_sync(TypeaheadService.buscar_en_bd, q, limit, tipo)
+    return TypeaheadResponse(resultados=resultados, fuente="base_datos")
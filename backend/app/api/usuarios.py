@@ -1,7 +1,9 @@
 # backend/app/api/usuarios.py
+from datetime import datetime
 from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import datos_paginacion
 from app.core.security import get_current_user
 from app.models import Usuario
 from app.schemas.usuario import (
@@ -12,7 +14,7 @@ from app.schemas.usuario import (
     UsuarioResponse,
     UsuarioUpdate,
 )
-from app.schemas.usuario_historia import UsuarioHistoriaResponse
+from app.schemas.usuario_historia import UsuarioHistoriaListResponse
 from app.services.usuario_service import UsuarioService
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
@@ -278,27 +280,60 @@ async def deactivate_usuario(
     return {"message": "Usuario desactivado correctamente"}
 
 
-@router.get("/{usuario_id}/historia", response_model=List[UsuarioHistoriaResponse])
+@router.get("/{usuario_id}/historia", response_model=UsuarioHistoriaListResponse)
 async def get_usuario_historia(
     usuario_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    desde: Optional[datetime] = Query(None, description="Cambios desde esta fecha"),
+    hasta: Optional[datetime] = Query(None, description="Cambios antes de esta fecha"),
+    modo_total: str = Query(
+        "exacto",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
     """Obtener historial de cambios de un usuario"""
 
-    historia, total = UsuarioService.get_historia(
-        db=db, usuario_id=usuario_id, skip=skip, limit=limit
-    )
+    try:
+        historia, conteo, siguiente_cursor = UsuarioService.get_historia(
+            db=db,
+            usuario_id=usuario_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            desde=desde,
+            hasta=hasta,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return historia
+    return UsuarioHistoriaListResponse(
+        historia=historia,
+        **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+    )
 
 
-@router.get("/historia/all", response_model=List[UsuarioHistoriaResponse])
+@router.get("/historia/all", response_model=UsuarioHistoriaListResponse)
 async def get_all_historia(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Cursor de la página siguiente (paginación keyset)"
+    ),
+    desde: Optional[datetime] = Query(None, description="Cambios desde esta fecha"),
+    hasta: Optional[datetime] = Query(None, description="Cambios antes de esta fecha"),
+    modo_total: str = Query(
+        "estimado",
+        pattern="^(exacto|estimado|omitir)$",
+        description="Cálculo del total: exacto, estimado u omitir",
+    ),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
 ):
@@ -306,6 +341,20 @@ async def get_all_historia(
 
     # TODO: Verificar permisos de administrador
 
-    historia, total = UsuarioService.get_historia(db=db, skip=skip, limit=limit)
+    try:
+        historia, conteo, siguiente_cursor = UsuarioService.get_historia(
+            db=db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            desde=desde,
+            hasta=hasta,
+            modo_total=modo_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return historia
+    return UsuarioHistoriaListResponse(
+        historia=historia,
+        **datos_paginacion(conteo, skip, limit, cursor, siguiente_cursor),
+    )
@@ -0,0 +1,89 @@
+# backend/app/core/actualizacion_masiva.py
+from typing import Any, Dict, List, Sequence
+
+from app.core.busqueda import es_postgresql
+from sqlalchemy import and_, bindparam, column, update, values
+from sqlalchemy.orm import Session
+
+
+def validar_filas(
+    filas: Sequence[Dict[str, Any]],
+    claves: Sequence[str],
+    columnas: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Validar en memoria las filas de una actualización masiva
+
+    Cada fila debe traer las claves y columnas indicadas como enteros, sin
+    claves repetidas. Devuelve las filas normalizadas (sólo esos campos).
+    Lanza ValueError con el primer problema encontrado.
+    """
+    campos = [*claves, *columnas]
+    normalizadas = []
+    vistas = set()
+
+    for posicion, fila in enumerate(filas):
+        if not isinstance(fila, dict):
+            raise ValueError(f"Elemento {posicion}: se esperaba un objeto")
+
+        faltantes = [campo for campo in campos if campo not in fila]
+        if faltantes:
+            raise ValueError(f"Elemento {posicion}: faltan {', '.join(faltantes)}")
+
+        normalizada = {}
+        for campo in campos:
+            valor = fila[campo]
+            if isinstance(valor, bool) or not isinstance(valor, int):
+                raise ValueError(f"Elemento {posicion}: {campo} debe ser entero")
+            normalizada[campo] = valor
+
+        clave = tuple(normalizada[campo] for campo in claves)
+        if clave in vistas:
+            raise ValueError(f"Elemento {posicion}: clave repetida {clave}")
+        vistas.add(clave)
+        normalizadas.append(normalizada)
+
+    return normalizadas
+
+
+def actualizar_en_bloque(
+    db: Session,
+    modelo: Any,
+    filas: Sequence[Dict[str, Any]],
+    claves: Sequence[str] = ("id",),
+) -> int:
+    """Actualizar varias filas por clave en una sola sentencia
+
+    Las filas (ya validadas) traen las claves y las mismas columnas a
+    actualizar, p. ej. [{"id": 1, "orden": 3}] o, para rol_menu,
+    [{"rol_id": 1, "menu_id": 7, "estado_id": 2}]. En PostgreSQL se envía un
+    único UPDATE ... FROM (VALUES ...); en otros motores, un UPDATE por
+    clave con todas las filas (executemany). No confirma.
+    Devuelve la cantidad de filas actualizadas (las claves inexistentes se
+    ignoran).
+    """
+    if not filas:
+        return 0
+
+    columnas = [campo for campo in filas[0] if campo not in claves]
+    tabla = modelo.__table__
+
+    if not es_postgresql(db):
+        sentencia = (
+            update(tabla)
+            .where(and_(*[tabla.c[c] == bindparam(f"p_{c}") for c in claves]))
+            .values({c: bindparam(f"p_{c}") for c in columnas})
+        )
+        parametros = [{f"p_{c}": valor for c, valor in fila.items()} for fila in filas]
+        return db.execute(sentencia, parametros).rowcount
+
+    datos = values(
+        *[column(campo, tabla.c[campo].type) for campo in [*claves, *columnas]],
+        name="datos",
+    ).data([tuple(fila[campo] for campo in [*claves, *columnas]) for fila in filas])
+
+    sentencia = (
+        update(tabla)
+        .where(and_(*[tabla.c[campo] == datos.c[campo] for campo in claves]))
+        .values({campo: datos.c[campo] for campo in columnas})
+    )
+    return db.execute(sentencia).rowcount
@@ -0,0 +1,193 @@
+# backend/app/core/auditoria.py
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_FIN = object()
+
+
+class ColaEscritura:
+    """Cola acotada de registros que un hilo escribe en lotes (write-behind)
+
+    `encolar` sólo agrega el registro a la cola, sin tocar la base. El hilo
+    escribe con `escribir_lote` cuando junta `tamano_lote` registros o pasan
+    `intervalo_segundos`. Si la cola está llena o el hilo no está iniciado
+    (scripts, pruebas) el registro se escribe en el momento, de modo que no
+    se pierde. `detener` vacía la cola antes de terminar.
+
+    Si un lote falla, el hilo lo conserva y reintenta con espera exponencial
+    (de `pausa_inicial` hasta `pausa_maxima`) durante `plazo_segundos`, para
+    sobrevivir a una caída breve de la base. Vencido el plazo, con la cola
+    llena o al detener, se escribe registro por registro para perder sólo
+    los que la base rechaza. La escritura directa hace `reintentos` intentos
+    sin pausas. Los registros perdidos se informan en el log por
+    `identificar(registro)` (p. ej. el id), nunca completos: pueden contener
+    datos personales.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        escribir_lote: Callable[[List[Dict[str, Any]]], None],
+        maximo: int = 10000,
+        tamano_lote: int = 500,
+        intervalo_segundos: float = 1.0,
+        reintentos: int = 3,
+        identificar: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        plazo_segundos: float = 300.0,
+        pausa_inicial: float = 0.5,
+        pausa_maxima: float = 30.0,
+    ):
+        self.nombre = nombre
+        self.escribir_lote = escribir_lote
+        self.identificar = identificar
+        self.tamano_lote = tamano_lote
+        self.intervalo_segundos = intervalo_segundos
+        self.reintentos = reintentos
+        self.plazo_segundos = plazo_segundos
+        self.pausa_inicial = pausa_inicial
+        self.pausa_maxima = pausa_maxima
+        self._parar = threading.Event()
+        self._cola: "queue.Queue" = queue.Queue(maxsize=maximo)
+        self._hilo: Optional[threading.Thread] = None
+        self.encolados = 0
+        self.escritos = 0
+        self.lotes = 0
+        self.directos = 0
+        self.perdidos = 0
+
+    @property
+    def activa(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def encolar(self, registro: Dict[str, Any]) -> None:
+        if self.activa:
+            try:
+                self._cola.put_nowait(registro)
+                self.encolados += 1
+                return
+            except queue.Full:
+                logger.warning(f"Cola '{self.nombre}' llena: escritura directa")
+
+        # Escritura directa en el hilo de la petición: sin pausas entre intentos
+        self.directos += 1
+        self._escribir([registro], pausa=False)
+
+    def iniciar(self) -> None:
+        if self.activa:
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(
+            target=self._bucle, name=f"cola-{self.nombre}", daemon=True
+        )
+        self._hilo.start()
+
+    def detener(self, timeout: float = 10.0) -> None:
+        """Escribir lo pendiente y terminar el hilo (al apagar la aplicación)"""
+        if not self.activa:
+            return
+        # Interrumpe la espera de un lote fallido
+        self._parar.set()
+        self._cola.put(_FIN)
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            logger.error(f"Cola '{self.nombre}': no terminó en {timeout}s")
+        self._hilo = None
+
+    def _bucle(self) -> None:
+        terminar = False
+        while not terminar:
+            lote: List[Dict[str, Any]] = []
+            limite = time.monotonic() + self.intervalo_segundos
+            while len(lote) < self.tamano_lote:
+                try:
+                    restante = limite - time.monotonic()
+                    if lote:
+                        elemento = self._cola.get(timeout=max(restante, 0))
+                    else:
+                        # Sin pendientes se espera sin límite al primero
+                        elemento = self._cola.get()
+                        limite = time.monotonic() + self.intervalo_segundos
+                except queue.Empty:
+                    break
+                if elemento is _FIN:
+                    terminar = True
+                    break
+                lote.append(elemento)
+
+            if terminar:
+                # Lo que quedó detrás del marcador también se escribe
+                while True:
+                    try:
+                        elemento = self._cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    if elemento is not _FIN:
+                        lote.append(elemento)
+
+            if lote:
+                self._escribir(lote)
+
+    def _seguir_reintentando(self, intento: int, vence: float, pausa: bool) -> bool:
+        if not pausa:
+            return intento < self.reintentos
+        if self._parar.is_set() or self._cola.full():
+            return False
+        espera = min(self.pausa_inicial * 2 ** (intento - 1), self.pausa_maxima)
+        if time.monotonic() + espera > vence:
+            return False
+        # True si se pidió detener durante la espera
+        return not self._parar.wait(espera)
+
+    def _escribir(self, lote: List[Dict[str, Any]], pausa: bool = True) -> None:
+        vence = time.monotonic() + self.plazo_segundos
+        intento = 0
+        while True:
+            intento += 1
+            try:
+                self.escribir_lote(lote)
+                self.escritos += len(lote)
+                self.lotes += 1
+                return
+            except Exception as e:
+                # Sólo el tipo: el mensaje del driver incluye los valores
+                logger.error(
+                    f"Cola '{self.nombre}': error escribiendo {len(lote)} "
+                    f"registros (intento {intento}): {type(e).__name__}"
+                )
+            if not self._seguir_reintentando(intento, vence, pausa):
+                break
+
+        perdidos = lote
+        if len(lote) > 1:
+            # Un registro inválido no debe arrastrar al resto del lote
+            perdidos = []
+            for registro in lote:
+                try:
+                    self.escribir_lote([registro])
+                    self.escritos += 1
+                except Exception:
+                    perdidos.append(registro)
+
+        if perdidos:
+            self.perdidos += len(perdidos)
+            ids = [self.identificar(r) for r in perdidos] if self.identificar else []
+            logger.error(
+                f"Cola '{self.nombre}': {len(perdidos)} registros no escritos {ids}"
+            )
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            "activa": self.activa,
+            "pendientes": self._cola.qsize(),
+            "maximo": self._cola.maxsize,
+            "encolados": self.encolados,
+            "escritos": self.escritos,
+            "lotes": self.lotes,
+            "directos": self.directos,
+            "perdidos": self.perdidos,
+        }
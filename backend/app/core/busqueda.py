@@ -0,0 +1,79 @@
+# backend/app/core/busqueda.py
+import ipaddress
+from typing import Any, List, Optional
+
+from sqlalchemy import Numeric, String, case, cast, func, literal, or_
+from sqlalchemy.orm import Session
+
+
+def es_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def patron_contiene(termino: str) -> str:
+    """Patrón ILIKE '%termino%' con los comodines del término escapados"""
+    escapado = termino.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+def prefijo_ip(termino: str) -> Optional[str]:
+    """Red (CIDR) que representa el término si tiene forma de IP o prefijo
+
+    "10.0.1.5" -> "10.0.1.5/32", "10.0.0.0/16" -> "10.0.0.0/16" y los
+    prefijos por octetos "10.0" o "10.0.1." -> "10.0.0.0/16", "10.0.1.0/24".
+    Devuelve None si el término no es una dirección.
+    """
+    termino = termino.strip()
+    try:
+        return str(ipaddress.ip_network(termino, strict=False))
+    except ValueError:
+        pass
+
+    octetos = termino.rstrip(".").split(".")
+    if len(octetos) < 2 and not termino.endswith("."):
+        return None
+    if len(octetos) > 3 or not all(o.isdigit() and int(o) <= 255 for o in octetos):
+        return None
+
+    red = ".".join(octetos + ["0"] * (4 - len(octetos)))
+    return f"{red}/{8 * len(octetos)}"
+
+
+def condicion_texto(columnas: List[Any], termino: str):
+    """OR de ILIKE por subcadena (índices GIN de trigramas en PostgreSQL)"""
+    patron = patron_contiene(termino)
+    return or_(*[columna.ilike(patron, escape="\\") for columna in columnas])
+
+
+def condicion_ip(db: Session, columna: Any, red: str):
+    """Dirección contenida en la red: `<<=` (índice GiST inet_ops)"""
+    if es_postgresql(db):
+        return columna.op("<<=")(cast(red, columna.type))
+
+    # Otros motores guardan la IP como texto: prefijo por octetos
+    direccion, _, bits = red.partition("/")
+    octetos = direccion.split(".")[: int(bits) // 8]
+    if len(octetos) == 4:
+        return cast(columna, String) == direccion
+    return cast(columna, String).like(".".join(octetos) + ".%")
+
+
+def relevancia(
+    db: Session, columnas: List[Any], termino: str, coincidencias: List[Any] = ()
+):
+    """Puntaje 0..1 del término frente a las columnas (mayor es mejor)
+
+    En PostgreSQL es el máximo `word_similarity` de pg_trgm entre las
+    columnas; cada condición de `coincidencias` que se cumple vale 1 (por
+    ejemplo, una IP dentro de la subred buscada). En otros motores todas
+    las filas valen 0 y el orden lo define la clave secundaria.
+
+    Se redondea a NUMERIC para que el valor guardado en el cursor keyset
+    compare exactamente igual al recalcularlo.
+    """
+    if not es_postgresql(db):
+        return literal(0, Numeric(5, 4))
+
+    puntajes = [func.word_similarity(termino, columna) for columna in columnas]
+    puntajes += [case((condicion, 1.0), else_=0.0) for condicion in coincidencias]
+    return func.round(cast(func.greatest(*puntajes), Numeric), 4)
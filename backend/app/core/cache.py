@@ -0,0 +1,90 @@
+# backend/app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CacheTTL:
+    """Cache en memoria con expiración (TTL) y desalojo LRU
+
+    Seguro entre hilos: los endpoints síncronos de FastAPI corren en el
+    threadpool. Cada proceso (worker) tiene su propia instancia, por lo que
+    el TTL acota cuánto puede tardar en verse un cambio hecho en otro worker.
+    """
+
+    def __init__(self, maximo: int = 1000, ttl_segundos: float = 60):
+        self.maximo = maximo
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+        self.desalojados = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Valor vigente de la clave, o None (cuenta acierto/fallo)"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+
+            expira, valor = entrada
+            if expira <= time.monotonic():
+                del self._datos[clave]
+                self.expirados += 1
+                self.fallos += 1
+                return None
+
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+                self.desalojados += 1
+
+    def invalidar(self, clave: Hashable) -> bool:
+        with self._lock:
+            if self._datos.pop(clave, None) is None:
+                return False
+            self.invalidaciones += 1
+            return True
+
+    def invalidar_si(self, condicion: Callable[[Any], bool]) -> int:
+        """Eliminar las entradas cuyo valor cumple la condición"""
+        with self._lock:
+            claves = [c for c, (_, valor) in self._datos.items() if condicion(valor)]
+            for clave in claves:
+                del self._datos[clave]
+            self.invalidaciones += len(claves)
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self.invalidaciones += len(self._datos)
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "maximo": self.maximo,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": (
+                    round(self.aciertos / consultas, 4) if consultas else None
+                ),
+                "expirados": self.expirados,
+                "desalojados": self.desalojados,
+                "invalidaciones": self.invalidaciones,
+            }
@@ -1,13 +1,89 @@
 # backend/app/core/database.py
 from app.core.config import settings
+from app.core.telemetria_pool import TelemetriaPool, clase_pool_instrumentada
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _opciones_pool() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+telemetria_db = TelemetriaPool("sync", settings.DB_CHECKOUT_LENTO_MS)
+telemetria_async_db = TelemetriaPool("async", settings.DB_CHECKOUT_LENTO_MS)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=clase_pool_instrumentada(QueuePool, telemetria_db),
+    connect_args=(
+        {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+        if settings.DB_STATEMENT_TIMEOUT_MS
+        else {}
+    ),
+    **_opciones_pool(),
+)
+telemetria_db.escuchar(engine)
 
-engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Engine asíncrono: se crea al primer uso para que los scripts y tareas que
+# sólo usan el engine síncrono no requieran asyncpg
+_async_engine = None
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL,
+            poolclass=clase_pool_instrumentada(
+                AsyncAdaptedQueuePool, telemetria_async_db
+            ),
+            connect_args=(
+                {
+                    "server_settings": {
+                        "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+                    }
+                }
+                if settings.DB_STATEMENT_TIMEOUT_MS
+                else {}
+            ),
+            **_opciones_pool(),
+        )
+        telemetria_async_db.escuchar(_async_engine.sync_engine)
+    return _async_engine
+
+
+def estado_pools() -> dict:
+    """Telemetría de los pools de conexiones (para /health/db)"""
+    return {
+        "sync": telemetria_db.estadisticas(engine.pool),
+        "async": telemetria_async_db.estadisticas(
+            _async_engine.pool if _async_engine is not None else None
+        ),
+    }
+
+
+async def dispose_async_engine():
+    """Cerrar las conexiones del engine asíncrono (al detener la aplicación)"""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
 
 # Dependency para obtener sesión de BD
 def get_db():
@@ -16,3 +92,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency para obtener sesión asíncrona de BD (no bloquea el event loop).
+# Los servicios síncronos se ejecutan con `await db.run_sync(Servicio.metodo)`
+async def get_async_db():
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -0,0 +1,46 @@
+# backend/app/core/etag.py
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Las respuestas dependen del usuario autenticado: sólo el navegador puede
+# guardarlas y debe revalidarlas (If-None-Match) antes de reutilizarlas
+CACHE_CONTROL = "private, no-cache"
+
+
+def calcular_etag(*partes: Any) -> str:
+    """ETag débil a partir de una versión (p. ej. conteo + max(updated_at))"""
+    version = "|".join(str(parte) for parte in partes)
+    return f'W/"{hashlib.sha1(version.encode()).hexdigest()[:20]}"'
+
+
+def coincide_etag(request: Request, etag: str) -> bool:
+    """El cliente ya tiene esta versión (If-None-Match, comparación débil)"""
+    encabezado = request.headers.get("if-none-match")
+    if not encabezado:
+        return False
+    if encabezado.strip() == "*":
+        return True
+
+    def sin_debil(valor: str) -> str:
+        valor = valor.strip()
+        return valor[2:] if valor.startswith("W/") else valor
+
+    return sin_debil(etag) in {sin_debil(v) for v in encabezado.split(",")}
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def respuesta_con_etag(contenido: Any, etag: str) -> JSONResponse:
+    return JSONResponse(
+        content=jsonable_encoder(contenido),
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
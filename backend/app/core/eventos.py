@@ -0,0 +1,178 @@
+# backend/app/core/eventos.py
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Evento(NamedTuple):
+    """Evento serializado una sola vez para todos los suscriptores"""
+
+    tipo: str
+    devid: Optional[int]
+    zona: Optional[str]  # en minúsculas, para filtrar
+    area: Optional[str]
+    datos: str  # JSON
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Evento":
+        zona, area = datos.get("zona"), datos.get("area")
+        return cls(
+            tipo=datos.get("tipo", "mensaje"),
+            devid=datos.get("devid"),
+            zona=zona.casefold() if zona else None,
+            area=area.casefold() if area else None,
+            datos=json.dumps(datos, default=str, separators=(",", ":")),
+        )
+
+
+class Suscripcion:
+    """Suscriptor de un Difusor: cola acotada y filtros opcionales
+
+    Si el cliente no consume a tiempo y la cola se llena, se descarta el
+    evento más antiguo y se cuenta en `descartados`, para avisarle que debe
+    resincronizarse.
+    """
+
+    def __init__(
+        self,
+        maximo: int,
+        zona: Optional[str] = None,
+        area: Optional[str] = None,
+        devids: Optional[Iterable[int]] = None,
+    ):
+        self.cola: "asyncio.Queue[Evento]" = asyncio.Queue(maxsize=maximo)
+        self.zona = zona.casefold() if zona else None
+        self.area = area.casefold() if area else None
+        self.devids: Optional[Set[int]] = set(devids) if devids else None
+        self.descartados = 0
+
+    def acepta(self, evento: Evento) -> bool:
+        if self.zona is not None and evento.zona != self.zona:
+            return False
+        if self.area is not None and evento.area != self.area:
+            return False
+        if self.devids is not None and evento.devid not in self.devids:
+            return False
+        return True
+
+    def entregar(self, evento: Evento) -> bool:
+        """Encolar sin bloquear; devuelve False si hubo que descartar"""
+        descartado = False
+        if self.cola.full():
+            self.cola.get_nowait()
+            self.descartados += 1
+            descartado = True
+        self.cola.put_nowait(evento)
+        return not descartado
+
+    def tomar_descartados(self) -> int:
+        descartados, self.descartados = self.descartados, 0
+        return descartados
+
+
+class Difusor:
+    """Pub/sub en memoria: reparte cada evento a las suscripciones que lo aceptan
+
+    `publicar` se llama desde el event loop (p. ej. el listener de
+    LISTEN/NOTIFY); `publicar_desde_hilo`, desde código síncrono en otros
+    hilos (servicios ejecutados en el threadpool). Ambos sólo agregan los
+    eventos a una lista de pendientes: una tarea los reparte en tandas de
+    `tamano_tanda`, cediendo el loop entre tandas para que una ráfaga (un
+    lote grande de la ingesta) no demore al resto de las peticiones. Nunca
+    bloquea al publicador: un suscriptor lento sólo pierde sus eventos más
+    antiguos.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        maximo_cola: int = 1000,
+        maximo_suscriptores: int = 500,
+        tamano_tanda: int = 200,
+    ):
+        self.nombre = nombre
+        self.maximo_cola = maximo_cola
+        self.maximo_suscriptores = maximo_suscriptores
+        self.tamano_tanda = tamano_tanda
+        self._suscripciones: Set[Suscripcion] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pendientes: Deque[Dict[str, Any]] = deque()
+        self._reparto: Optional[asyncio.Task] = None
+        self.publicados = 0
+        self.entregados = 0
+        self.descartados = 0
+
+    def iniciar(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def suscribir(self, **filtros: Any) -> Suscripcion:
+        """Nueva suscripción; RuntimeError si se alcanzó el máximo"""
+        if len(self._suscripciones) >= self.maximo_suscriptores:
+            raise RuntimeError(
+                f"Se alcanzó el máximo de {self.maximo_suscriptores} suscriptores"
+            )
+        suscripcion = Suscripcion(self.maximo_cola, **filtros)
+        self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        self._suscripciones.discard(suscripcion)
+
+    def publicar(self, eventos: Iterable[Dict[str, Any]]) -> None:
+        """Agregar eventos a repartir (desde el event loop, sin esperar)"""
+        self._pendientes.extend(eventos)
+        if self._pendientes and (self._reparto is None or self._reparto.done()):
+            self._reparto = asyncio.get_running_loop().create_task(self._repartir())
+
+    async def _repartir(self) -> None:
+        while self._pendientes:
+            for _ in range(min(self.tamano_tanda, len(self._pendientes))):
+                self._entregar(Evento.desde_dict(self._pendientes.popleft()))
+            await asyncio.sleep(0)
+
+    def _entregar(self, evento: Evento) -> None:
+        self.publicados += 1
+        for suscripcion in tuple(self._suscripciones):
+            if not suscripcion.acepta(evento):
+                continue
+            if not suscripcion.entregar(evento):
+                self.descartados += 1
+            self.entregados += 1
+
+    async def detener(self) -> None:
+        """Cancelar el reparto en curso (al apagar la aplicación)"""
+        if self._reparto is None:
+            return
+        self._reparto.cancel()
+        try:
+            await self._reparto
+        except asyncio.CancelledError:
+            pass
+        self._reparto = None
+        self._pendientes.clear()
+
+    def publicar_desde_hilo(self, eventos: List[Dict[str, Any]]) -> None:
+        if not eventos:
+            return
+        if self._loop is None or self._loop.is_closed():
+            logger.debug(f"Difusor '{self.nombre}' sin iniciar: eventos ignorados")
+            return
+        self._loop.call_soon_threadsafe(self.publicar, eventos)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            "suscriptores": len(self._suscripciones),
+            "maximo_suscriptores": self.maximo_suscriptores,
+            "maximo_cola": self.maximo_cola,
+            "publicados": self.publicados,
+            "entregados": self.entregados,
+            "descartados": self.descartados,
+            "por_repartir": len(self._pendientes),
+            "pendientes_maximo": max(
+                (s.cola.qsize() for s in self._suscripciones), default=0
+            ),
+        }
@@ -0,0 +1,78 @@
+# backend/app/core/mapa.py
+from typing import Any, List, NamedTuple, Tuple
+
+from app.core.busqueda import es_postgresql
+from sqlalchemy import Float, and_, cast, func, or_
+from sqlalchemy.orm import Session
+
+# Celdas de agrupación por tesela de 256 px (4 -> celdas de ~64 px)
+DIVISIONES_TESELA = 4
+ZOOM_MAXIMO = 22
+
+
+class Bbox(NamedTuple):
+    oeste: float
+    sur: float
+    este: float
+    norte: float
+
+
+def parsear_bbox(texto: str) -> Bbox:
+    """Bounding box "oeste,sur,este,norte" (lon/lat mínimos y máximos)
+
+    oeste > este indica una vista que cruza el antimeridiano.
+    """
+    try:
+        oeste, sur, este, norte = (float(valor) for valor in texto.split(","))
+    except ValueError:
+        raise ValueError("bbox debe tener el formato oeste,sur,este,norte")
+
+    if not (-90 <= sur <= norte <= 90):
+        raise ValueError("Latitudes del bbox fuera de rango o invertidas")
+    if not (-180 <= oeste <= 180 and -180 <= este <= 180):
+        raise ValueError("Longitudes del bbox fuera de rango")
+
+    return Bbox(oeste, sur, este, norte)
+
+
+def tamano_celda(zoom: int) -> float:
+    """Lado de la celda de agrupación en grados para un nivel de zoom"""
+    return 360.0 / (2**zoom) / DIVISIONES_TESELA
+
+
+def tramos_longitud(bbox: Bbox) -> List[Tuple[float, float]]:
+    if bbox.oeste <= bbox.este:
+        return [(bbox.oeste, bbox.este)]
+    return [(bbox.oeste, 180.0), (-180.0, bbox.este)]
+
+
+def punto(latitud: Any, longitud: Any):
+    """point(lon, lat) de PostgreSQL; coincide con el índice GiST del script 13"""
+    return func.point(cast(longitud, Float), cast(latitud, Float))
+
+
+def condicion_bbox(db: Session, latitud: Any, longitud: Any, bbox: Bbox):
+    """Coordenadas dentro del bbox
+
+    En PostgreSQL usa `point <@ box` (índice GiST, sin PostGIS); en otros
+    motores, rangos sobre las columnas.
+    """
+    if es_postgresql(db):
+        return or_(
+            *[
+                punto(latitud, longitud).op("<@")(
+                    func.box(func.point(oeste, bbox.sur), func.point(este, bbox.norte))
+                )
+                for oeste, este in tramos_longitud(bbox)
+            ]
+        )
+
+    return and_(
+        latitud.between(bbox.sur, bbox.norte),
+        or_(*[longitud.between(oeste, este) for oeste, este in tramos_longitud(bbox)]),
+    )
+
+
+def indice_celda(columna: Any, tamano: float):
+    """Índice entero de la celda de la grilla que contiene la coordenada"""
+    return func.floor(cast(columna, Float) / tamano)
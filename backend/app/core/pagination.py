@@ -0,0 +1,198 @@
+# backend/app/core/pagination.py
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, asc, desc, or_, tuple_
+from sqlalchemy.orm import Query, Session
+
+
+class ClaveOrden(NamedTuple):
+    """Columna (o expresión) que forma parte del orden de un listado
+
+    `valor` extrae de una fila del resultado el valor de esta clave, que es
+    lo que se guarda en el cursor para continuar desde esa fila.
+    """
+
+    expresion: Any
+    descendente: bool
+    valor: Callable[[Any], Any]
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return {"d": str(valor)}
+    if isinstance(valor, datetime):
+        return {"t": valor.isoformat()}
+    raise TypeError(f"Tipo no soportado en cursor: {type(valor)!r}")
+
+
+def _deserializar(obj: dict) -> Any:
+    if "d" in obj:
+        return Decimal(obj["d"])
+    if "t" in obj:
+        return datetime.fromisoformat(obj["t"])
+    return obj
+
+
+def codificar_cursor(nombre_orden: str, valores: List[Any]) -> str:
+    """Codificar los valores de la última fila como cursor opaco"""
+    contenido = json.dumps(
+        {"o": nombre_orden, "v": valores}, default=_serializar, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(contenido.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(nombre_orden: str, cursor: str) -> List[Any]:
+    """Decodificar un cursor; ValueError si no corresponde a este orden"""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        contenido = json.loads(
+            base64.urlsafe_b64decode(cursor + relleno), object_hook=_deserializar
+        )
+        valores = contenido["v"]
+        orden = contenido["o"]
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+    if orden != nombre_orden or not isinstance(valores, list):
+        raise ValueError("El cursor no corresponde a este listado")
+
+    return valores
+
+
+def _filtro_keyset(orden: List[ClaveOrden], valores: List[Any]):
+    """Condición "fila posterior al cursor" según el orden lexicográfico"""
+
+    if len(valores) != len(orden):
+        raise ValueError("Cursor inválido")
+
+    # Con todas las claves en la misma dirección se usa comparación de filas,
+    # que PostgreSQL resuelve directamente sobre un índice compuesto
+    if all(clave.descendente == orden[0].descendente for clave in orden):
+        columnas = tuple_(*[clave.expresion for clave in orden])
+        if orden[0].descendente:
+            return columnas < tuple_(*valores)
+        return columnas > tuple_(*valores)
+
+    condiciones = []
+    for i, clave in enumerate(orden):
+        iguales = [orden[j].expresion == valores[j] for j in range(i)]
+        if clave.descendente:
+            siguiente = clave.expresion < valores[i]
+        else:
+            siguiente = clave.expresion > valores[i]
+        condiciones.append(and_(*iguales, siguiente))
+
+    return or_(*condiciones)
+
+
+def paginar(
+    query: Query,
+    nombre_orden: str,
+    orden: List[ClaveOrden],
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Aplicar orden y paginación (offset o keyset) a una consulta
+
+    Con `cursor` se ignora `skip` y se continúa desde la fila codificada, de
+    modo que el costo no crece con la profundidad de la página. En ambos
+    modos se devuelve el cursor de la página siguiente (None si no hay más).
+    """
+
+    query = query.order_by(
+        *[desc(c.expresion) if c.descendente else asc(c.expresion) for c in orden]
+    )
+
+    if cursor:
+        valores = decodificar_cursor(nombre_orden, cursor)
+        query = query.filter(_filtro_keyset(orden, valores))
+    elif skip:
+        query = query.offset(skip)
+
+    # Se pide una fila extra para saber si existe página siguiente
+    filas = query.limit(limit + 1).all()
+
+    siguiente_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        siguiente_cursor = codificar_cursor(
+            nombre_orden, [clave.valor(ultima) for clave in orden]
+        )
+
+    return filas, siguiente_cursor
+
+
+def estimar_total(db: Session, query: Query) -> Optional[int]:
+    """Estimar filas con las estadísticas del planificador (sin recorrer)
+
+    Sólo disponible en PostgreSQL; en otros motores devuelve None.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    compilado = query.order_by(None).statement.compile(dialect=bind.dialect)
+    parametros = compilado.params
+    if compilado.positional:
+        # asyncpg usa parámetros posicionales ($1, $2, ...)
+        parametros = tuple(parametros[nombre] for nombre in compilado.positiontup)
+
+    plan = (
+        db.connection()
+        .exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compilado), parametros)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class Conteo(NamedTuple):
+    """Total de un listado y si proviene de una estimación del planificador"""
+
+    total: Optional[int]
+    estimado: bool = False
+
+
+def contar_total(db: Session, query: Query, modo_total: str = "exacto") -> Conteo:
+    """Total de filas según el modo: exacto (COUNT), estimado u omitir
+
+    El modo estimado recurre al COUNT exacto si el motor no da estimación;
+    `Conteo.estimado` indica cuál se usó realmente.
+    """
+
+    if modo_total == "omitir":
+        return Conteo(None)
+
+    if modo_total == "estimado":
+        estimado = estimar_total(db, query)
+        if estimado is not None:
+            return Conteo(estimado, estimado=True)
+
+    return Conteo(query.order_by(None).count())
+
+
+def datos_paginacion(
+    conteo: Conteo,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    siguiente_cursor: Optional[str],
+) -> dict:
+    """Campos de paginación comunes a las respuestas de listado"""
+    total = conteo.total
+    return {
+        "total": total,
+        "total_estimado": conteo.estimado,
+        "pagina": None if cursor else (skip // limit) + 1,
+        "por_pagina": limit,
+        "total_paginas": (total + limit - 1) // limit if total is not None else None,
+        "siguiente_cursor": siguiente_cursor,
+    }
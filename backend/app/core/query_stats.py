@@ -0,0 +1,62 @@
+# backend/app/core/query_stats.py
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class ReporteConsultas:
+    """Acumula el número de consultas y su duración en milisegundos"""
+
+    def __init__(self) -> None:
+        self.detalle: List[Dict[str, Any]] = []
+
+    @property
+    def consultas(self) -> int:
+        return len(self.detalle)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(item["ms"] for item in self.detalle), 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "consultas": self.consultas,
+            "total_ms": self.total_ms,
+            "detalle": self.detalle,
+        }
+
+
+@contextmanager
+def medir_consultas(db: Session) -> Iterator[ReporteConsultas]:
+    """Registrar las consultas ejecutadas por la sesión dentro del bloque
+
+    Los listeners se enganchan a la conexión de la sesión (no al engine),
+    así que sólo se miden las consultas de esta petición aunque el pool
+    esté atendiendo otras en paralelo.
+    """
+    reporte = ReporteConsultas()
+    conexion = db.connection()
+    inicios: List[float] = []
+
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        inicios.append(time.perf_counter())
+
+    def despues(conn, cursor, statement, parameters, context, executemany):
+        inicio = inicios.pop() if inicios else time.perf_counter()
+        reporte.detalle.append(
+            {
+                "sql": " ".join(statement.split()),
+                "ms": round((time.perf_counter() - inicio) * 1000, 3),
+            }
+        )
+
+    event.listen(conexion, "before_cursor_execute", antes)
+    event.listen(conexion, "after_cursor_execute", despues)
+    try:
+        yield reporte
+    finally:
+        event.remove(conexion, "before_cursor_execute", antes)
+        event.remove(conexion, "after_cursor_execute", despues)
@@ -1,18 +1,41 @@
 # backend/app/core/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
+from app.core.cache import CacheTTL
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import SessionLocal
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session, joinedload
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from sqlalchemy.orm import joinedload
+
+# Costo fijo: needs_update/verify_and_update marcan los hashes con otro
+# costo (mayor o menor) para recalcularlos al iniciar sesión
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+# bcrypt libera el GIL: hilos acotados para no bloquear el event loop ni
+# saturar la CPU cuando muchos usuarios inician sesión a la vez
+pool_hash = ThreadPoolExecutor(
+    max_workers=settings.HASH_MAX_WORKERS, thread_name_prefix="hash"
+)
 security = HTTPBearer()
 
+# Usuarios autenticados por sujeto del token (email), con rol y permisos
+# cargados. Se invalida desde UsuarioService y RolService al modificarlos.
+cache_usuarios = CacheTTL(
+    maximo=settings.CACHE_USUARIOS_MAXIMO,
+    ttl_segundos=settings.CACHE_USUARIOS_TTL_SEGUNDOS,
+)
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -38,6 +61,25 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verificar_clave(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """Verificar la contraseña en pool_hash sin bloquear el event loop
+
+    Devuelve (válida, nuevo_hash); nuevo_hash no es None si el hash usa una
+    política anterior (otro costo) y debe guardarse. Sin hash (usuario
+    inexistente) verifica contra uno ficticio para igualar el tiempo de
+    respuesta.
+    """
+    loop = asyncio.get_running_loop()
+    if not hashed_password:
+        await loop.run_in_executor(pool_hash, pwd_context.dummy_verify)
+        return False, None
+    return await loop.run_in_executor(
+        pool_hash, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def verify_token(token: str) -> Union[str, None]:
     try:
         payload = jwt.decode(
@@ -50,7 +92,6 @@ def verify_token(token: str) -> Union[str, None]:
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ):
     """Obtener usuario actual desde el token JWT"""
     from app.models.usuario import Usuario
@@ -75,16 +116,26 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = (
-        db.query(Usuario)
-        .options(
-            joinedload(Usuario.rol).joinedload(Rol.permisos).joinedload(RolPermiso.permiso)
-        )
-        .filter(Usuario.email == email)
-        .first()
-    )
+    user = cache_usuarios.obtener(email)
     if user is None:
-        raise credentials_exception
+        # Sesión propia: al cerrarla el usuario queda desvinculado con rol y
+        # permisos ya cargados, y puede compartirse entre peticiones
+        db_cache = SessionLocal()
+        try:
+            user = (
+                db_cache.query(Usuario)
+                .options(
+                    joinedload(Usuario.rol).joinedload(Rol.permisos).joinedload(RolPermiso.permiso)
+                )
+                .filter(Usuario.email == email)
+                .first()
+            )
+        finally:
+            db_cache.close()
+
+        if user is None:
+            raise credentials_exception
+        cache_usuarios.guardar(email, user)
 
     # Verificar que el usuario esté activo
     if user.estado_id != 2:  # 1 = creado, 2 = activo
@@ -95,6 +146,16 @@ def get_current_user(
     return user
 
 
+def invalidar_usuario(email: str) -> None:
+    """Descartar el usuario cacheado (cambió su estado, rol o clave)"""
+    cache_usuarios.invalidar(email)
+
+
+def invalidar_rol(rol_id: int) -> None:
+    """Descartar los usuarios cacheados de un rol (cambiaron sus permisos)"""
+    cache_usuarios.invalidar_si(lambda usuario: usuario.rol_id == rol_id)
+
+
 def get_current_active_user(current_user=Depends(get_current_user)):
     """Obtener usuario activo actual"""
     return current_user
@@ -0,0 +1,55 @@
+# backend/app/core/tareas.py
+import asyncio
+import logging
+from typing import Callable, Dict, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class TareaPeriodica(NamedTuple):
+    nombre: str
+    intervalo_segundos: float
+    funcion: Callable[[], None]
+
+
+_tareas: List[TareaPeriodica] = []
+_en_ejecucion: Dict[str, asyncio.Task] = {}
+
+
+def registrar_tarea(
+    nombre: str, intervalo_segundos: float, funcion: Callable[[], None]
+) -> None:
+    """Registrar una función síncrona para ejecutarse periódicamente
+
+    La función corre en un hilo (usa sesiones SQLAlchemy síncronas), de modo
+    que no bloquea el event loop que atiende las peticiones.
+    """
+    _tareas.append(TareaPeriodica(nombre, intervalo_segundos, funcion))
+
+
+async def _bucle(tarea: TareaPeriodica) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(tarea.funcion)
+        except Exception:
+            # Un fallo puntual no debe detener las ejecuciones siguientes
+            logger.exception(f"Error ejecutando tarea periódica '{tarea.nombre}'")
+        await asyncio.sleep(tarea.intervalo_segundos)
+
+
+async def iniciar_tareas() -> None:
+    """Lanzar todas las tareas registradas (al iniciar la aplicación)"""
+    for tarea in _tareas:
+        if tarea.nombre not in _en_ejecucion:
+            logger.info(
+                f"Iniciando tarea '{tarea.nombre}' cada {tarea.intervalo_segundos}s"
+            )
+            _en_ejecucion[tarea.nombre] = asyncio.create_task(_bucle(tarea))
+
+
+async def detener_tareas() -> None:
+    """Cancelar las tareas en ejecución (al detener la aplicación)"""
+    for tarea in _en_ejecucion.values():
+        tarea.cancel()
+    await asyncio.gather(*_en_ejecucion.values(), return_exceptions=True)
+    _en_ejecucion.clear()
@@ -0,0 +1,143 @@
+# backend/app/core/telemetria_pool.py
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+# Límites superiores (ms) de los buckets del histograma de espera
+LIMITES_ESPERA_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class TelemetriaPool:
+    """Métricas de un pool de conexiones SQLAlchemy
+
+    La espera de checkout se mide en el pool instrumentado (ver
+    `clase_pool_instrumentada`); conexiones creadas, checkouts, checkins e
+    invalidaciones se cuentan con los eventos del pool.
+    """
+
+    def __init__(self, nombre: str, umbral_lento_ms: float, max_lentos: int = 50):
+        self.nombre = nombre
+        self.umbral_lento_ms = umbral_lento_ms
+        self._lock = threading.Lock()
+        self._histograma = [0] * (len(LIMITES_ESPERA_MS) + 1)
+        self._lentos: deque = deque(maxlen=max_lentos)
+        self.esperas = 0
+        self.espera_total_ms = 0.0
+        self.espera_maxima_ms = 0.0
+        self.timeouts = 0
+        self.conexiones_creadas = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidaciones = 0
+
+    def escuchar(self, engine) -> None:
+        """Registrar los eventos del pool del engine (persisten al recrearlo)"""
+        event.listen(engine, "connect", self._al_conectar)
+        event.listen(engine, "checkout", self._al_checkout)
+        event.listen(engine, "checkin", self._al_checkin)
+        event.listen(engine, "invalidate", self._al_invalidar)
+
+    def _al_conectar(self, *args) -> None:
+        with self._lock:
+            self.conexiones_creadas += 1
+
+    def _al_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _al_checkin(self, *args) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _al_invalidar(self, *args) -> None:
+        with self._lock:
+            self.invalidaciones += 1
+
+    def registrar_espera(self, espera_ms: float, pool: Pool) -> None:
+        indice = next(
+            (i for i, limite in enumerate(LIMITES_ESPERA_MS) if espera_ms <= limite),
+            len(LIMITES_ESPERA_MS),
+        )
+        with self._lock:
+            self._histograma[indice] += 1
+            self.esperas += 1
+            self.espera_total_ms += espera_ms
+            self.espera_maxima_ms = max(self.espera_maxima_ms, espera_ms)
+            if espera_ms >= self.umbral_lento_ms:
+                self._lentos.append(
+                    {
+                        "momento": datetime.now(timezone.utc).isoformat(),
+                        "espera_ms": round(espera_ms, 2),
+                        "en_uso": pool.checkedout(),
+                        "overflow": pool.overflow(),
+                    }
+                )
+
+    def registrar_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def estadisticas(self, pool: Optional[Pool]) -> Dict[str, Any]:
+        with self._lock:
+            histograma = {
+                f"<={limite}ms": cantidad
+                for limite, cantidad in zip(LIMITES_ESPERA_MS, self._histograma)
+            }
+            histograma[f">{LIMITES_ESPERA_MS[-1]}ms"] = self._histograma[-1]
+
+            datos: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "conexiones_creadas": self.conexiones_creadas,
+                "invalidaciones": self.invalidaciones,
+                "timeouts": self.timeouts,
+                "espera_ms": {
+                    "promedio": (
+                        round(self.espera_total_ms / self.esperas, 3)
+                        if self.esperas
+                        else None
+                    ),
+                    "maxima": round(self.espera_maxima_ms, 3),
+                    "histograma": histograma,
+                },
+                "checkouts_lentos": {
+                    "umbral_ms": self.umbral_lento_ms,
+                    "recientes": list(self._lentos),
+                },
+            }
+
+        if pool is not None and hasattr(pool, "checkedout"):
+            datos["pool"] = {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "disponibles": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        return datos
+
+
+def clase_pool_instrumentada(base: type, telemetria: TelemetriaPool) -> type:
+    """Subclase del pool que mide la espera de cada checkout
+
+    Se usa como `poolclass` del engine. Al recrear el pool (dispose)
+    SQLAlchemy usa la misma clase, por lo que la medición se conserva.
+    """
+
+    class PoolInstrumentado(base):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                conexion = super()._do_get()
+            except exc.TimeoutError:
+                telemetria.registrar_timeout()
+                raise
+            telemetria.registrar_espera((time.perf_counter() - inicio) * 1000, self)
+            return conexion
+
+    PoolInstrumentado.__name__ = f"{base.__name__}Instrumentado"
+    return PoolInstrumentado
@@ -0,0 +1,183 @@
+# backend/app/core/typeahead.py
+import bisect
+import heapq
+import itertools
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Set
+
+# Largo de los n-gramas del índice invertido (búsqueda por subcadena)
+LARGO_NGRAMA = 3
+
+# Candidatos por subcadena que se examinan como máximo; acota la latencia
+# cuando el término es muy común (p. ej. "ethernet")
+MAX_CANDIDATOS = 500
+
+
+class EntradaTypeahead(NamedTuple):
+    clave: Hashable  # (tipo, id)
+    tipo: str
+    id: int
+    etiqueta: str
+    detalle: Optional[str]
+    devid: Optional[int]
+    textos: tuple  # Textos normalizados que se indexan
+
+
+def normalizar(texto: Optional[str]) -> str:
+    return (texto or "").strip().lower()
+
+
+def _ngramas(texto: str) -> Set[str]:
+    return {texto[i : i + LARGO_NGRAMA] for i in range(len(texto) - LARGO_NGRAMA + 1)}
+
+
+class IndiceTypeahead:
+    """Índice en memoria para autocompletar (prefijo y subcadena)
+
+    - Prefijo: lista ordenada de (texto, clave) recorrida con bisect, por lo
+      que sirve desde el primer carácter y devuelve primero las mejores
+      coincidencias sin examinar el resto.
+    - Subcadena: índice invertido de trigramas; los candidatos (intersección
+      de los trigramas del término) se verifican contra el texto.
+
+    Las lecturas y las actualizaciones incrementales comparten un lock; la
+    reconstrucción completa se arma fuera del lock y se reemplaza de una vez.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas: Dict[Hashable, EntradaTypeahead] = {}
+        self._ordenados: List[tuple] = []
+        self._ngramas: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    # ------------------------------------------------------------------
+    # Construcción y actualización
+    # ------------------------------------------------------------------
+
+    def reemplazar(self, entradas: Iterable[EntradaTypeahead]) -> None:
+        """Reconstruir el índice completo con las entradas dadas"""
+        nuevo = IndiceTypeahead()
+        for entrada in entradas:
+            nuevo._agregar(entrada, ordenar=False)
+        nuevo._ordenados.sort()
+
+        with self._lock:
+            self._entradas = nuevo._entradas
+            self._ordenados = nuevo._ordenados
+            self._ngramas = nuevo._ngramas
+
+    def actualizar(self, entradas: Iterable[EntradaTypeahead]) -> int:
+        """Insertar o reemplazar entradas (refresco incremental)
+
+        Las entradas idénticas a las ya indexadas se omiten; devuelve cuántas
+        cambiaron.
+        """
+        cantidad = 0
+        with self._lock:
+            for entrada in entradas:
+                if self._entradas.get(entrada.clave) == entrada:
+                    continue
+                self._quitar(entrada.clave)
+                self._agregar(entrada, ordenar=True)
+                cantidad += 1
+        return cantidad
+
+    def _agregar(self, entrada: EntradaTypeahead, ordenar: bool) -> None:
+        self._entradas[entrada.clave] = entrada
+        for texto in entrada.textos:
+            if ordenar:
+                bisect.insort(self._ordenados, (texto, entrada.clave))
+            else:
+                self._ordenados.append((texto, entrada.clave))
+            for ngrama in _ngramas(texto):
+                self._ngramas.setdefault(ngrama, set()).add(entrada.clave)
+
+    def _quitar(self, clave: Hashable) -> None:
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for texto in entrada.textos:
+            posicion = bisect.bisect_left(self._ordenados, (texto, clave))
+            if posicion < len(self._ordenados) and self._ordenados[posicion] == (
+                texto,
+                clave,
+            ):
+                del self._ordenados[posicion]
+            for ngrama in _ngramas(texto):
+                claves = self._ngramas.get(ngrama)
+                if claves is not None:
+                    claves.discard(clave)
+                    if not claves:
+                        del self._ngramas[ngrama]
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def buscar(
+        self, termino: str, limite: int = 10, tipo: Optional[str] = None
+    ) -> List[EntradaTypeahead]:
+        """Mejores `limite` entradas: primero por prefijo, luego por subcadena"""
+
+        termino = normalizar(termino)
+        if not termino:
+            return []
+
+        resultados: List[EntradaTypeahead] = []
+        vistos: Set[Hashable] = set()
+
+        with self._lock:
+            # Coincidencias por prefijo, en orden alfabético del texto
+            posicion = bisect.bisect_left(self._ordenados, (termino,))
+            while posicion < len(self._ordenados) and len(resultados) < limite:
+                texto, clave = self._ordenados[posicion]
+                if not texto.startswith(termino):
+                    break
+                posicion += 1
+                entrada = self._entradas[clave]
+                if clave in vistos or (tipo and entrada.tipo != tipo):
+                    continue
+                vistos.add(clave)
+                resultados.append(entrada)
+
+            faltan = limite - len(resultados)
+            if faltan <= 0 or len(termino) < LARGO_NGRAMA:
+                return resultados
+
+            # Coincidencias por subcadena: intersección de trigramas
+            conjuntos = [self._ngramas.get(n) for n in _ngramas(termino)]
+            if not all(conjuntos):
+                return resultados
+            conjuntos.sort(key=len)
+            candidatos = (
+                conjuntos[0].intersection(*conjuntos[1:])
+                if len(conjuntos) > 1
+                else conjuntos[0]
+            )
+
+            verificadas = (
+                self._entradas[clave]
+                for clave in itertools.islice(candidatos, MAX_CANDIDATOS)
+                if clave not in vistos
+                and (not tipo or self._entradas[clave].tipo == tipo)
+                and any(termino in texto for texto in self._entradas[clave].textos)
+            )
+            # Las etiquetas más cortas son las coincidencias más cercanas
+            resultados.extend(
+                heapq.nsmallest(
+                    faltan, verificadas, key=lambda e: (len(e.etiqueta), e.etiqueta)
+                )
+            )
+
+        return resultados
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "textos": len(self._ordenados),
+                "ngramas": len(self._ngramas),
+            }
@@ -0,0 +1,56 @@
+# backend/app/ingerir_muestras.py
+"""
+Script para cargar muestras de interfaces desde un archivo JSON lines o CSV
+Reporta las filas por segundo, por lo que sirve también como benchmark de la
+ingesta contra una base local.
+
+Uso:
+    python -m app.ingerir_muestras muestras.jsonl
+    python -m app.ingerir_muestras export_jipam.csv --tamano-lote 20000
+"""
+
+import argparse
+import logging
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.ingesta_service import IngestaService
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def ingerir_archivo(ruta: str, formato: str = None, tamano_lote: int = None) -> dict:
+    """Cargar un archivo de muestras y devolver el resumen de la ingesta"""
+
+    if formato is None:
+        formato = "csv" if ruta.endswith(".csv") else "jsonl"
+
+    db = SessionLocal()
+    try:
+        with open(ruta, encoding="utf-8", newline="") as lineas:
+            return IngestaService.ingerir(
+                db,
+                lineas,
+                formato,
+                tamano_lote or settings.INGESTA_TAMANO_LOTE,
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("ruta")
+    parser.add_argument("--formato", choices=["jsonl", "csv"])
+    parser.add_argument("--tamano-lote", type=int)
+    args = parser.parse_args()
+
+    resultado = ingerir_archivo(args.ruta, args.formato, args.tamano_lote)
+    for error in resultado["errores"]:
+        logger.warning(error)
+    logger.info(
+        f"{resultado['filas']} muestras en {resultado['segundos']}s "
+        f"({resultado['filas_por_segundo']} filas/s)"
+    )
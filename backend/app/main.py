@@ -1,13 +1,78 @@
 # backend/app/main.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from app.api import api_router
 from app.core.config import settings
+from app.core.database import dispose_async_engine, estado_pools
+from app.core.security import cache_usuarios, pool_hash
+from app.core.tareas import detener_tareas, iniciar_tareas, registrar_tarea
+from app.services.cambios_service import CambiosService
+from app.services.dispositivos_service import cache_valores_filtros
+from app.services.particiones_service import ParticionesService
+from app.services.resumen_interfaces_service import ResumenInterfacesService
+from app.services.rol_service import cache_arbol_menus, cache_autorizacion
+from app.services.rollup_service import RollupService
+from app.services.stream_service import StreamService
+from app.services.typeahead_service import TypeaheadService
+from app.services.usuario_service import cola_historia
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tareas periódicas de mantenimiento
+    if settings.ROLLUP_HABILITADO:
+        registrar_tarea(
+            "rollup_interfaces",
+            settings.ROLLUP_INTERVALO_SEGUNDOS,
+            RollupService.ejecutar_pendientes,
+        )
+    if settings.PARTICIONES_HABILITADO:
+        registrar_tarea(
+            "particiones_historicos",
+            settings.PARTICIONES_INTERVALO_SEGUNDOS,
+            ParticionesService.ejecutar_mantenimiento,
+        )
+    if settings.TYPEAHEAD_HABILITADO:
+        # La primera ejecución construye el índice al iniciar
+        registrar_tarea(
+            "indice_typeahead",
+            settings.TYPEAHEAD_INTERVALO_SEGUNDOS,
+            TypeaheadService.ejecutar_refresco,
+        )
+    if settings.RESUMEN_INTERFACES_HABILITADO:
+        registrar_tarea(
+            "resumen_interfaces",
+            settings.RESUMEN_INTERFACES_INTERVALO_SEGUNDOS,
+            ResumenInterfacesService.ejecutar_refresco,
+        )
+    if settings.CAMBIOS_HABILITADO:
+        registrar_tarea(
+            "purga_eliminaciones",
+            settings.CAMBIOS_PURGA_INTERVALO_SEGUNDOS,
+            CambiosService.purgar_eliminaciones,
+        )
+
+    cola_historia.iniciar()
+    if settings.STREAM_HABILITADO:
+        await StreamService.iniciar()
+    await iniciar_tareas()
+    yield
+    await detener_tareas()
+    await StreamService.detener()
+    # Escribir la auditoría pendiente antes de cerrar los pools
+    await asyncio.to_thread(cola_historia.detener)
+    pool_hash.shutdown(wait=False)
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title="Sistema de Monitoreo de Red IP",
     description="API para el sistema de visualización de monitoreo de red",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configuración CORS
@@ -31,3 +96,43 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "monitoreo-backend"}
+
+
+@app.get("/health/db")
+async def health_db():
+    """Telemetría de los pools de conexiones de este proceso"""
+    return {
+        "configuracion": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        },
+        **estado_pools(),
+    }
+
+
+@app.get("/health/auditoria")
+async def health_auditoria():
+    """Estado de la cola de auditoría de este proceso"""
+    return cola_historia.estadisticas()
+
+
+@app.get("/health/stream")
+async def health_stream():
+    """Suscriptores y contadores del stream de estado de este proceso"""
+    return StreamService.estadisticas()
+
+
+@app.get("/health/cache")
+async def health_cache():
+    """Contadores de los caches en memoria de este proceso"""
+    return {
+        "usuarios": cache_usuarios.estadisticas(),
+        "valores_filtros": cache_valores_filtros.estadisticas(),
+        "typeahead": TypeaheadService.estadisticas(),
+        "autorizacion": cache_autorizacion.estadisticas(),
+        "arbol_menus": cache_arbol_menus.estadisticas(),
+    }
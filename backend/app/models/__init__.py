@@ -1,12 +1,18 @@
 from app.core.database import Base
 from app.models.dispositivo_historico import DispositivoHistorico
+from app.models.dispositivo_resumen_interfaces import DispositivoResumenInterfaces
 
 # Importar todos los modelos del sistema de Monitoreo
 from app.models.dispositivos import Dispositivos
 
 # Importar todos los modelos del sistema IAM
+from app.models.eliminacion import Eliminacion
 from app.models.estado import Estado
 from app.models.interface_historico import InterfaceHistorico
+from app.models.interface_historico_rollup import (
+    InterfaceHistoricoRollup,
+    RollupWatermark,
+)
 from app.models.interfaces import Interfaces
 from app.models.menu import Menu, MenuGrupo
 from app.models.permiso import Permiso
@@ -33,5 +39,9 @@ __all__ = [
     "Dispositivos",
     "Interfaces",
     "InterfaceHistorico",
+    "InterfaceHistoricoRollup",
+    "RollupWatermark",
     "DispositivoHistorico",
+    "DispositivoResumenInterfaces",
+    "Eliminacion",
 ]
@@ -0,0 +1,37 @@
+from app.core.database import Base
+from sqlalchemy import DECIMAL, Column, DateTime, ForeignKey, Integer
+from sqlalchemy.sql import func
+
+
+class DispositivoResumenInterfaces(Base):
+    """Resumen de las interfaces de cada dispositivo
+
+    Lo mantiene ResumenInterfacesService (ingesta y tarea periódica); los
+    listados de dispositivos lo leen en lugar de agrupar las interfaces.
+    """
+
+    __tablename__ = "dispositivo_resumen_interfaces"
+    __table_args__ = {"schema": "monitoreo"}
+
+    devid = Column(
+        Integer,
+        ForeignKey("monitoreo.dispositivos.devid", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # Conteos de interfaces
+    interfaces_count = Column(Integer, nullable=False, default=0)
+    interfaces_activas = Column(Integer, nullable=False, default=0)  # ifstatus 1
+    interfaces_down = Column(Integer, nullable=False, default=0)  # ifstatus 2
+    interfaces_shutdown = Column(Integer, nullable=False, default=0)  # ifstatus 3
+    interfaces_monitoreadas = Column(Integer, nullable=False, default=0)
+    interfaces_con_errores = Column(Integer, nullable=False, default=0)
+
+    # Utilización de las interfaces monitoreadas (%)
+    utilizacion_maxima = Column(DECIMAL(5, 2))
+    utilizacion_promedio = Column(DECIMAL(5, 2))
+
+    actualizado_en = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DispositivoResumenInterfaces(devid={self.devid}, interfaces_count={self.interfaces_count}, interfaces_down={self.interfaces_down})>"
@@ -0,0 +1,26 @@
+from app.core.database import Base
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+
+class Eliminacion(Base):
+    """Registro de una fila eliminada (tombstone) del feed de cambios
+
+    Lo insertan los triggers del script 14 al borrar dispositivos o
+    interfaces; CambiosService lo lee para informar las bajas y lo purga
+    pasada la retención.
+    """
+
+    __tablename__ = "eliminaciones"
+    __table_args__ = (
+        Index("idx_eliminaciones_tabla_fecha", "tabla", "eliminado_en", "id"),
+        {"schema": "monitoreo"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    tabla = Column(String(50), nullable=False)  # "dispositivos" o "interfaces"
+    clave = Column(Integer, nullable=False)  # devid o id de la fila eliminada
+    eliminado_en = Column(DateTime, nullable=False, default=func.now())
+
+    def __repr__(self):
+        return f"<Eliminacion(tabla='{self.tabla}', clave={self.clave}, eliminado_en={self.eliminado_en})>"
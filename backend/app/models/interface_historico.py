@@ -30,6 +30,9 @@ class InterfaceHistorico(Base):
     )
 
     # Campos principales
+    # Tabla particionada por rango de timestamp (10_particionar_historicos.sql):
+    # la PK en la BD es (id, timestamp), pero id es único por la secuencia y
+    # basta como identidad en el ORM
     id = Column(Integer, primary_key=True, index=True)
     devid = Column(Integer, nullable=False)  # Parte de la composite FK
     devif = Column(Integer, nullable=False)  # Parte de la composite FK
@@ -0,0 +1,73 @@
+from app.core.database import Base
+from sqlalchemy import (
+    DECIMAL,
+    TIMESTAMP,
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    Numeric,
+    String,
+)
+from sqlalchemy.sql import func
+
+
+class InterfaceHistoricoRollup(Base):
+    """Agregados precalculados de interface_historico por bucket de tiempo
+
+    Se guardan sumas y cantidades (no promedios) para poder acumular lotes
+    nuevos sobre un bucket ya existente: promedio = suma / cuenta.
+    """
+
+    __tablename__ = "interface_historico_rollup"
+    # La PK (periodo, devid, devif, bucket) cubre las lecturas por rango
+    __table_args__ = {"schema": "monitoreo"}
+
+    # Clave: periodo ('5min', 'hourly', 'daily') + interface + inicio del bucket
+    periodo = Column(String(10), primary_key=True)
+    devid = Column(Integer, primary_key=True)
+    devif = Column(Integer, primary_key=True)
+    bucket = Column(TIMESTAMP(timezone=True), primary_key=True)
+
+    # Tráfico de entrada (bps)
+    input_suma = Column(Numeric)
+    input_cuenta = Column(Integer)
+    input_minimo = Column(BigInteger)
+    input_maximo = Column(BigInteger)
+
+    # Tráfico de salida (bps)
+    output_suma = Column(Numeric)
+    output_cuenta = Column(Integer)
+    output_minimo = Column(BigInteger)
+    output_maximo = Column(BigInteger)
+
+    # Utilización (%)
+    ifutil_suma = Column(Numeric)
+    ifutil_cuenta = Column(Integer)
+    ifutil_minimo = Column(DECIMAL(5, 2))
+    ifutil_maximo = Column(DECIMAL(5, 2))
+
+    # Calidad de enlace
+    errores_total = Column(BigInteger)  # ifinerr + ifouterr
+    descartes_total = Column(BigInteger)  # ifindis + ifoutdis
+
+    muestras = Column(Integer, nullable=False)  # Muestras acumuladas en el bucket
+
+    actualizado_en = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<InterfaceHistoricoRollup(periodo={self.periodo}, devid={self.devid}, devif={self.devif}, bucket={self.bucket}, muestras={self.muestras})>"
+
+
+class RollupWatermark(Base):
+    """Último id de interface_historico ya incorporado a los rollups"""
+
+    __tablename__ = "rollup_watermark"
+    __table_args__ = {"schema": "monitoreo"}
+
+    nombre = Column(String(50), primary_key=True)
+    ultimo_id = Column(BigInteger, nullable=False, default=0)
+    actualizado_en = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RollupWatermark(nombre={self.nombre}, ultimo_id={self.ultimo_id})>"
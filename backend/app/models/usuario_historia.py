@@ -1,13 +1,18 @@
 # backend/app/models/usuario_historia.py
 from app.core.database import Base
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 
 class UsuarioHistoria(Base):
     __tablename__ = "usuario_historia"
-    __table_args__ = {"schema": "seguridad"}
+    __table_args__ = (
+        # Historial por usuario y listado completo, en orden (fecha, id)
+        Index("idx_usuario_historia_usuario_fecha", "usuario_id", "fecha", "id"),
+        Index("idx_usuario_historia_fecha", "fecha", "id"),
+        {"schema": "seguridad"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("seguridad.usuario.id"))
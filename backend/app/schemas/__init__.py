@@ -16,14 +16,20 @@ from app.schemas.dispositivo_historico import (
 
 # Schemas de Monitoreo
 from app.schemas.dispositivos import (
+    CambiosDispositivosResponse,
     DispositivosBase,
     DispositivosDetallado,
+    DispositivosDetalleCompleto,
     DispositivosEstadisticas,
     DispositivosFiltros,
     DispositivosListResponse,
     DispositivosResponse,
+    MapaCluster,
+    MapaDispositivo,
+    MapaResponse,
 )
 from app.schemas.estado import EstadoBase, EstadoCreate, EstadoResponse, EstadoUpdate
+from app.schemas.ingesta import IngestaResultado
 from app.schemas.interface_historico import (
     InterfaceHistoricoAgregado,
     InterfaceHistoricoBase,
@@ -36,8 +42,10 @@ from app.schemas.interface_historico import (
     SerieTemporalResponse,
 )
 from app.schemas.interfaces import (
+    CambiosInterfacesResponse,
     InterfacesBase,
     InterfacesDetallado,
+    InterfacesDetalladoLista,
     InterfacesFiltros,
     InterfacesListResponse,
     InterfacesMetricas,
@@ -64,6 +72,8 @@ from app.schemas.permiso import (
     PermisoUpdate,
 )
 from app.schemas.rol import (
+    AsignacionMasiva,
+    AsignacionMasivaResponse,
     RolBase,
     RolConPermisos,
     RolCreate,
@@ -71,8 +81,11 @@ from app.schemas.rol import (
     RolPermisoResponse,
     RolResponse,
     RolUpdate,
+    VerificacionAccesos,
+    VerificacionAccesosResponse,
 )
 from app.schemas.token import Token, TokenData
+from app.schemas.typeahead import TypeaheadResponse, TypeaheadResultado
 from app.schemas.usuario import (
     UsuarioBase,
     UsuarioChangePassword,
@@ -87,6 +100,7 @@ from app.schemas.usuario_historia import (
     UsuarioHistoriaBase,
     UsuarioHistoriaCreate,
     UsuarioHistoriaDetallada,
+    UsuarioHistoriaListResponse,
     UsuarioHistoriaResponse,
 )
 
@@ -121,6 +135,10 @@ __all__ = [
     "RolConPermisos",
     "RolPermisoCreate",
     "RolPermisoResponse",
+    "AsignacionMasiva",
+    "AsignacionMasivaResponse",
+    "VerificacionAccesos",
+    "VerificacionAccesosResponse",
     # Menu
     "MenuGrupoBase",
     "MenuGrupoCreate",
@@ -139,20 +157,28 @@ __all__ = [
     "UsuarioHistoriaCreate",
     "UsuarioHistoriaResponse",
     "UsuarioHistoriaDetallada",
+    "UsuarioHistoriaListResponse",
     # Monitoreo - Dispositivos
     "DispositivosBase",
     "DispositivosResponse",
     "DispositivosDetallado",
+    "DispositivosDetalleCompleto",
     "DispositivosFiltros",
     "DispositivosListResponse",
     "DispositivosEstadisticas",
+    "MapaCluster",
+    "MapaDispositivo",
+    "MapaResponse",
+    "CambiosDispositivosResponse",
     # Monitoreo - Interfaces
     "InterfacesBase",
     "InterfacesResponse",
     "InterfacesDetallado",
+    "InterfacesDetalladoLista",
     "InterfacesFiltros",
     "InterfacesListResponse",
     "InterfacesMetricas",
+    "CambiosInterfacesResponse",
     # Monitoreo - Interface Hist�rico
     "InterfaceHistoricoBase",
     "InterfaceHistoricoResponse",
@@ -163,6 +189,11 @@ __all__ = [
     "InterfaceHistoricoAgregado",
     "InterfaceTendencias",
     "InterfaceHistoricoListResponse",
+    # Monitoreo - Ingesta
+    "IngestaResultado",
+    # Monitoreo - Typeahead
+    "TypeaheadResultado",
+    "TypeaheadResponse",
     # Monitoreo - Dispositivo Hist�rico
     "DispositivoHistoricoBase",
     "DispositivoHistoricoResponse",
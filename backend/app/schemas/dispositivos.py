@@ -4,6 +4,7 @@ from decimal import Decimal
 from ipaddress import IPv4Address
 from typing import List, Optional
 
+from app.schemas.interfaces import InterfacesDetallado
 from pydantic import BaseModel, validator
 
 
@@ -37,6 +38,12 @@ class DispositivosDetallado(DispositivosResponse):
     devstatus_nombre: Optional[str] = None
     interfaces_count: Optional[int] = None
     interfaces_activas: Optional[int] = None
+    interfaces_down: Optional[int] = None
+    interfaces_shutdown: Optional[int] = None
+    interfaces_monitoreadas: Optional[int] = None
+    interfaces_con_errores: Optional[int] = None
+    utilizacion_maxima: Optional[float] = None
+    utilizacion_promedio: Optional[float] = None
 
     @validator("devstatus_nombre", pre=False, always=True)
     def get_status_name(cls, v, values):
@@ -51,6 +58,62 @@ class DispositivosDetallado(DispositivosResponse):
         return v
 
 
+# Schema del detalle de un dispositivo (resumen de sus interfaces)
+class DispositivosDetalleCompleto(DispositivosDetallado):
+    top_utilizadas: List[InterfacesDetallado] = []
+
+
+# Schemas del mapa (bbox + zoom)
+class MapaDispositivo(BaseModel):
+    devid: int
+    devname: Optional[str] = None
+    zona: Optional[str] = None
+    area: Optional[str] = None
+    devstatus: Optional[int] = None
+    devstatus_nombre: Optional[str] = None
+    latitud: float
+    longitud: float
+    enterprise: Optional[str] = None
+    modelo: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+    @validator("devstatus_nombre", pre=False, always=True)
+    def get_status_name(cls, v, values):
+        if "devstatus" in values:
+            status_map = {
+                0: "No responde",
+                1: "UP",
+                2: "Caído",
+                5: "Fuera de monitoreo",
+            }
+            return status_map.get(values["devstatus"], "Desconocido")
+        return v
+
+
+class MapaCluster(BaseModel):
+    latitud: float
+    longitud: float
+    cantidad: int
+    up: int
+    no_responde: int
+    caidos: int
+    fuera_monitoreo: int
+    # Sólo en celdas de un único dispositivo
+    devid: Optional[int] = None
+
+
+class MapaResponse(BaseModel):
+    modo: str  # "clusters" o "dispositivos"
+    zoom: int
+    total: int
+    truncado: bool = False
+    tamano_celda: Optional[float] = None
+    clusters: List[MapaCluster] = []
+    dispositivos: List[MapaDispositivo] = []
+
+
 # Filtros para consultas
 class DispositivosFiltros(BaseModel):
     operador: Optional[str] = None
@@ -61,18 +124,34 @@ class DispositivosFiltros(BaseModel):
     devstatus: Optional[int] = None
     solo_activos: Optional[bool] = False
     con_geolocalizacion: Optional[bool] = False
+    # Según el resumen de interfaces
+    min_interfaces_down: Optional[int] = None
+    min_utilizacion: Optional[float] = None
 
 
 # Schema para listado con paginación
 class DispositivosListResponse(BaseModel):
     dispositivos: List[DispositivosDetallado]
-    total: int
-    pagina: int
+    # total es None cuando se omite el conteo (modo_total=omitir)
+    total: Optional[int] = None
+    total_estimado: bool = False
+    # pagina es None en modo cursor (keyset)
+    pagina: Optional[int] = None
     por_pagina: int
-    total_paginas: int
+    total_paginas: Optional[int] = None
+    siguiente_cursor: Optional[str] = None
     filtros_aplicados: Optional[DispositivosFiltros] = None
 
 
+# Feed de cambios desde un cursor (/dispositivos/cambios)
+class CambiosDispositivosResponse(BaseModel):
+    cambios: List[DispositivosResponse]
+    # devid de los dispositivos eliminados
+    eliminados: List[int] = []
+    siguiente_cursor: str
+    hay_mas: bool = False
+
+
 # Schema para estadísticas
 class DispositivosEstadisticas(BaseModel):
     total_dispositivos: int
@@ -84,3 +163,5 @@ class DispositivosEstadisticas(BaseModel):
     por_operador: dict
     por_zona: dict
     por_enterprise: dict
+    # Reporte de consultas ejecutadas (solo si se solicita)
+    tiempos_consulta: Optional[dict] = None
@@ -0,0 +1,16 @@
+# backend/app/schemas/ingesta.py
+from typing import List
+
+from pydantic import BaseModel
+
+
+class IngestaResultado(BaseModel):
+    """Resumen de una carga de muestras de interfaces"""
+
+    filas: int  # Muestras aplicadas (estado actual + histórico)
+    lotes: int  # Transacciones confirmadas
+    rechazadas: int  # Líneas inválidas o de dispositivos inexistentes
+    lotes_fallidos: int = 0  # Lotes revertidos por un error de la base
+    errores: List[str] = []  # Primeros errores encontrados
+    segundos: float
+    filas_por_segundo: float
@@ -73,8 +73,9 @@ class SerieTemporalRequest(BaseModel):
     fecha_inicio: datetime
     fecha_fin: datetime
     metrica: str  # 'input', 'output', 'ifutil', 'ifinerr', etc.
-    agregacion: Optional[str] = "raw"  # 'raw', 'hourly', 'daily'
+    agregacion: Optional[str] = "raw"  # 'raw', '5min', 'hourly', 'daily'
     incluir_nulos: Optional[bool] = False
+    max_puntos: int = 2000  # Límite de puntos para 'raw' (se reduce a mín/máx)
 
 
 # Respuesta de serie temporal
@@ -85,6 +86,7 @@ class SerieTemporalResponse(BaseModel):
     fecha_inicio: datetime
     fecha_fin: datetime
     total_puntos: int
+    puntos_originales: Optional[int] = None  # Muestras antes de agregar/reducir
     datos: List[dict]  # [{"timestamp": "...", "valor": ...}, ...]
 
 
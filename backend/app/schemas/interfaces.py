@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, TypeAdapter, validator
 
 
 class InterfacesBase(BaseModel):
@@ -129,6 +129,12 @@ class InterfacesDetallado(InterfacesResponse):
         return v
 
 
+# Validador compilado de una página completa: una sola llamada a pydantic-core
+# por lista en lugar de construir cada InterfacesDetallado por separado.
+# Acepta las filas proyectadas del servicio con from_attributes=True
+InterfacesDetalladoLista = TypeAdapter(List[InterfacesDetallado])
+
+
 # Filtros para consultas
 class InterfacesFiltros(BaseModel):
     devid: Optional[int] = None
@@ -147,13 +153,26 @@ class InterfacesFiltros(BaseModel):
 # Schema para listado con paginación
 class InterfacesListResponse(BaseModel):
     interfaces: List[InterfacesDetallado]
-    total: int
-    pagina: int
+    # total es None cuando se omite el conteo (modo_total=omitir)
+    total: Optional[int] = None
+    total_estimado: bool = False
+    # pagina es None en modo cursor (keyset)
+    pagina: Optional[int] = None
     por_pagina: int
-    total_paginas: int
+    total_paginas: Optional[int] = None
+    siguiente_cursor: Optional[str] = None
     filtros_aplicados: Optional[InterfacesFiltros] = None
 
 
+# Feed de cambios desde un cursor (/interfaces/cambios)
+class CambiosInterfacesResponse(BaseModel):
+    cambios: List[InterfacesDetallado]
+    # id de las interfaces eliminadas
+    eliminados: List[int] = []
+    siguiente_cursor: str
+    hay_mas: bool = False
+
+
 # Schema para métricas agregadas
 class InterfacesMetricas(BaseModel):
     total_interfaces: int
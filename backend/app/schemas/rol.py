@@ -1,6 +1,6 @@
 # backend/app/schemas/rol.py
 from datetime import datetime
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -41,6 +41,32 @@ class RolPermisoCreate(BaseModel):
     estado_id: Optional[int] = 1  # Activo por defecto
 
 
+# Asignación masiva: conjunto completo de permisos o menús deseados del rol
+class AsignacionMasiva(BaseModel):
+    ids: List[int]
+    estado_id: Optional[int] = 1  # Activo por defecto
+
+
+class AsignacionMasivaResponse(BaseModel):
+    rol_id: int
+    agregados: int
+    actualizados: int
+    eliminados: int
+    sin_cambios: int
+
+
+# Verificación de varios permisos y menús en una sola petición
+class VerificacionAccesos(BaseModel):
+    permisos: List[str] = []
+    menus: List[str] = []
+
+
+class VerificacionAccesosResponse(BaseModel):
+    rol_id: int
+    permisos: Dict[str, bool] = {}
+    menus: Dict[str, bool] = {}
+
+
 class RolPermisoResponse(BaseModel):
     rol_id: int
     permiso_id: int
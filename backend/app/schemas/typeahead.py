@@ -0,0 +1,18 @@
+# backend/app/schemas/typeahead.py
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class TypeaheadResultado(BaseModel):
+    tipo: str  # dispositivo o interface
+    id: int  # devid o id de interface
+    etiqueta: str
+    detalle: Optional[str] = None  # IP, o dispositivo y alias de la interface
+    devid: Optional[int] = None
+
+
+class TypeaheadResponse(BaseModel):
+    resultados: List[TypeaheadResultado]
+    # memoria (índice del proceso) o base_datos (índice aún no disponible)
+    fuente: str
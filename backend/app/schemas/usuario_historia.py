@@ -1,6 +1,6 @@
 # backend/app/schemas/usuario_historia.py
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -34,3 +34,16 @@ class UsuarioHistoriaResponse(BaseModel):
 class UsuarioHistoriaDetallada(UsuarioHistoriaResponse):
     rol_nombre: Optional[str] = None
     estado_nombre: Optional[str] = None
+
+
+# Schema para listado del historial (paginación keyset)
+class UsuarioHistoriaListResponse(BaseModel):
+    historia: List[UsuarioHistoriaResponse]
+    # total es None cuando se omite el conteo (modo_total=omitir)
+    total: Optional[int] = None
+    total_estimado: bool = False
+    # pagina es None en modo cursor (keyset)
+    pagina: Optional[int] = None
+    por_pagina: int
+    total_paginas: Optional[int] = None
+    siguiente_cursor: Optional[str] = None
@@ -0,0 +1,159 @@
+# backend/app/services/cambios_service.py
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import codificar_cursor, decodificar_cursor
+from app.models.dispositivos import Dispositivos
+from app.models.eliminacion import Eliminacion
+from app.models.interfaces import Interfaces
+from app.services.interfaces_service import InterfacesService
+from sqlalchemy import delete, exists, select, tuple_
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class FuenteCambios(NamedTuple):
+    """Tabla publicada en el feed: modelo, columna clave y consulta de filas"""
+
+    modelo: Any
+    clave: Any
+    consulta: Any
+
+
+FUENTES = {
+    "dispositivos": FuenteCambios(
+        Dispositivos, Dispositivos.devid, lambda db: db.query(Dispositivos)
+    ),
+    "interfaces": FuenteCambios(
+        Interfaces, Interfaces.id, InterfacesService._consulta_listado
+    ),
+}
+
+
+class CursorVencido(ValueError):
+    """El cursor es anterior a la retención de las eliminaciones"""
+
+
+def _posterior(fecha: Any, horizonte: datetime) -> bool:
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha > horizonte
+
+
+class CambiosService:
+
+    @staticmethod
+    def get_cambios(
+        db: Session,
+        tabla: str,
+        cursor: Optional[str] = None,
+        limit: int = 500,
+    ) -> Dict[str, Any]:
+        """Filas modificadas y claves eliminadas desde el cursor
+
+        Sin cursor se recorre la tabla completa en orden de updated_at (carga
+        inicial) y las eliminaciones se leen desde ese momento. El cursor
+        guarda la posición (updated_at, clave) de ambos recorridos y cada
+        consulta continúa estrictamente desde ella. Cuando no quedan páginas,
+        la posición se retrocede hasta el horizonte (ahora menos
+        CAMBIOS_MARGEN_SEGUNDOS): las filas de transacciones confirmadas tarde,
+        con un updated_at anterior al de filas ya leídas, aparecen en la
+        consulta siguiente. El cliente puede recibir repetidas las filas de
+        ese margen y las aplica de nuevo.
+
+        Las eliminaciones de claves que volvieron a existir se omiten. Lanza
+        CursorVencido si el cursor es más viejo que la retención y ValueError
+        si es inválido.
+        """
+
+        fuente = FUENTES[tabla]
+        nombre_cursor = f"cambios_{tabla}"
+        ahora = datetime.now(timezone.utc)
+        horizonte = ahora - timedelta(seconds=settings.CAMBIOS_MARGEN_SEGUNDOS)
+
+        if cursor:
+            valores = decodificar_cursor(nombre_cursor, cursor)
+            if len(valores) != 5 or not isinstance(valores[4], datetime):
+                raise ValueError("Cursor inválido")
+            fecha, clave, fecha_baja, id_baja, emitido = valores
+            if emitido < ahora - timedelta(days=settings.CAMBIOS_RETENCION_DIAS):
+                raise CursorVencido(
+                    "El cursor es anterior a la retención de eliminaciones; "
+                    "se debe resincronizar sin cursor"
+                )
+        else:
+            fecha, clave = None, None
+            fecha_baja, id_baja = horizonte, 0
+
+        # Filas modificadas
+        actualizado = fuente.modelo.updated_at
+        query = fuente.consulta(db).filter(actualizado.isnot(None))
+        if fecha is not None:
+            query = query.filter(
+                tuple_(actualizado, fuente.clave) > tuple_(fecha, clave)
+            )
+        filas = query.order_by(actualizado, fuente.clave).limit(limit + 1).all()
+        hay_mas_cambios = len(filas) > limit
+        filas = filas[:limit]
+        if filas:
+            ultima = filas[-1]
+            fecha = ultima.updated_at
+            clave = getattr(ultima, fuente.clave.key)
+
+        # Eliminaciones de claves que no volvieron a existir
+        e = Eliminacion
+        bajas = db.execute(
+            select(e.id, e.clave, e.eliminado_en)
+            .where(
+                e.tabla == tabla,
+                tuple_(e.eliminado_en, e.id) > tuple_(fecha_baja, id_baja),
+                ~exists().where(fuente.clave == e.clave),
+            )
+            .order_by(e.eliminado_en, e.id)
+            .limit(limit + 1)
+        ).all()
+        hay_mas_bajas = len(bajas) > limit
+        bajas = bajas[:limit]
+        if bajas:
+            fecha_baja, id_baja = bajas[-1].eliminado_en, bajas[-1].id
+
+        hay_mas = hay_mas_cambios or hay_mas_bajas
+        if not hay_mas:
+            if fecha is None or _posterior(fecha, horizonte):
+                fecha, clave = horizonte, 0
+            if _posterior(fecha_baja, horizonte):
+                fecha_baja, id_baja = horizonte, 0
+
+        return {
+            "cambios": filas,
+            "eliminados": list(dict.fromkeys(baja.clave for baja in bajas)),
+            "siguiente_cursor": codificar_cursor(
+                nombre_cursor, [fecha, clave, fecha_baja, id_baja, ahora]
+            ),
+            "hay_mas": hay_mas,
+        }
+
+    @staticmethod
+    def purgar_eliminaciones() -> None:
+        """Tarea periódica: borrar las eliminaciones fuera de la retención"""
+
+        limite = datetime.now(timezone.utc) - timedelta(
+            days=settings.CAMBIOS_RETENCION_DIAS
+        )
+        db = SessionLocal()
+        try:
+            borradas = db.execute(
+                delete(Eliminacion).where(Eliminacion.eliminado_en < limite)
+            ).rowcount
+            db.commit()
+            if borradas:
+                logger.info(f"Feed de cambios: {borradas} eliminaciones purgadas")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
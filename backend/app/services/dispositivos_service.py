@@ -1,12 +1,75 @@
 # backend/app/services/dispositivos_service.py
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.busqueda import condicion_ip, condicion_texto, prefijo_ip, relevancia
+from app.core.cache import CacheTTL
+from app.core.config import settings
+from app.core.mapa import Bbox, condicion_bbox, indice_celda, tamano_celda
+from app.core.pagination import ClaveOrden, Conteo, contar_total, paginar
+from app.models.dispositivo_resumen_interfaces import DispositivoResumenInterfaces
 from app.models.dispositivos import Dispositivos
 from app.models.interfaces import Interfaces
 from app.schemas.dispositivos import DispositivosFiltros
+from app.services.interfaces_service import InterfacesService
+from app.services.resumen_interfaces_service import (
+    COLUMNAS_RESUMEN,
+    CONTADORES_RESUMEN,
+    ResumenInterfacesService,
+)
 from sqlalchemy import and_, asc, func, or_
 from sqlalchemy.orm import Session
 
+# Valores de filtros por versión de la tabla (ver version_filtros)
+cache_valores_filtros = CacheTTL(
+    maximo=4, ttl_segundos=settings.CACHE_FILTROS_TTL_SEGUNDOS
+)
+
+# Órdenes de los listados; también definen las claves de los cursores keyset
+ORDEN_DEVNAME = [
+    ClaveOrden(Dispositivos.devname, False, lambda d: d.devname),
+    ClaveOrden(Dispositivos.devid, False, lambda d: d.devid),
+]
+
+# Variante para filas (Dispositivos, ...): conteos de interfaces o relevancia
+ORDEN_DEVNAME_CON_CONTEO = [
+    ClaveOrden(Dispositivos.devname, False, lambda fila: fila[0].devname),
+    ClaveOrden(Dispositivos.devid, False, lambda fila: fila[0].devid),
+]
+
+
+def _orden_resumen(expresion, valor) -> List[ClaveOrden]:
+    """Orden descendente por una columna del resumen, luego por nombre"""
+    return [ClaveOrden(expresion, True, valor)] + ORDEN_DEVNAME_CON_CONTEO
+
+
+# Órdenes de get_with_interfaces_count: parámetro `orden` -> (nombre, claves)
+ORDENES_RESUMEN = {
+    "nombre": ("devname", ORDEN_DEVNAME_CON_CONTEO),
+    "interfaces_down": (
+        "interfaces_down",
+        _orden_resumen(
+            func.coalesce(DispositivoResumenInterfaces.interfaces_down, 0),
+            lambda fila: fila.interfaces_down,
+        ),
+    ),
+    "interfaces": (
+        "interfaces",
+        _orden_resumen(
+            func.coalesce(DispositivoResumenInterfaces.interfaces_count, 0),
+            lambda fila: fila.interfaces_count,
+        ),
+    ),
+    "utilizacion": (
+        "utilizacion",
+        _orden_resumen(
+            func.coalesce(DispositivoResumenInterfaces.utilizacion_maxima, -1),
+            lambda fila: (
+                fila.utilizacion_maxima if fila.utilizacion_maxima is not None else -1
+            ),
+        ),
+    ),
+}
+
 
 class DispositivosService:
 
@@ -72,68 +135,54 @@ class DispositivosService:
         return db.query(Dispositivos).filter(Dispositivos.devid == devid).first()
 
     @staticmethod
-    def get_estadisticas(db: Session) -> Dict[str, Any]:
-        """Obtener estadísticas generales de dispositivos"""
-
-        # Estadísticas por estado
-        stats_estado = (
-            db.query(
-                Dispositivos.devstatus, func.count(Dispositivos.devid).label("count")
-            )
-            .group_by(Dispositivos.devstatus)
-            .all()
+    def get_detalle(
+        db: Session, devid: int, top_n: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """Dispositivo con el resumen de sus interfaces
+
+        Los conteos por estado y la utilización salen de un único agregado
+        (PK del dispositivo + índice por devid de interfaces); el top de
+        utilización es una segunda consulta sobre el mismo índice.
+        """
+
+        # Mismos agregados que dispositivo_resumen_interfaces, pero en vivo
+        agregados = ResumenInterfacesService.agregados()
+        fila = (
+            db.query(Dispositivos, *[agregados[c].label(c) for c in COLUMNAS_RESUMEN])
+            .outerjoin(Interfaces)
+            .filter(Dispositivos.devid == devid)
+            .group_by(Dispositivos.devid)
+            .first()
         )
 
-        # Estadísticas por operador
-        stats_operador = (
-            db.query(
-                Dispositivos.operador, func.count(Dispositivos.devid).label("count")
-            )
-            .filter(Dispositivos.operador.isnot(None))
-            .group_by(Dispositivos.operador)
-            .all()
-        )
+        if fila is None:
+            return None
 
-        # Estadísticas por zona
-        stats_zona = (
-            db.query(Dispositivos.zona, func.count(Dispositivos.devid).label("count"))
-            .filter(Dispositivos.zona.isnot(None))
-            .group_by(Dispositivos.zona)
-            .all()
+        detalle = dict(fila._mapping)
+        detalle["dispositivo"] = detalle.pop("Dispositivos")
+        detalle["top_utilizadas"] = InterfacesService.get_top_utilizadas(
+            db, top_n, devid=devid
         )
+        return detalle
 
-        # Estadísticas por fabricante
-        stats_enterprise = (
-            db.query(
-                Dispositivos.enterprise, func.count(Dispositivos.devid).label("count")
+    @staticmethod
+    def get_estadisticas(db: Session) -> Dict[str, Any]:
+        """Obtener estadísticas generales de dispositivos
+
+        Todos los desgloses (estado, operador, zona, fabricante) salen de un
+        único recorrido de la tabla: GROUPING SETS en PostgreSQL y, en otros
+        motores (SQLite en pruebas), un reductor en Python de una sola pasada.
+        """
+
+        if db.get_bind().dialect.name == "postgresql":
+            por_estado, por_dimension = DispositivosService._estadisticas_grouping_sets(
+                db
             )
-            .filter(Dispositivos.enterprise.isnot(None))
-            .group_by(Dispositivos.enterprise)
-            .all()
-        )
+        else:
+            por_estado, por_dimension = DispositivosService._estadisticas_reductor(db)
 
-        # Calcular totales
-        total_dispositivos = db.query(func.count(Dispositivos.devid)).scalar()
-        dispositivos_up = (
-            db.query(func.count(Dispositivos.devid))
-            .filter(Dispositivos.devstatus == 1)
-            .scalar()
-        )
-        dispositivos_down = (
-            db.query(func.count(Dispositivos.devid))
-            .filter(Dispositivos.devstatus == 2)
-            .scalar()
-        )
-        dispositivos_no_responden = (
-            db.query(func.count(Dispositivos.devid))
-            .filter(Dispositivos.devstatus == 0)
-            .scalar()
-        )
-        dispositivos_fuera_monitoreo = (
-            db.query(func.count(Dispositivos.devid))
-            .filter(Dispositivos.devstatus == 5)
-            .scalar()
-        )
+        total_dispositivos = sum(por_estado.values())
+        dispositivos_up = por_estado.get(1, 0)
 
         # Calcular porcentaje de disponibilidad
         porcentaje_disponibilidad = (
@@ -143,39 +192,124 @@ class DispositivosService:
         )
 
         return {
-            "total_dispositivos": total_dispositivos or 0,
-            "dispositivos_up": dispositivos_up or 0,
-            "dispositivos_down": dispositivos_down or 0,
-            "dispositivos_no_responden": dispositivos_no_responden or 0,
-            "dispositivos_fuera_monitoreo": dispositivos_fuera_monitoreo or 0,
+            "total_dispositivos": total_dispositivos,
+            "dispositivos_up": dispositivos_up,
+            "dispositivos_down": por_estado.get(2, 0),
+            "dispositivos_no_responden": por_estado.get(0, 0),
+            "dispositivos_fuera_monitoreo": por_estado.get(5, 0),
             "porcentaje_disponibilidad": round(porcentaje_disponibilidad, 2),
-            "por_operador": {row.operador: row.count for row in stats_operador},
-            "por_zona": {row.zona: row.count for row in stats_zona},
-            "por_enterprise": {row.enterprise: row.count for row in stats_enterprise},
+            "por_operador": por_dimension["operador"],
+            "por_zona": por_dimension["zona"],
+            "por_enterprise": por_dimension["enterprise"],
         }
 
     @staticmethod
-    def get_with_interfaces_count(
+    def _estadisticas_grouping_sets(
         db: Session,
-        skip: int = 0,
-        limit: int = 50,
-        filtros: Optional[DispositivosFiltros] = None,
-    ) -> Tuple[List[Dict], int]:
-        """Obtener dispositivos con conteo de interfaces"""
+    ) -> Tuple[Dict[Any, int], Dict[str, Dict[str, int]]]:
+        """Desgloses en una sola consulta con GROUPING SETS (PostgreSQL)"""
+
+        columnas = {
+            "devstatus": Dispositivos.devstatus,
+            "operador": Dispositivos.operador,
+            "zona": Dispositivos.zona,
+            "enterprise": Dispositivos.enterprise,
+        }
 
-        # Query base con join a interfaces
-        query = (
+        filas = (
             db.query(
-                Dispositivos,
-                func.count(Interfaces.id).label("interfaces_count"),
-                func.sum(func.case((Interfaces.ifstatus == 1, 1), else_=0)).label(
-                    "interfaces_activas"
-                ),
+                *columnas.values(),
+                *[
+                    func.grouping(columna).label(f"g_{nombre}")
+                    for nombre, columna in columnas.items()
+                ],
+                func.count(Dispositivos.devid).label("count"),
             )
-            .outerjoin(Interfaces)
-            .group_by(Dispositivos.devid)
+            .group_by(func.grouping_sets(*columnas.values()))
+            .all()
         )
 
+        por_estado: Dict[Any, int] = {}
+        por_dimension: Dict[str, Dict[str, int]] = {
+            "operador": {},
+            "zona": {},
+            "enterprise": {},
+        }
+
+        # GROUPING(col) = 0 indica el conjunto al que pertenece la fila
+        for fila in filas:
+            if fila.g_devstatus == 0:
+                por_estado[fila.devstatus] = fila.count
+                continue
+
+            for nombre in por_dimension:
+                valor = getattr(fila, nombre)
+                if getattr(fila, f"g_{nombre}") == 0 and valor is not None:
+                    por_dimension[nombre][valor] = fila.count
+
+        return por_estado, por_dimension
+
+    @staticmethod
+    def _estadisticas_reductor(
+        db: Session,
+    ) -> Tuple[Dict[Any, int], Dict[str, Dict[str, int]]]:
+        """Desgloses con un reductor en Python de una pasada (fallback)"""
+
+        filas = db.query(
+            Dispositivos.devstatus,
+            Dispositivos.operador,
+            Dispositivos.zona,
+            Dispositivos.enterprise,
+        ).all()
+
+        por_estado: Dict[Any, int] = {}
+        por_dimension: Dict[str, Dict[str, int]] = {
+            "operador": {},
+            "zona": {},
+            "enterprise": {},
+        }
+
+        for devstatus, operador, zona, enterprise in filas:
+            por_estado[devstatus] = por_estado.get(devstatus, 0) + 1
+
+            for nombre, valor in (
+                ("operador", operador),
+                ("zona", zona),
+                ("enterprise", enterprise),
+            ):
+                if valor is not None:
+                    conteo = por_dimension[nombre]
+                    conteo[valor] = conteo.get(valor, 0) + 1
+
+        return por_estado, por_dimension
+
+    @staticmethod
+    def get_with_interfaces_count(
+        db: Session,
+        skip: int = 0,
+        limit: int = 50,
+        filtros: Optional[DispositivosFiltros] = None,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+        orden: str = "nombre",
+    ) -> Tuple[List[Dict], Conteo, Optional[str]]:
+        """Obtener dispositivos con el resumen de sus interfaces
+
+        Los conteos salen de dispositivo_resumen_interfaces (mantenida por
+        ResumenInterfacesService), sin agrupar las interfaces por petición.
+        """
+
+        resumen = DispositivoResumenInterfaces
+        query = db.query(
+            Dispositivos,
+            *[
+                func.coalesce(getattr(resumen, c), 0).label(c)
+                for c in CONTADORES_RESUMEN
+            ],
+            resumen.utilizacion_maxima,
+            resumen.utilizacion_promedio,
+        ).outerjoin(resumen, resumen.devid == Dispositivos.devid)
+
         # Aplicar filtros
         if filtros:
             if filtros.operador:
@@ -211,50 +345,214 @@ class DispositivosService:
                     )
                 )
 
+            if filtros.min_interfaces_down is not None:
+                # Sin fila de resumen el dispositivo no tiene interfaces caídas
+                query = query.filter(
+                    func.coalesce(resumen.interfaces_down, 0)
+                    >= filtros.min_interfaces_down
+                )
+
+            if filtros.min_utilizacion is not None:
+                query = query.filter(
+                    resumen.utilizacion_maxima >= filtros.min_utilizacion
+                )
+
         # Contar total
-        total = query.count()
+        conteo = contar_total(db, query, modo_total)
 
         # Aplicar paginación
-        resultados = (
-            query.order_by(asc(Dispositivos.devname)).offset(skip).limit(limit).all()
+        nombre_orden, claves = ORDENES_RESUMEN[orden]
+        resultados, siguiente_cursor = paginar(
+            query, nombre_orden, claves, skip, limit, cursor
         )
 
         # Convertir a formato de respuesta
         dispositivos_con_info = []
-        for dispositivo, interfaces_count, interfaces_activas in resultados:
-            dispositivos_con_info.append(
-                {
-                    "dispositivo": dispositivo,
-                    "interfaces_count": interfaces_count or 0,
-                    "interfaces_activas": interfaces_activas or 0,
-                }
-            )
+        for fila in resultados:
+            info = dict(fila._mapping)
+            info["dispositivo"] = info.pop("Dispositivos")
+            dispositivos_con_info.append(info)
 
-        return dispositivos_con_info, total
+        return dispositivos_con_info, conteo, siguiente_cursor
 
     @staticmethod
     def buscar(
-        db: Session, termino: str, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Dispositivos], int]:
-        """Buscar dispositivos por término general"""
-
-        query = db.query(Dispositivos).filter(
-            or_(
-                Dispositivos.devname.ilike(f"%{termino}%"),
-                Dispositivos.operador.ilike(f"%{termino}%"),
-                Dispositivos.zona.ilike(f"%{termino}%"),
-                Dispositivos.area.ilike(f"%{termino}%"),
-                Dispositivos.enterprise.ilike(f"%{termino}%"),
-                func.cast(Dispositivos.devip, db.Text).ilike(f"%{termino}%"),
+        db: Session,
+        termino: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+        orden: str = "nombre",
+    ) -> Tuple[List[Dispositivos], Conteo, Optional[str]]:
+        """Buscar dispositivos por término general
+
+        Subcadena en nombre, operador, zona, área y fabricante (índices de
+        trigramas); si el término tiene forma de IP o prefijo se buscan
+        además los dispositivos dentro de esa subred. Con orden="relevancia"
+        los resultados se ordenan por similitud con el término.
+        """
+
+        columnas = [
+            Dispositivos.devname,
+            Dispositivos.operador,
+            Dispositivos.zona,
+            Dispositivos.area,
+            Dispositivos.enterprise,
+        ]
+        condiciones = [condicion_texto(columnas, termino)]
+
+        red = prefijo_ip(termino)
+        if red:
+            condiciones.append(condicion_ip(db, Dispositivos.devip, red))
+
+        if orden != "relevancia":
+            query = db.query(Dispositivos).filter(or_(*condiciones))
+            conteo = contar_total(db, query, modo_total)
+            dispositivos, siguiente_cursor = paginar(
+                query, "devname", ORDEN_DEVNAME, skip, limit, cursor
             )
+            return dispositivos, conteo, siguiente_cursor
+
+        puntaje = relevancia(db, columnas, termino, condiciones[1:])
+        query = db.query(Dispositivos, puntaje.label("relevancia")).filter(
+            or_(*condiciones)
         )
+        orden_relevancia = [
+            ClaveOrden(puntaje, True, lambda fila: fila.relevancia)
+        ] + ORDEN_DEVNAME_CON_CONTEO
 
-        total = query.count()
-        dispositivos = (
-            query.order_by(asc(Dispositivos.devname)).offset(skip).limit(limit).all()
+        conteo = contar_total(db, query, modo_total)
+        filas, siguiente_cursor = paginar(
+            query, "relevancia", orden_relevancia, skip, limit, cursor
         )
 
-        return dispositivos, total
+        return [fila[0] for fila in filas], conteo, siguiente_cursor
+
+    @staticmethod
+    def get_mapa(
+        db: Session,
+        bbox: Bbox,
+        zoom: int,
+        filtros: Optional[DispositivosFiltros] = None,
+    ) -> Dict[str, Any]:
+        """Dispositivos geolocalizados dentro del bbox para el mapa
+
+        Bajo MAPA_ZOOM_DISPOSITIVOS agrupa en SQL por celdas de una grilla
+        (tamaño según el zoom) con conteos por estado; desde ese zoom
+        devuelve los dispositivos individuales, hasta MAPA_MAX_DISPOSITIVOS.
+        """
+
+        condiciones = [
+            Dispositivos.latitud.isnot(None),
+            Dispositivos.longitud.isnot(None),
+            condicion_bbox(db, Dispositivos.latitud, Dispositivos.longitud, bbox),
+        ]
+        if filtros:
+            if filtros.zona:
+                condiciones.append(Dispositivos.zona.ilike(f"%{filtros.zona}%"))
+            if filtros.area:
+                condiciones.append(Dispositivos.area.ilike(f"%{filtros.area}%"))
+            if filtros.solo_activos:
+                condiciones.append(Dispositivos.devstatus == 1)
+
+        if zoom >= settings.MAPA_ZOOM_DISPOSITIVOS:
+            maximo = settings.MAPA_MAX_DISPOSITIVOS
+            filas = (
+                db.query(
+                    Dispositivos.devid,
+                    Dispositivos.devname,
+                    Dispositivos.zona,
+                    Dispositivos.area,
+                    Dispositivos.devstatus,
+                    Dispositivos.latitud,
+                    Dispositivos.longitud,
+                    Dispositivos.enterprise,
+                    Dispositivos.modelo,
+                )
+                .filter(*condiciones)
+                .order_by(Dispositivos.devid)
+                .limit(maximo + 1)
+                .all()
+            )
+            truncado = len(filas) > maximo
+            total = (
+                db.query(func.count(Dispositivos.devid)).filter(*condiciones).scalar()
+                if truncado
+                else len(filas)
+            )
+            return {
+                "modo": "dispositivos",
+                "total": total,
+                "truncado": truncado,
+                "dispositivos": filas[:maximo],
+                "clusters": [],
+            }
+
+        tamano = tamano_celda(zoom)
+        celda_lat = indice_celda(Dispositivos.latitud, tamano)
+        celda_lon = indice_celda(Dispositivos.longitud, tamano)
+        estado = Dispositivos.devstatus
+        filas = (
+            db.query(
+                func.count(Dispositivos.devid).label("cantidad"),
+                func.avg(Dispositivos.latitud).label("latitud"),
+                func.avg(Dispositivos.longitud).label("longitud"),
+                func.count(Dispositivos.devid).filter(estado == 1).label("up"),
+                func.count(Dispositivos.devid).filter(estado == 0).label("no_responde"),
+                func.count(Dispositivos.devid).filter(estado == 2).label("caidos"),
+                func.count(Dispositivos.devid)
+                .filter(estado == 5)
+                .label("fuera_monitoreo"),
+                func.min(Dispositivos.devid).label("devid"),
+            )
+            .filter(*condiciones)
+            .group_by(celda_lat, celda_lon)
+            .all()
+        )
+
+        clusters = []
+        for fila in filas:
+            cluster = dict(fila._mapping)
+            # devid sólo identifica celdas de un único dispositivo
+            if cluster["cantidad"] > 1:
+                cluster["devid"] = None
+            clusters.append(cluster)
+
+        return {
+            "modo": "clusters",
+            "total": sum(cluster["cantidad"] for cluster in clusters),
+            "truncado": False,
+            "tamano_celda": tamano,
+            "dispositivos": [],
+            "clusters": clusters,
+        }
+
+    @staticmethod
+    def version_filtros(db: Session) -> str:
+        """Versión de la tabla: cantidad de filas y último updated_at
+
+        Cambia al insertar (nueva marca), modificar (trigger de updated_at)
+        o eliminar (cantidad) dispositivos.
+        """
+        cantidad, ultima = db.query(
+            func.count(Dispositivos.devid), func.max(Dispositivos.updated_at)
+        ).one()
+        return f"{cantidad}:{ultima.isoformat() if ultima else '-'}"
+
+    @staticmethod
+    def get_valores_filtros_versionados(
+        db: Session,
+    ) -> Tuple[str, Dict[str, List[str]]]:
+        """Valores de filtros y su versión, desde el cache si no cambió"""
+
+        version = DispositivosService.version_filtros(db)
+        valores = cache_valores_filtros.obtener(version)
+        if valores is None:
+            valores = DispositivosService.get_valores_filtros(db)
+            cache_valores_filtros.guardar(version, valores)
+
+        return version, valores
 
     @staticmethod
     def get_valores_filtros(db: Session) -> Dict[str, List[str]]:
@@ -0,0 +1,400 @@
+# backend/app/services/ingesta_service.py
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.core.config import settings
+from app.models.dispositivos import Dispositivos
+from app.models.interface_historico import InterfaceHistorico
+from app.models.interfaces import Interfaces
+from app.services.resumen_interfaces_service import ResumenInterfacesService
+from app.services.stream_service import StreamService
+from sqlalchemy import Row, and_, case, func, insert, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Métricas de una muestra (columnas comunes a interfaces e interface_historico)
+METRICAS_MUESTRA = (
+    "input",
+    "output",
+    "ifspeed",
+    "ifindis",
+    "ifoutdis",
+    "ifinerr",
+    "ifouterr",
+    "ifutil",
+)
+
+# Estados opcionales de la interface; si no vienen se conserva el actual
+ESTADOS_MUESTRA = ("ifadmin", "ifoper", "ifstatus")
+
+# Columnas del COPY a interface_historico (id y created_at por defecto)
+COLUMNAS_HISTORICO = ("devid", "devif", "timestamp") + METRICAS_MUESTRA
+
+# Máximo de mensajes de error devueltos en el resultado
+MAX_ERRORES = 20
+
+# Rangos de las columnas: INTEGER (int4) y BIGINT (int8)
+RANGO_INTEGER = (-(2**31), 2**31 - 1)
+RANGO_BIGINT = (-(2**63), 2**63 - 1)
+COLUMNAS_BIGINT = ("input", "output")
+
+# ifstatus: 1:UP, 2:Down, 3:Shutdown
+ESTADOS_VALIDOS = (1, 2, 3)
+
+# ifutil es DECIMAL(5,2) con un porcentaje
+UTILIZACION_MAXIMA = Decimal("100")
+CENTESIMOS = Decimal("0.01")
+
+
+def _entero(valor: Any, campo: str = "valor", rango=RANGO_INTEGER) -> Any:
+    if valor is None or valor == "":
+        return None
+    try:
+        entero = int(valor)
+    except (ValueError, OverflowError):
+        # OverflowError: int(float("inf"))
+        raise ValueError(f"'{campo}' no es un entero: {valor!r}")
+    if isinstance(valor, float) and valor != entero:
+        # int() truncaría 1.5 a 1 sin avisar
+        raise ValueError(f"'{campo}' no es un entero: {valor!r}")
+    if not rango[0] <= entero <= rango[1]:
+        raise ValueError(f"'{campo}' fuera de rango: {entero}")
+    return entero
+
+
+def _decimal(valor: Any) -> Any:
+    if valor is None or valor == "":
+        return None
+    try:
+        return Decimal(str(valor))
+    except InvalidOperation:
+        raise ValueError(f"valor decimal inválido: {valor!r}")
+
+
+def _utilizacion(valor: Any) -> Any:
+    """ifutil entre 0 y 100, redondeado a centésimos como DECIMAL(5,2)"""
+    utilizacion = _decimal(valor)
+    if utilizacion is None:
+        return None
+    if not utilizacion.is_finite() or not 0 <= utilizacion <= UTILIZACION_MAXIMA:
+        raise ValueError(f"'ifutil' fuera de rango (0-100): {valor!r}")
+    return utilizacion.quantize(CENTESIMOS)
+
+
+def _fecha(valor: Any) -> datetime:
+    """ISO 8601 o epoch en segundos; sin zona horaria se asume UTC"""
+    if valor is None or valor == "":
+        raise ValueError("falta 'time'")
+
+    if isinstance(valor, (int, float)) or str(valor).replace(".", "", 1).isdigit():
+        try:
+            return datetime.fromtimestamp(float(valor), tz=timezone.utc)
+        except (OverflowError, OSError):
+            # Epoch fuera del rango de datetime o de la plataforma
+            raise ValueError(f"'time' fuera de rango: {valor!r}")
+
+    fecha = datetime.fromisoformat(str(valor).replace("Z", "+00:00"))
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha
+
+
+class IngestaService:
+
+    @staticmethod
+    def ingerir(
+        db: Session,
+        lineas: Iterable[str],
+        formato: str = "jsonl",
+        tamano_lote: int = 10000,
+    ) -> Dict[str, Any]:
+        """Cargar muestras de interfaces desde líneas JSON o CSV
+
+        Las líneas se procesan en streaming, en lotes de `tamano_lote`. Cada
+        lote es una transacción: actualiza el estado actual de las
+        interfaces (upsert por devid/devif) y agrega las muestras al
+        histórico. Las líneas inválidas se cuentan como rechazadas sin
+        interrumpir la carga.
+        """
+
+        if formato not in ("jsonl", "csv"):
+            raise ValueError("Formato no soportado (jsonl, csv)")
+
+        inicio = time.perf_counter()
+        resultado: Dict[str, Any] = {
+            "filas": 0,
+            "lotes": 0,
+            "rechazadas": 0,
+            "lotes_fallidos": 0,
+            "errores": [],
+        }
+
+        lote: List[Dict[str, Any]] = []
+        for numero, contenido in IngestaService._leer(lineas, formato):
+            try:
+                registro = json.loads(contenido) if formato == "jsonl" else contenido
+                lote.append(IngestaService._normalizar(registro))
+            except (ValueError, TypeError) as e:
+                IngestaService._rechazar(resultado, f"Línea {numero}: {e}")
+
+            if len(lote) >= tamano_lote:
+                IngestaService._aplicar_lote(db, lote, resultado)
+                lote = []
+
+        if lote:
+            IngestaService._aplicar_lote(db, lote, resultado)
+
+        segundos = time.perf_counter() - inicio
+        resultado["segundos"] = round(segundos, 3)
+        resultado["filas_por_segundo"] = (
+            round(resultado["filas"] / segundos, 1) if segundos > 0 else 0.0
+        )
+
+        logger.info(
+            f"Ingesta: {resultado['filas']} muestras en {resultado['lotes']} lotes "
+            f"({resultado['filas_por_segundo']} filas/s), "
+            f"{resultado['rechazadas']} rechazadas"
+        )
+        return resultado
+
+    @staticmethod
+    def _leer(lineas: Iterable[str], formato: str) -> Iterator[Tuple[int, Any]]:
+        """Numerar las líneas no vacías; en CSV la primera es el encabezado"""
+        if formato == "csv":
+            lector = csv.DictReader(lineas)
+            for registro in lector:
+                # line_num es la línea del archivo, encabezado incluido
+                yield lector.line_num, registro
+            return
+
+        for numero, linea in enumerate(lineas, start=1):
+            linea = linea.strip()
+            if linea:
+                yield numero, linea
+
+    @staticmethod
+    def _normalizar(registro: Dict[str, Any]) -> Dict[str, Any]:
+        """Validar y convertir una muestra a los tipos de las columnas"""
+        if not isinstance(registro, dict):
+            raise ValueError("se esperaba un objeto")
+
+        devid = _entero(registro.get("devid"), "devid")
+        devif = _entero(registro.get("devif"), "devif")
+        if devid is None or devif is None:
+            raise ValueError("faltan 'devid' o 'devif'")
+
+        muestra = {
+            "devid": devid,
+            "devif": devif,
+            "time": _fecha(registro.get("time", registro.get("timestamp"))),
+        }
+        for campo in METRICAS_MUESTRA + ESTADOS_MUESTRA:
+            valor = registro.get(campo)
+            if campo == "ifutil":
+                muestra[campo] = _utilizacion(valor)
+            elif campo in COLUMNAS_BIGINT:
+                muestra[campo] = _entero(valor, campo, RANGO_BIGINT)
+            else:
+                muestra[campo] = _entero(valor, campo)
+
+        estado = muestra["ifstatus"]
+        if estado is not None and estado not in ESTADOS_VALIDOS:
+            raise ValueError(f"'ifstatus' inválido: {estado}")
+
+        return muestra
+
+    @staticmethod
+    def _rechazar(resultado: Dict[str, Any], mensaje: str, cantidad: int = 1):
+        resultado["rechazadas"] += cantidad
+        if len(resultado["errores"]) < MAX_ERRORES:
+            resultado["errores"].append(mensaje)
+
+    @staticmethod
+    def _aplicar_lote(
+        db: Session, lote: List[Dict[str, Any]], resultado: Dict[str, Any]
+    ) -> None:
+        """Upsert del estado actual + histórico del lote en una transacción
+
+        Si la base rechaza el lote (p. ej. un dispositivo borrado durante la
+        carga) se revierte, sus muestras se cuentan como rechazadas y la
+        carga sigue con el lote siguiente.
+        """
+
+        errores_de_datos = IngestaService._errores_de_datos(db)
+        validas: List[Dict[str, Any]] = []
+        try:
+            # Las muestras de dispositivos inexistentes violarían la FK
+            devids = {muestra["devid"] for muestra in lote}
+            existentes = {
+                fila.devid: fila
+                for fila in db.query(
+                    Dispositivos.devid, Dispositivos.zona, Dispositivos.area
+                ).filter(Dispositivos.devid.in_(devids))
+            }
+            for devid in devids - existentes.keys():
+                omitidas = sum(1 for muestra in lote if muestra["devid"] == devid)
+                IngestaService._rechazar(
+                    resultado, f"Dispositivo {devid} no existe", omitidas
+                )
+            validas = [muestra for muestra in lote if muestra["devid"] in existentes]
+            if not validas:
+                return
+
+            actualizadas = IngestaService._upsert_interfaces(db, validas)
+            IngestaService._insertar_historico(db, validas)
+            ResumenInterfacesService.refrescar(db, {m["devid"] for m in validas})
+            eventos = StreamService.eventos_interfaces(actualizadas, existentes)
+            StreamService.notificar(db, eventos)
+            db.commit()
+        except errores_de_datos as e:
+            db.rollback()
+            detalle = str(getattr(e, "orig", None) or e).strip().splitlines()[0]
+            logger.warning(f"Ingesta: lote de {len(validas)} muestras rechazado")
+            IngestaService._rechazar(
+                resultado,
+                f"Lote de {len(validas)} muestras rechazado por la base: {detalle}",
+                len(validas),
+            )
+            resultado["lotes_fallidos"] += 1
+            return
+        except Exception:
+            db.rollback()
+            raise
+
+        StreamService.publicar_local(db, eventos)
+
+        resultado["filas"] += len(validas)
+        resultado["lotes"] += 1
+
+    @staticmethod
+    def _errores_de_datos(db: Session) -> Tuple[type, ...]:
+        """Errores de datos de SQLAlchemy y del driver (el COPY usa el cursor crudo)"""
+        dbapi = db.get_bind().dialect.loaded_dbapi
+        return (IntegrityError, DataError, dbapi.IntegrityError, dbapi.DataError)
+
+    @staticmethod
+    def _upsert_interfaces(db: Session, muestras: List[Dict[str, Any]]) -> List[Row]:
+        """Actualizar la "última muestra" de cada interface con un solo INSERT
+
+        ON CONFLICT no admite dos filas con la misma clave en una sentencia,
+        así que se toma la muestra más reciente de cada interface del lote.
+        Con el stream habilitado devuelve (RETURNING) las filas escritas,
+        de las que StreamService obtiene los cambios de estado, indicando
+        cuáles se insertaron.
+        """
+
+        ultimas: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for muestra in muestras:
+            clave = (muestra["devid"], muestra["devif"])
+            if clave not in ultimas or muestra["time"] >= ultimas[clave]["time"]:
+                ultimas[clave] = muestra
+
+        filas = [
+            {
+                **muestra,
+                "iflv": muestra["time"],
+                "iflc": muestra["time"] if muestra["ifstatus"] is not None else None,
+            }
+            for muestra in ultimas.values()
+        ]
+
+        tabla = Interfaces.__table__
+        stmt = pg_insert(tabla).values(filas)
+        nuevo = stmt.excluded
+
+        actualizar = {metrica: nuevo[metrica] for metrica in METRICAS_MUESTRA}
+        actualizar.update(
+            {
+                estado: func.coalesce(nuevo[estado], tabla.c[estado])
+                for estado in ESTADOS_MUESTRA
+            }
+        )
+        # Último cambio de estado sólo si el estado efectivamente cambió
+        actualizar["iflc"] = case(
+            (
+                and_(
+                    nuevo.ifstatus.isnot(None),
+                    nuevo.ifstatus.is_distinct_from(tabla.c.ifstatus),
+                ),
+                nuevo.time,
+            ),
+            else_=tabla.c.iflc,
+        )
+        actualizar.update(
+            {"time": nuevo.time, "iflv": nuevo.iflv, "updated_at": func.now()}
+        )
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["devid", "devif"],
+            set_=actualizar,
+            # Una muestra atrasada no retrocede el estado actual
+            where=or_(tabla.c.time.is_(None), nuevo.time >= tabla.c.time),
+        )
+        if not settings.STREAM_HABILITADO:
+            db.execute(stmt)
+            return []
+
+        return db.execute(
+            stmt.returning(
+                tabla.c.id,
+                tabla.c.devid,
+                tabla.c.devif,
+                tabla.c.ifname,
+                tabla.c.ifstatus,
+                tabla.c.iflc,
+                tabla.c.time,
+                # xmax = 0 sólo en filas insertadas (no en las actualizadas)
+                literal_column("xmax = 0").label("insertada"),
+            )
+        ).all()
+
+    @staticmethod
+    def _insertar_historico(db: Session, muestras: List[Dict[str, Any]]) -> None:
+        """Agregar las muestras al histórico con COPY (psycopg2)"""
+
+        tabla = InterfaceHistorico.__table__
+        cursor = db.connection().connection.cursor()
+        if not hasattr(cursor, "copy_expert"):
+            # Driver sin COPY: INSERT multi-fila (executemany)
+            cursor.close()
+            db.execute(
+                insert(tabla),
+                [
+                    {
+                        "devid": muestra["devid"],
+                        "devif": muestra["devif"],
+                        "timestamp": muestra["time"],
+                        **{c: muestra[c] for c in METRICAS_MUESTRA},
+                    }
+                    for muestra in muestras
+                ],
+            )
+            return
+
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for muestra in muestras:
+            # En COPY CSV el campo vacío sin comillas es NULL
+            escritor.writerow(
+                [muestra["devid"], muestra["devif"], muestra["time"].isoformat()]
+                + ["" if muestra[c] is None else muestra[c] for c in METRICAS_MUESTRA]
+            )
+        buffer.seek(0)
+
+        try:
+            cursor.copy_expert(
+                f"COPY {tabla.schema}.{tabla.name} ({', '.join(COLUMNAS_HISTORICO)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
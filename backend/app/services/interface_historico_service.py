@@ -0,0 +1,273 @@
+# backend/app/services/interface_historico_service.py
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.models.interface_historico import InterfaceHistorico
+from app.models.interfaces import Interfaces
+from app.schemas.interface_historico import SerieTemporalRequest
+from app.services.rollup_service import METRICAS_ROLLUP, RollupService
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+# Métricas que se pueden consultar como serie temporal
+METRICAS_SERIE = (
+    "input",
+    "output",
+    "ifspeed",
+    "ifindis",
+    "ifoutdis",
+    "ifinerr",
+    "ifouterr",
+    "ifutil",
+)
+
+# Tamaño del bucket por tipo de agregación (segundos)
+AGREGACIONES = {"5min": 300, "hourly": 3600, "daily": 86400}
+
+
+def _numero(valor: Any) -> Any:
+    """Convertir DECIMAL a float para serializar la serie de forma compacta"""
+    return float(valor) if valor is not None else None
+
+
+class InterfaceHistoricoService:
+
+    @staticmethod
+    def get_serie(
+        db: Session, interface: Interfaces, solicitud: SerieTemporalRequest
+    ) -> Dict[str, Any]:
+        """Obtener serie temporal de una métrica de la interface
+
+        '5min', 'hourly' y 'daily' se agregan en la base de datos (un punto
+        por bucket); para input, output e ifutil se leen de las tablas de
+        rollup cuando están habilitadas. 'raw' devuelve las muestras tal cual si caben en
+        `max_puntos`; si no, se reduce en la base de datos conservando el
+        mínimo y el máximo de cada bucket, de modo que los picos no se
+        pierdan y sólo se transfieran `max_puntos` filas como máximo.
+        """
+
+        if solicitud.metrica not in METRICAS_SERIE:
+            raise ValueError(
+                f"Métrica no soportada: {solicitud.metrica}. "
+                f"Valores válidos: {', '.join(METRICAS_SERIE)}"
+            )
+
+        agregacion = solicitud.agregacion or "raw"
+        if agregacion != "raw" and agregacion not in AGREGACIONES:
+            raise ValueError("Agregación no soportada (raw, 5min, hourly, daily)")
+
+        if solicitud.fecha_inicio >= solicitud.fecha_fin:
+            raise ValueError("La fecha de inicio debe ser anterior a la fecha de fin")
+
+        columna = getattr(InterfaceHistorico, solicitud.metrica)
+
+        condiciones = [
+            InterfaceHistorico.devid == interface.devid,
+            InterfaceHistorico.devif == interface.devif,
+            InterfaceHistorico.timestamp >= solicitud.fecha_inicio,
+            InterfaceHistorico.timestamp < solicitud.fecha_fin,
+        ]
+        if not solicitud.incluir_nulos:
+            condiciones.append(columna.isnot(None))
+
+        if agregacion == "raw":
+            datos, puntos_originales = InterfaceHistoricoService._serie_raw(
+                db, columna, condiciones, solicitud
+            )
+        elif InterfaceHistoricoService._usar_rollup(db, solicitud):
+            datos = InterfaceHistoricoService._serie_rollup(
+                db, interface, solicitud, agregacion
+            )
+            puntos_originales = sum(punto["muestras"] for punto in datos)
+        else:
+            datos = InterfaceHistoricoService._serie_agregada(
+                db, columna, condiciones, agregacion
+            )
+            puntos_originales = sum(punto["muestras"] for punto in datos)
+
+        return {
+            "devif": interface.devif,
+            "metrica": solicitud.metrica,
+            "agregacion": agregacion,
+            "fecha_inicio": solicitud.fecha_inicio,
+            "fecha_fin": solicitud.fecha_fin,
+            "total_puntos": len(datos),
+            "puntos_originales": puntos_originales,
+            "datos": datos,
+        }
+
+    @staticmethod
+    def _usar_rollup(db: Session, solicitud: SerieTemporalRequest) -> bool:
+        """Los rollups sólo guardan input/output/ifutil y sólo en PostgreSQL"""
+        return (
+            settings.ROLLUP_HABILITADO
+            and solicitud.metrica in METRICAS_ROLLUP
+            and not solicitud.incluir_nulos
+            and db.get_bind().dialect.name == "postgresql"
+        )
+
+    @staticmethod
+    def _serie_rollup(
+        db: Session,
+        interface: Interfaces,
+        solicitud: SerieTemporalRequest,
+        agregacion: str,
+    ) -> List[Dict[str, Any]]:
+        """Serie agregada leída del rollup más la cola aún no procesada"""
+
+        buckets = RollupService.get_buckets(
+            db,
+            agregacion,
+            interface.devid,
+            interface.devif,
+            solicitud.fecha_inicio,
+            solicitud.fecha_fin,
+        )
+
+        metrica = solicitud.metrica
+        datos = []
+        for bucket in buckets:
+            cuenta = bucket[f"{metrica}_cuenta"]
+            if not cuenta:
+                continue
+            datos.append(
+                {
+                    "timestamp": bucket["bucket"],
+                    "valor": _numero(bucket[f"{metrica}_suma"]) / cuenta,
+                    "minimo": _numero(bucket[f"{metrica}_minimo"]),
+                    "maximo": _numero(bucket[f"{metrica}_maximo"]),
+                    "muestras": cuenta,
+                }
+            )
+
+        return datos
+
+    @staticmethod
+    def _expresion_bucket(segundos: int, origen: float = 0):
+        """Número de bucket de tamaño fijo a partir del timestamp
+
+        `origen` (epoch) alinea los buckets con el inicio del rango pedido.
+        """
+        return func.floor(
+            (func.extract("epoch", InterfaceHistorico.timestamp) - origen) / segundos
+        )
+
+    @staticmethod
+    def _serie_agregada(
+        db: Session, columna, condiciones: list, agregacion: str
+    ) -> List[Dict[str, Any]]:
+        """Agregar por hora o día en la base de datos"""
+
+        segundos = AGREGACIONES[agregacion]
+
+        if db.get_bind().dialect.name == "postgresql":
+            bucket = RollupService.expresion_bucket(agregacion)
+        else:
+            bucket = InterfaceHistoricoService._expresion_bucket(segundos)
+
+        filas = (
+            db.query(
+                bucket.label("bucket"),
+                func.avg(columna).label("promedio"),
+                func.min(columna).label("minimo"),
+                func.max(columna).label("maximo"),
+                func.count(InterfaceHistorico.id).label("muestras"),
+            )
+            .filter(and_(*condiciones))
+            .group_by(bucket)
+            .order_by(bucket)
+            .all()
+        )
+
+        datos = []
+        for fila in filas:
+            timestamp = fila.bucket
+            if not isinstance(timestamp, datetime):
+                timestamp = datetime.fromtimestamp(
+                    int(fila.bucket) * segundos, tz=timezone.utc
+                )
+            datos.append(
+                {
+                    "timestamp": timestamp,
+                    "valor": _numero(fila.promedio),
+                    "minimo": _numero(fila.minimo),
+                    "maximo": _numero(fila.maximo),
+                    "muestras": fila.muestras,
+                }
+            )
+
+        return datos
+
+    @staticmethod
+    def _serie_raw(
+        db: Session, columna, condiciones: list, solicitud: SerieTemporalRequest
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Muestras crudas, reducidas a mín/máx por bucket si exceden el límite"""
+
+        # El conteo usa el índice (devid, devif, timestamp)
+        total = (
+            db.query(func.count(InterfaceHistorico.id))
+            .filter(and_(*condiciones))
+            .scalar()
+        ) or 0
+
+        if total <= solicitud.max_puntos:
+            filas = (
+                db.query(InterfaceHistorico.timestamp, columna.label("valor"))
+                .filter(and_(*condiciones))
+                .order_by(InterfaceHistorico.timestamp)
+                .all()
+            )
+            datos = [
+                {"timestamp": fila.timestamp, "valor": _numero(fila.valor)}
+                for fila in filas
+            ]
+            return datos, total
+
+        # Cada bucket aporta hasta dos puntos (mínimo y máximo)
+        rango = (solicitud.fecha_fin - solicitud.fecha_inicio).total_seconds()
+        buckets = max(solicitud.max_puntos // 2, 1)
+        segundos = max(math.ceil(rango / buckets), 1)
+        bucket = InterfaceHistoricoService._expresion_bucket(
+            segundos, solicitud.fecha_inicio.timestamp()
+        )
+
+        # NULLS LAST en ambos sentidos: en PostgreSQL NULL es el mayor valor y
+        # DESC lo pondría primero, eligiendo una muestra nula como máximo
+        muestras = (
+            select(
+                InterfaceHistorico.timestamp.label("timestamp"),
+                columna.label("valor"),
+                func.row_number()
+                .over(
+                    partition_by=bucket,
+                    order_by=(columna.asc().nulls_last(), InterfaceHistorico.timestamp),
+                )
+                .label("rn_min"),
+                func.row_number()
+                .over(
+                    partition_by=bucket,
+                    order_by=(
+                        columna.desc().nulls_last(),
+                        InterfaceHistorico.timestamp,
+                    ),
+                )
+                .label("rn_max"),
+            )
+            .where(and_(*condiciones))
+            .subquery()
+        )
+
+        filas = db.execute(
+            select(muestras.c.timestamp, muestras.c.valor)
+            .where(or_(muestras.c.rn_min == 1, muestras.c.rn_max == 1))
+            .order_by(muestras.c.timestamp)
+        ).all()
+
+        datos = [
+            {"timestamp": fila.timestamp, "valor": _numero(fila.valor)}
+            for fila in filas
+        ]
+        return datos, total
@@ -1,40 +1,87 @@
 # backend/app/services/interfaces_service.py
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.busqueda import condicion_texto, relevancia
+from app.core.pagination import ClaveOrden, Conteo, contar_total, paginar
 from app.models.dispositivos import Dispositivos
 from app.models.interfaces import Interfaces
-from app.schemas.interfaces import InterfacesFiltros
-from sqlalchemy import and_, asc, desc, func, or_
+from app.schemas.interfaces import InterfacesFiltros, InterfacesResponse
+from sqlalchemy import Row, and_, case, desc, func, or_
 from sqlalchemy.orm import Session, joinedload
 
+# Órdenes de los listados; también definen las claves de los cursores keyset
+ORDEN_DEVID_DEVIF = [
+    ClaveOrden(Interfaces.devid, False, lambda i: i.devid),
+    ClaveOrden(Interfaces.devif, False, lambda i: i.devif),
+]
+
+ORDEN_UTILIZACION = [
+    ClaveOrden(Interfaces.ifutil, True, lambda i: i.ifutil),
+    ClaveOrden(Interfaces.id, True, lambda i: i.id),
+]
+
+ORDEN_ERRORES = [
+    ClaveOrden(
+        func.coalesce(Interfaces.ifinerr, 0) + func.coalesce(Interfaces.ifouterr, 0),
+        True,
+        lambda i: (i.ifinerr or 0) + (i.ifouterr or 0),
+    ),
+    ClaveOrden(Interfaces.id, True, lambda i: i.id),
+]
+
+ORDEN_VELOCIDAD = [
+    ClaveOrden(Interfaces.ifspeed, True, lambda i: i.ifspeed),
+    ClaveOrden(Interfaces.id, True, lambda i: i.id),
+]
+
+# Máximo valor de una columna INTEGER (devif)
+MAX_ENTERO = 2**31 - 1
+
+# Columnas de los listados: las de InterfacesResponse más los datos del
+# dispositivo padre. Se consultan como filas planas, sin instanciar entidades
+COLUMNAS_LISTADO = [
+    getattr(Interfaces, campo) for campo in InterfacesResponse.model_fields
+] + [
+    Dispositivos.devname.label("dispositivo_nombre"),
+    Dispositivos.area.label("dispositivo_area"),
+    Dispositivos.zona.label("dispositivo_zona"),
+]
+
 
 class InterfacesService:
 
+    @staticmethod
+    def _consulta_listado(db: Session):
+        """Consulta base de los listados (proyección de COLUMNAS_LISTADO)"""
+        return (
+            db.query(*COLUMNAS_LISTADO)
+            .select_from(Interfaces)
+            .outerjoin(Interfaces.dispositivo)
+        )
+
     @staticmethod
     def get_all(
         db: Session,
         skip: int = 0,
         limit: int = 50,
         filtros: Optional[InterfacesFiltros] = None,
-    ) -> Tuple[List[Interfaces], int]:
-        """Obtener interfaces con filtros y paginación"""
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
+        """Obtener interfaces con filtros y paginación (offset o cursor)"""
 
-        query = db.query(Interfaces).options(joinedload(Interfaces.dispositivo))
+        query = InterfacesService._consulta_listado(db)
 
-        # Aplicar filtros
+        # Aplicar filtros (Dispositivos ya está unido en la consulta base)
         if filtros:
             if filtros.devid:
                 query = query.filter(Interfaces.devid == filtros.devid)
 
             if filtros.zona:
-                query = query.join(Dispositivos).filter(
-                    Dispositivos.zona.ilike(f"%{filtros.zona}%")
-                )
+                query = query.filter(Dispositivos.zona.ilike(f"%{filtros.zona}%"))
 
             if filtros.area:
-                query = query.join(Dispositivos).filter(
-                    Dispositivos.area.ilike(f"%{filtros.area}%")
-                )
+                query = query.filter(Dispositivos.area.ilike(f"%{filtros.area}%"))
 
             if filtros.ifstatus is not None:
                 query = query.filter(Interfaces.ifstatus == filtros.ifstatus)
@@ -61,17 +108,14 @@ class InterfacesService:
                 query = query.filter(Interfaces.ifspeed <= filtros.speed_max)
 
         # Contar total
-        total = query.count()
+        conteo = contar_total(db, query, modo_total)
 
         # Aplicar paginación y ordenamiento
-        interfaces = (
-            query.order_by(asc(Interfaces.devid), asc(Interfaces.devif))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        interfaces, siguiente_cursor = paginar(
+            query, "devid_devif", ORDEN_DEVID_DEVIF, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
 
     @staticmethod
     def get_by_id(db: Session, interface_id: int) -> Optional[Interfaces]:
@@ -83,6 +127,15 @@ class InterfacesService:
             .first()
         )
 
+    @staticmethod
+    def get_detalle(db: Session, interface_id: int) -> Optional[Row]:
+        """Obtener interface por ID con las columnas de los listados"""
+        return (
+            InterfacesService._consulta_listado(db)
+            .filter(Interfaces.id == interface_id)
+            .first()
+        )
+
     @staticmethod
     def get_by_devif(db: Session, devif: int) -> Optional[Interfaces]:
         """Obtener interface por DEVIF"""
@@ -95,181 +148,183 @@ class InterfacesService:
 
     @staticmethod
     def get_by_dispositivo(
-        db: Session, devid: int, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Interfaces], int]:
+        db: Session,
+        devid: int,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
         """Obtener interfaces de un dispositivo específico"""
 
-        query = db.query(Interfaces).filter(Interfaces.devid == devid)
+        query = InterfacesService._consulta_listado(db).filter(
+            Interfaces.devid == devid
+        )
 
-        total = query.count()
-        interfaces = (
-            query.order_by(asc(Interfaces.devif)).offset(skip).limit(limit).all()
+        conteo = contar_total(db, query, modo_total)
+        interfaces, siguiente_cursor = paginar(
+            query, "devid_devif", ORDEN_DEVID_DEVIF, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
 
     @staticmethod
-    def get_metricas(db: Session) -> Dict[str, Any]:
-        """Obtener métricas generales de interfaces"""
-
-        # Estadísticas por estado
-        stats_estado = (
-            db.query(Interfaces.ifstatus, func.count(Interfaces.id).label("count"))
-            .group_by(Interfaces.ifstatus)
-            .all()
-        )
-
-        # Contadores básicos
-        total_interfaces = db.query(func.count(Interfaces.id)).scalar()
-        interfaces_up = (
-            db.query(func.count(Interfaces.id))
+    def get_metricas(db: Session, top_n: int = 10) -> Dict[str, Any]:
+        """Obtener métricas generales de interfaces
+
+        Todos los contadores se calculan en un único recorrido de la tabla
+        usando agregados con FILTER (PostgreSQL, SQLite 3.30+), en lugar de
+        una consulta por contador. El top de utilización se obtiene en la
+        misma transacción de la sesión.
+        """
+
+        monitoreada = Interfaces.ifgraficar == 1
+        con_errores = or_(Interfaces.ifinerr > 0, Interfaces.ifouterr > 0)
+        con_descartes = or_(Interfaces.ifindis > 0, Interfaces.ifoutdis > 0)
+
+        contadores = db.query(
+            func.count(Interfaces.id).label("total_interfaces"),
+            func.count(Interfaces.id)
             .filter(Interfaces.ifstatus == 1)
-            .scalar()
-        )
-        interfaces_down = (
-            db.query(func.count(Interfaces.id))
+            .label("interfaces_up"),
+            func.count(Interfaces.id)
             .filter(Interfaces.ifstatus == 2)
-            .scalar()
-        )
-        interfaces_shutdown = (
-            db.query(func.count(Interfaces.id))
+            .label("interfaces_down"),
+            func.count(Interfaces.id)
             .filter(Interfaces.ifstatus == 3)
-            .scalar()
-        )
-        interfaces_monitoreadas = (
-            db.query(func.count(Interfaces.id))
-            .filter(Interfaces.ifgraficar == 1)
-            .scalar()
-        )
-
-        # Utilización promedio
-        utilizacion_promedio = (
-            db.query(func.avg(Interfaces.ifutil))
-            .filter(and_(Interfaces.ifutil.isnot(None), Interfaces.ifgraficar == 1))
-            .scalar()
-        )
-
-        # Interfaces con errores
-        con_errores = (
-            db.query(func.count(Interfaces.id))
-            .filter(
-                or_(
-                    and_(Interfaces.ifinerr.isnot(None), Interfaces.ifinerr > 0),
-                    and_(Interfaces.ifouterr.isnot(None), Interfaces.ifouterr > 0),
-                )
-            )
-            .scalar()
-        )
-
-        # Interfaces con descartes
-        con_descartes = (
-            db.query(func.count(Interfaces.id))
-            .filter(
-                or_(
-                    and_(Interfaces.ifindis.isnot(None), Interfaces.ifindis > 0),
-                    and_(Interfaces.ifoutdis.isnot(None), Interfaces.ifoutdis > 0),
-                )
-            )
-            .scalar()
-        )
-
-        # Top 10 interfaces más utilizadas
-        top_utilizadas = (
-            db.query(Interfaces)
-            .options(joinedload(Interfaces.dispositivo))
-            .filter(and_(Interfaces.ifutil.isnot(None), Interfaces.ifgraficar == 1))
-            .order_by(desc(Interfaces.ifutil))
-            .limit(10)
-            .all()
-        )
+            .label("interfaces_shutdown"),
+            func.count(Interfaces.id)
+            .filter(monitoreada)
+            .label("interfaces_monitoreadas"),
+            # AVG ignora los NULL, equivalente a filtrar ifutil IS NOT NULL
+            func.avg(Interfaces.ifutil)
+            .filter(monitoreada)
+            .label("utilizacion_promedio"),
+            func.count(Interfaces.id).filter(con_errores).label("con_errores"),
+            func.count(Interfaces.id).filter(con_descartes).label("con_descartes"),
+        ).one()
+
+        # Top N interfaces más utilizadas
+        top_utilizadas = InterfacesService.get_top_utilizadas(db, top_n)
+
+        utilizacion_promedio = contadores.utilizacion_promedio
 
         return {
-            "total_interfaces": total_interfaces or 0,
-            "interfaces_up": interfaces_up or 0,
-            "interfaces_down": interfaces_down or 0,
-            "interfaces_shutdown": interfaces_shutdown or 0,
-            "interfaces_monitoreadas": interfaces_monitoreadas or 0,
-            "utilizacion_promedio": (
+            "total_interfaces": contadores.total_interfaces or 0,
+            "interfaces_up": contadores.interfaces_up or 0,
+            "interfaces_down": contadores.interfaces_down or 0,
+            "interfaces_shutdown": contadores.interfaces_shutdown or 0,
+            "interfaces_monitoreadas": contadores.interfaces_monitoreadas or 0,
+            # La clave debe coincidir con InterfacesMetricas.utilization_promedio
+            "utilization_promedio": (
                 round(float(utilizacion_promedio), 2) if utilizacion_promedio else 0
             ),
-            "con_errores": con_errores or 0,
-            "con_descartes": con_descartes or 0,
+            "con_errores": contadores.con_errores or 0,
+            "con_descartes": contadores.con_descartes or 0,
             "top_utilizadas": top_utilizadas,
         }
 
+    @staticmethod
+    def get_top_utilizadas(
+        db: Session, top_n: int = 10, devid: Optional[int] = None
+    ) -> List[Row]:
+        """Interfaces monitoreadas con mayor utilización (opcional por devid)"""
+
+        query = InterfacesService._consulta_listado(db).filter(
+            and_(Interfaces.ifutil.isnot(None), Interfaces.ifgraficar == 1)
+        )
+        if devid is not None:
+            query = query.filter(Interfaces.devid == devid)
+
+        return query.order_by(desc(Interfaces.ifutil)).limit(top_n).all()
+
     @staticmethod
     def get_high_utilization(
-        db: Session, threshold: float = 80.0, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Interfaces], int]:
+        db: Session,
+        threshold: float = 80.0,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
         """Obtener interfaces con alta utilización"""
 
-        query = (
-            db.query(Interfaces)
-            .options(joinedload(Interfaces.dispositivo))
-            .filter(and_(Interfaces.ifutil >= threshold, Interfaces.ifgraficar == 1))
+        query = InterfacesService._consulta_listado(db).filter(
+            and_(Interfaces.ifutil >= threshold, Interfaces.ifgraficar == 1)
         )
 
-        total = query.count()
-        interfaces = (
-            query.order_by(desc(Interfaces.ifutil)).offset(skip).limit(limit).all()
+        conteo = contar_total(db, query, modo_total)
+        interfaces, siguiente_cursor = paginar(
+            query, "utilizacion", ORDEN_UTILIZACION, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
 
     @staticmethod
     def get_with_errors(
-        db: Session, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Interfaces], int]:
+        db: Session,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
         """Obtener interfaces con errores"""
 
-        query = (
-            db.query(Interfaces)
-            .options(joinedload(Interfaces.dispositivo))
-            .filter(
-                or_(
-                    and_(Interfaces.ifinerr.isnot(None), Interfaces.ifinerr > 0),
-                    and_(Interfaces.ifouterr.isnot(None), Interfaces.ifouterr > 0),
-                )
+        query = InterfacesService._consulta_listado(db).filter(
+            or_(
+                and_(Interfaces.ifinerr.isnot(None), Interfaces.ifinerr > 0),
+                and_(Interfaces.ifouterr.isnot(None), Interfaces.ifouterr > 0),
             )
         )
 
-        total = query.count()
-        interfaces = (
-            query.order_by(desc(Interfaces.ifinerr + Interfaces.ifouterr))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        conteo = contar_total(db, query, modo_total)
+        interfaces, siguiente_cursor = paginar(
+            query, "errores", ORDEN_ERRORES, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
 
     @staticmethod
     def buscar(
-        db: Session, termino: str, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Interfaces], int]:
-        """Buscar interfaces por término general"""
-
-        query = (
-            db.query(Interfaces)
-            .options(joinedload(Interfaces.dispositivo))
-            .filter(
-                or_(
-                    Interfaces.ifname.ilike(f"%{termino}%"),
-                    Interfaces.ifalias.ilike(f"%{termino}%"),
-                    func.cast(Interfaces.devif, db.Text).ilike(f"%{termino}%"),
-                )
-            )
-        )
-
-        total = query.count()
-        interfaces = (
-            query.order_by(asc(Interfaces.devid), asc(Interfaces.devif))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        db: Session,
+        termino: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+        orden: str = "dispositivo",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
+        """Buscar interfaces por término general
+
+        Subcadena en ifname e ifalias (índices de trigramas); un término
+        numérico busca además el devif exacto. Con orden="relevancia" los
+        resultados se ordenan por similitud con el término.
+        """
+
+        columnas = [Interfaces.ifname, Interfaces.ifalias]
+        condiciones = [condicion_texto(columnas, termino)]
+
+        if termino.isdigit() and int(termino) <= MAX_ENTERO:
+            condiciones.append(Interfaces.devif == int(termino))
+
+        query = InterfacesService._consulta_listado(db).filter(or_(*condiciones))
+
+        if orden == "relevancia":
+            puntaje = relevancia(db, columnas, termino, condiciones[1:])
+            query = query.add_columns(puntaje.label("relevancia"))
+            nombre_orden = "relevancia"
+            claves = [
+                ClaveOrden(puntaje, True, lambda i: i.relevancia)
+            ] + ORDEN_DEVID_DEVIF
+        else:
+            nombre_orden, claves = "devid_devif", ORDEN_DEVID_DEVIF
+
+        conteo = contar_total(db, query, modo_total)
+        interfaces, siguiente_cursor = paginar(
+            query, nombre_orden, claves, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
 
     @staticmethod
     def get_estadisticas_por_zona(db: Session) -> Dict[str, Any]:
@@ -279,7 +334,7 @@ class InterfacesService:
             db.query(
                 Dispositivos.zona,
                 func.count(Interfaces.id).label("total_interfaces"),
-                func.sum(func.case((Interfaces.ifstatus == 1, 1), else_=0)).label(
+                func.sum(case((Interfaces.ifstatus == 1, 1), else_=0)).label(
                     "interfaces_up"
                 ),
                 func.avg(Interfaces.ifutil).label("utilizacion_promedio"),
@@ -305,21 +360,23 @@ class InterfacesService:
 
     @staticmethod
     def get_by_speed_range(
-        db: Session, speed_min: int, speed_max: int, skip: int = 0, limit: int = 50
-    ) -> Tuple[List[Interfaces], int]:
+        db: Session,
+        speed_min: int,
+        speed_max: int,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[Row], Conteo, Optional[str]]:
         """Obtener interfaces por rango de velocidad"""
 
-        query = (
-            db.query(Interfaces)
-            .options(joinedload(Interfaces.dispositivo))
-            .filter(
-                and_(Interfaces.ifspeed >= speed_min, Interfaces.ifspeed <= speed_max)
-            )
+        query = InterfacesService._consulta_listado(db).filter(
+            and_(Interfaces.ifspeed >= speed_min, Interfaces.ifspeed <= speed_max)
         )
 
-        total = query.count()
-        interfaces = (
-            query.order_by(desc(Interfaces.ifspeed)).offset(skip).limit(limit).all()
+        conteo = contar_total(db, query, modo_total)
+        interfaces, siguiente_cursor = paginar(
+            query, "velocidad", ORDEN_VELOCIDAD, skip, limit, cursor
         )
 
-        return interfaces, total
+        return interfaces, conteo, siguiente_cursor
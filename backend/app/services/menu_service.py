@@ -1,11 +1,21 @@
 # backend/app/services/menu_service.py
-from typing import List, Optional
+import json
+from typing import Dict, List, Optional, Tuple
 
+from app.core.actualizacion_masiva import actualizar_en_bloque, validar_filas
+from app.core.etag import calcular_etag
 from app.models import Menu, MenuGrupo, RolMenu
 from app.schemas.menu import MenuCreate, MenuGrupoCreate, MenuGrupoUpdate, MenuUpdate
-from sqlalchemy import and_
+from app.services.rol_service import (
+    cache_arbol_menus,
+    invalidar_arbol_menus,
+    invalidar_autorizacion,
+)
 from sqlalchemy.orm import Session, joinedload
 
+COLUMNAS_GRUPO_ARBOL = ("id", "nombre", "nombre_despliegue", "icono", "orden")
+COLUMNAS_MENU_ARBOL = ("id", "nombre", "nombre_despliegue", "url", "icono", "orden")
+
 
 class MenuService:
 
@@ -32,6 +42,7 @@ class MenuService:
         db_grupo = MenuGrupo(**grupo_data.dict())
         db.add(db_grupo)
         db.commit()
+        invalidar_arbol_menus()
         db.refresh(db_grupo)
         return db_grupo
 
@@ -49,6 +60,7 @@ class MenuService:
             setattr(db_grupo, field, value)
 
         db.commit()
+        invalidar_arbol_menus()
         db.refresh(db_grupo)
         return db_grupo
 
@@ -85,6 +97,7 @@ class MenuService:
         db_menu = Menu(**menu_data.dict())
         db.add(db_menu)
         db.commit()
+        invalidar_arbol_menus()
         db.refresh(db_menu)
         return db_menu
 
@@ -100,104 +113,94 @@ class MenuService:
             setattr(db_menu, field, value)
 
         db.commit()
+        invalidar_autorizacion()
         db.refresh(db_menu)
         return db_menu
 
     @staticmethod
-    def get_menus_by_role(db: Session, rol_id: int) -> List[MenuGrupo]:
-        """Obtener estructura de menús accesibles por rol"""
-        # Obtener todos los grupos
-        grupos = (
-            db.query(MenuGrupo)
-            .filter(MenuGrupo.estado_id == 1)
-            .order_by(MenuGrupo.orden)
-            .all()
+    def _consulta_arbol(db: Session, columnas: list, rol_id: Optional[int] = None):
+        """Grupos ⋈ menús activos (⋈ rol_menu activos del rol) en orden de árbol"""
+        query = (
+            db.query(*columnas)
+            .select_from(MenuGrupo)
+            .join(Menu, Menu.menu_grupo_id == MenuGrupo.id)
+            .filter(MenuGrupo.estado_id == 1, Menu.estado_id == 1)
         )
 
-        # Para cada grupo, obtener menús accesibles
-        for grupo in grupos:
-            menus_accesibles = (
-                db.query(Menu)
-                .join(RolMenu)
-                .filter(
-                    and_(
-                        Menu.menu_grupo_id == grupo.id,
-                        Menu.estado_id == 1,
-                        RolMenu.rol_id == rol_id,
-                        RolMenu.estado_id == 1,
-                    )
-                )
-                .order_by(Menu.orden)
-                .all()
-            )
+        if rol_id:
+            query = query.join(
+                RolMenu, (RolMenu.menu_id == Menu.id) & (RolMenu.rol_id == rol_id)
+            ).filter(RolMenu.estado_id == 1)
 
-            # Asignar menús accesibles al grupo
-            grupo.menus_accesibles = menus_accesibles
+        return query.order_by(MenuGrupo.orden, MenuGrupo.id, Menu.orden, Menu.id)
 
-        # Filtrar grupos que tienen al menos un menú accesible
-        grupos_con_menus = [
-            grupo
-            for grupo in grupos
-            if hasattr(grupo, "menus_accesibles") and grupo.menus_accesibles
-        ]
+    @staticmethod
+    def get_menus_by_role(db: Session, rol_id: int) -> List[MenuGrupo]:
+        """Obtener estructura de menús accesibles por rol (una sola consulta)"""
+        grupos: Dict[int, MenuGrupo] = {}
+        for grupo, menu in MenuService._consulta_arbol(db, [MenuGrupo, Menu], rol_id):
+            if grupo.id not in grupos:
+                grupo.menus_accesibles = []
+                grupos[grupo.id] = grupo
+            grupos[grupo.id].menus_accesibles.append(menu)
 
-        return grupos_con_menus
+        # Sólo aparecen grupos con al menos un menú accesible
+        return list(grupos.values())
 
     @staticmethod
     def get_menu_tree(db: Session, rol_id: Optional[int] = None) -> List[dict]:
         """Obtener árbol de menús en formato jerárquico"""
-        if rol_id:
-            grupos = MenuService.get_menus_by_role(db, rol_id)
-        else:
-            grupos = MenuService.get_all_grupos(db)
-
-        menu_tree = []
-        for grupo in grupos:
-            grupo_dict = {
-                "id": grupo.id,
-                "nombre": grupo.nombre,
-                "nombre_despliegue": grupo.nombre_despliegue,
-                "icono": grupo.icono,
-                "orden": grupo.orden,
-                "menus": [],
-            }
-
-            # Obtener menús del grupo
-            if rol_id and hasattr(grupo, "menus_accesibles"):
-                menus = grupo.menus_accesibles
-            else:
-                menus = MenuService.get_all_menus(db, grupo_id=grupo.id)
-
-            for menu in menus:
-                menu_dict = {
-                    "id": menu.id,
-                    "nombre": menu.nombre,
-                    "nombre_despliegue": menu.nombre_despliegue,
-                    "url": menu.url,
-                    "icono": menu.icono,
-                    "orden": menu.orden,
-                }
-                grupo_dict["menus"].append(menu_dict)
+        return MenuService.get_menu_tree_versionado(db, rol_id)[1]
+
+    @staticmethod
+    def get_menu_tree_versionado(
+        db: Session, rol_id: Optional[int] = None
+    ) -> Tuple[str, List[dict]]:
+        """Árbol de menús del rol (o completo) y su ETag, desde el cache
 
-            if grupo_dict["menus"]:  # Solo incluir grupos con menús
+        El árbol sale de una sola consulta de columnas; el ETag depende del
+        contenido, por lo que coincide entre workers.
+        """
+        clave = rol_id or None
+        entrada = cache_arbol_menus.obtener(clave)
+        if entrada is not None:
+            return entrada
+
+        columnas = [
+            *[getattr(MenuGrupo, c).label(f"grupo_{c}") for c in COLUMNAS_GRUPO_ARBOL],
+            *[getattr(Menu, c).label(f"menu_{c}") for c in COLUMNAS_MENU_ARBOL],
+        ]
+
+        menu_tree: List[dict] = []
+        for fila in MenuService._consulta_arbol(db, columnas, rol_id):
+            if not menu_tree or menu_tree[-1]["id"] != fila.grupo_id:
+                grupo_dict = {
+                    c: getattr(fila, f"grupo_{c}") for c in COLUMNAS_GRUPO_ARBOL
+                }
+                grupo_dict["menus"] = []
                 menu_tree.append(grupo_dict)
+            menu_tree[-1]["menus"].append(
+                {c: getattr(fila, f"menu_{c}") for c in COLUMNAS_MENU_ARBOL}
+            )
 
-        return menu_tree
+        etag = calcular_etag(clave, json.dumps(menu_tree, sort_keys=True, default=str))
+        cache_arbol_menus.guardar(clave, (etag, menu_tree))
+        return etag, menu_tree
 
     @staticmethod
     def reorder_menus(db: Session, menu_orders: List[dict]) -> bool:
-        """Reordenar menús
+        """Reordenar menús en una sola sentencia
 
         Args:
             menu_orders: Lista de {"id": int, "orden": int}
+
+        Lanza ValueError si la lista no es válida (antes de tocar la base).
         """
+        filas = validar_filas(menu_orders, ("id",), ("orden",))
         try:
-            for item in menu_orders:
-                menu = db.query(Menu).filter(Menu.id == item["id"]).first()
-                if menu:
-                    menu.orden = item["orden"]
-
+            actualizar_en_bloque(db, Menu, filas)
             db.commit()
+            invalidar_arbol_menus()
             return True
         except Exception:
             db.rollback()
@@ -205,18 +208,18 @@ class MenuService:
 
     @staticmethod
     def reorder_grupos(db: Session, grupo_orders: List[dict]) -> bool:
-        """Reordenar grupos de menú
+        """Reordenar grupos de menú en una sola sentencia
 
         Args:
             grupo_orders: Lista de {"id": int, "orden": int}
+
+        Lanza ValueError si la lista no es válida (antes de tocar la base).
         """
+        filas = validar_filas(grupo_orders, ("id",), ("orden",))
         try:
-            for item in grupo_orders:
-                grupo = db.query(MenuGrupo).filter(MenuGrupo.id == item["id"]).first()
-                if grupo:
-                    grupo.orden = item["orden"]
-
+            actualizar_en_bloque(db, MenuGrupo, filas)
             db.commit()
+            invalidar_arbol_menus()
             return True
         except Exception:
             db.rollback()
@@ -0,0 +1,65 @@
+# backend/app/services/particiones_service.py
+import logging
+from typing import Any, Dict, List
+
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class ParticionesService:
+
+    @staticmethod
+    def disponible(db: Session) -> bool:
+        """Las funciones de mantenimiento existen (script 10 aplicado)"""
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return (
+            db.execute(
+                text("SELECT to_regproc('monitoreo.mantener_particiones')")
+            ).scalar()
+            is not None
+        )
+
+    @staticmethod
+    def mantener(db: Session) -> List[Dict[str, Any]]:
+        """Crear particiones futuras y eliminar las vencidas según la política
+
+        La política (intervalo, anticipación y retención por tabla) está en
+        monitoreo.particion_politica; la retención elimina particiones
+        completas con DROP TABLE, sin DELETE masivos.
+        """
+        filas = db.execute(
+            text("SELECT * FROM monitoreo.mantener_particiones()")
+        ).mappings()
+        resultado = [dict(fila) for fila in filas]
+        db.commit()
+        return resultado
+
+    @staticmethod
+    def ejecutar_mantenimiento() -> None:
+        """Tarea periódica de mantenimiento de particiones"""
+
+        db = SessionLocal()
+        try:
+            if not ParticionesService.disponible(db):
+                logger.warning(
+                    "Mantenimiento de particiones omitido: "
+                    "monitoreo.mantener_particiones() no existe"
+                )
+                return
+
+            for fila in ParticionesService.mantener(db):
+                if fila["particiones_creadas"] or fila["particiones_eliminadas"]:
+                    logger.info(
+                        f"Particiones de {fila['nombre_tabla']}: "
+                        f"{fila['particiones_creadas']} creadas, "
+                        f"{fila['particiones_eliminadas']} eliminadas"
+                    )
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,127 @@
+# backend/app/services/resumen_interfaces_service.py
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.database import SessionLocal
+from app.models.dispositivo_resumen_interfaces import DispositivoResumenInterfaces
+from app.models.dispositivos import Dispositivos
+from app.models.interfaces import Interfaces
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Conteos del resumen (0 para dispositivos sin fila de resumen)
+CONTADORES_RESUMEN = (
+    "interfaces_count",
+    "interfaces_activas",
+    "interfaces_down",
+    "interfaces_shutdown",
+    "interfaces_monitoreadas",
+    "interfaces_con_errores",
+)
+
+COLUMNAS_RESUMEN = CONTADORES_RESUMEN + ("utilizacion_maxima", "utilizacion_promedio")
+
+
+class ResumenInterfacesService:
+
+    @staticmethod
+    def agregados() -> Dict[str, Any]:
+        """Columnas del resumen calculadas sobre las interfaces del dispositivo
+
+        Se usan para mantener la tabla y para calcular el mismo resumen en
+        vivo (DispositivosService.get_detalle).
+        """
+        i = Interfaces
+        monitoreada = i.ifgraficar == 1
+        return {
+            "interfaces_count": func.count(i.id),
+            "interfaces_activas": func.count(i.id).filter(i.ifstatus == 1),
+            "interfaces_down": func.count(i.id).filter(i.ifstatus == 2),
+            "interfaces_shutdown": func.count(i.id).filter(i.ifstatus == 3),
+            "interfaces_monitoreadas": func.count(i.id).filter(monitoreada),
+            "interfaces_con_errores": func.count(i.id).filter(
+                or_(i.ifinerr > 0, i.ifouterr > 0)
+            ),
+            "utilizacion_maxima": func.max(i.ifutil).filter(monitoreada),
+            "utilizacion_promedio": func.round(
+                func.avg(i.ifutil).filter(monitoreada), 2
+            ),
+        }
+
+    @staticmethod
+    def refrescar(db: Session, devids: Optional[Iterable[int]] = None) -> int:
+        """Recalcular el resumen de los dispositivos indicados (o de todos)
+
+        Un único INSERT ... SELECT ... ON CONFLICT DO UPDATE que sólo
+        reescribe las filas cuyos valores cambiaron. No confirma: se ejecuta
+        dentro de la transacción del llamador (p. ej. el lote de la ingesta).
+        Devuelve la cantidad de filas insertadas o modificadas.
+        """
+
+        agregados = ResumenInterfacesService.agregados()
+        consulta = (
+            select(
+                Dispositivos.devid,
+                *[agregados[c].label(c) for c in COLUMNAS_RESUMEN],
+            )
+            .select_from(Dispositivos)
+            .outerjoin(Interfaces, Interfaces.devid == Dispositivos.devid)
+            .group_by(Dispositivos.devid)
+        )
+        if devids is not None:
+            devids = list(devids)
+            if not devids:
+                return 0
+            consulta = consulta.where(Dispositivos.devid.in_(devids))
+        else:
+            # SQLite exige un WHERE antes de ON CONFLICT en INSERT ... SELECT
+            consulta = consulta.where(Dispositivos.devid.isnot(None))
+
+        insertar = (
+            pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        )
+        resumen = DispositivoResumenInterfaces
+        sentencia = insertar(resumen).from_select(
+            ["devid", *COLUMNAS_RESUMEN], consulta
+        )
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=[resumen.devid],
+            set_={
+                **{c: sentencia.excluded[c] for c in COLUMNAS_RESUMEN},
+                "actualizado_en": func.now(),
+            },
+            where=or_(
+                *[
+                    getattr(resumen, c).is_distinct_from(sentencia.excluded[c])
+                    for c in COLUMNAS_RESUMEN
+                ]
+            ),
+        )
+
+        return db.execute(sentencia).rowcount
+
+    @staticmethod
+    def ejecutar_refresco() -> None:
+        """Tarea periódica: recalcular el resumen de todos los dispositivos
+
+        Cubre los cambios que no pasan por la ingesta (sincronización
+        externa, interfaces eliminadas).
+        """
+
+        db = SessionLocal()
+        try:
+            modificadas = ResumenInterfacesService.refrescar(db)
+            db.commit()
+            if modificadas:
+                logger.info(
+                    f"Resumen de interfaces: {modificadas} dispositivos actualizados"
+                )
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -1,13 +1,53 @@
 # backend/app/services/rol_service.py
-from typing import List, Optional
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional
 
+from app.core.cache import CacheTTL
+from app.core.config import settings
+from app.core.security import invalidar_rol
 from app.models import Menu, Permiso, Rol, RolMenu, RolPermiso
 from app.schemas.menu import RolMenuCreate
 from app.schemas.rol import RolCreate, RolPermisoCreate, RolUpdate
-from sqlalchemy import and_
+from sqlalchemy import and_, func, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 
+class AccesosRol(NamedTuple):
+    permisos: FrozenSet[str]
+    menus: FrozenSet[str]
+
+
+SIN_ACCESOS = AccesosRol(frozenset(), frozenset())
+
+# Matriz de autorización de todos los roles (una sola entrada). Se invalida al
+# modificar asignaciones, permisos o menús; el TTL cubre otros workers.
+cache_autorizacion = CacheTTL(
+    maximo=1, ttl_segundos=settings.CACHE_AUTORIZACION_TTL_SEGUNDOS
+)
+
+
+# Árbol de menús por rol (clave rol_id, None = árbol completo) con su ETag;
+# lo construye MenuService.get_menu_tree_versionado
+cache_arbol_menus = CacheTTL(
+    maximo=settings.CACHE_MENUS_MAXIMO, ttl_segundos=settings.CACHE_MENUS_TTL_SEGUNDOS
+)
+
+
+def invalidar_arbol_menus() -> None:
+    """Descartar los árboles de menús (cambió un grupo, menú u orden)"""
+    cache_arbol_menus.limpiar()
+
+
+def invalidar_autorizacion() -> None:
+    """Descartar la matriz de autorización (cambió un rol, permiso o menú)
+
+    También descarta los árboles de menús, que dependen de las asignaciones.
+    """
+    cache_autorizacion.limpiar()
+    invalidar_arbol_menus()
+
+
 class RolService:
 
     @staticmethod
@@ -41,6 +81,7 @@ class RolService:
             setattr(db_rol, field, value)
 
         db.commit()
+        invalidar_rol(rol_id)
         db.refresh(db_rol)
         return db_rol
 
@@ -53,6 +94,8 @@ class RolService:
 
         db.delete(db_rol)
         db.commit()
+        invalidar_rol(rol_id)
+        invalidar_autorizacion()
         return True
 
     # ========== GESTIÓN DE PERMISOS ==========
@@ -93,6 +136,8 @@ class RolService:
             db.add(db_asignacion)
 
         db.commit()
+        invalidar_rol(asignacion.rol_id)
+        invalidar_autorizacion()
         return True
 
     @staticmethod
@@ -111,8 +156,96 @@ class RolService:
 
         db.delete(asignacion)
         db.commit()
+        invalidar_rol(rol_id)
+        invalidar_autorizacion()
         return True
 
+    @staticmethod
+    def _sincronizar_asignaciones(
+        db: Session,
+        rol_id: int,
+        modelo: Any,
+        columna: str,
+        referencia: Any,
+        ids: List[int],
+        estado_id: int,
+    ) -> Optional[Dict[str, int]]:
+        """Dejar asignados al rol exactamente `ids` con `estado_id`
+
+        Compara contra las asignaciones actuales (una consulta) y aplica la
+        diferencia con un INSERT ... ON CONFLICT DO UPDATE y un DELETE en una
+        sola transacción. Devuelve None si el rol no existe y lanza
+        ValueError si algún id no existe en `referencia`.
+        """
+        if RolService.get_by_id(db, rol_id) is None:
+            return None
+
+        deseados = set(ids)
+        existentes = {
+            fila[0]
+            for fila in db.query(referencia.id).filter(referencia.id.in_(deseados))
+        }
+        faltantes = sorted(deseados - existentes)
+        if faltantes:
+            raise ValueError(f"No existen: {', '.join(map(str, faltantes))}")
+
+        id_asignado = getattr(modelo, columna)
+        actuales = dict(
+            db.query(id_asignado, modelo.estado_id).filter(modelo.rol_id == rol_id)
+        )
+
+        eliminar = set(actuales) - deseados
+        agregar = deseados - set(actuales)
+        actualizar = {i for i in deseados & set(actuales) if actuales[i] != estado_id}
+
+        if agregar or actualizar:
+            insertar = (
+                pg_insert
+                if db.get_bind().dialect.name == "postgresql"
+                else sqlite_insert
+            )
+            sentencia = insertar(modelo).values(
+                [
+                    {"rol_id": rol_id, columna: i, "estado_id": estado_id}
+                    for i in sorted(agregar | actualizar)
+                ]
+            )
+            db.execute(
+                sentencia.on_conflict_do_update(
+                    index_elements=[modelo.rol_id, id_asignado],
+                    set_={
+                        "estado_id": sentencia.excluded.estado_id,
+                        "fecha_modificacion": func.now(),
+                    },
+                )
+            )
+
+        if eliminar:
+            db.query(modelo).filter(
+                modelo.rol_id == rol_id, id_asignado.in_(eliminar)
+            ).delete(synchronize_session=False)
+
+        db.commit()
+        return {
+            "agregados": len(agregar),
+            "actualizados": len(actualizar),
+            "eliminados": len(eliminar),
+            "sin_cambios": len(deseados) - len(agregar) - len(actualizar),
+        }
+
+    @staticmethod
+    def sync_permisos(
+        db: Session, rol_id: int, permiso_ids: List[int], estado_id: int = 1
+    ) -> Optional[Dict[str, int]]:
+        """Reemplazar el conjunto de permisos del rol en una transacción"""
+        resultado = RolService._sincronizar_asignaciones(
+            db, rol_id, RolPermiso, "permiso_id", Permiso, permiso_ids, estado_id
+        )
+        if resultado is not None:
+            invalidar_rol(rol_id)
+            invalidar_autorizacion()
+        return resultado
+
     # ========== GESTIÓN DE MENÚS ==========
 
     @staticmethod
@@ -150,6 +283,7 @@ class RolService:
             db.add(db_asignacion)
 
         db.commit()
+        invalidar_autorizacion()
         return True
 
     @staticmethod
@@ -166,39 +300,85 @@ class RolService:
 
         db.delete(asignacion)
         db.commit()
+        invalidar_autorizacion()
         return True
 
     @staticmethod
-    def has_permission(db: Session, rol_id: int, permiso_nombre: str) -> bool:
-        """Verificar si un rol tiene un permiso específico"""
-        return (
-            db.query(RolPermiso)
-            .join(Permiso)
-            .filter(
-                and_(
-                    RolPermiso.rol_id == rol_id,
-                    RolPermiso.estado_id == 1,
-                    Permiso.nombre == permiso_nombre,
-                )
+    def sync_menus(
+        db: Session, rol_id: int, menu_ids: List[int], estado_id: int = 1
+    ) -> Optional[Dict[str, int]]:
+        """Reemplazar el conjunto de menús del rol en una transacción"""
+        resultado = RolService._sincronizar_asignaciones(
+            db, rol_id, RolMenu, "menu_id", Menu, menu_ids, estado_id
+        )
+        if resultado is not None:
+            invalidar_autorizacion()
+        return resultado
+
+    # ========== VERIFICACIONES (MATRIZ EN MEMORIA) ==========
+
+    @staticmethod
+    def get_matriz_autorizacion(db: Session) -> Dict[int, AccesosRol]:
+        """Permisos y URLs de menú activos de cada rol, en una sola consulta"""
+
+        matriz = cache_autorizacion.obtener("matriz")
+        if matriz is not None:
+            return matriz
+
+        permisos = (
+            db.query(
+                RolPermiso.rol_id.label("rol_id"),
+                literal("permiso").label("tipo"),
+                Permiso.nombre.label("valor"),
             )
-            .first()
-            is not None
+            .join(Permiso, Permiso.id == RolPermiso.permiso_id)
+            .filter(RolPermiso.estado_id == 1)
+        )
+        menus = (
+            db.query(
+                RolMenu.rol_id.label("rol_id"),
+                literal("menu").label("tipo"),
+                Menu.url.label("valor"),
+            )
+            .join(Menu, Menu.id == RolMenu.menu_id)
+            .filter(RolMenu.estado_id == 1, Menu.estado_id == 1, Menu.url.isnot(None))
         )
 
+        conjuntos: Dict[int, Dict[str, set]] = {}
+        for rol_id, tipo, valor in db.execute(union_all(permisos, menus)):
+            conjuntos.setdefault(rol_id, {"permiso": set(), "menu": set()})[tipo].add(
+                valor
+            )
+
+        matriz = {
+            rol_id: AccesosRol(frozenset(c["permiso"]), frozenset(c["menu"]))
+            for rol_id, c in conjuntos.items()
+        }
+        cache_autorizacion.guardar("matriz", matriz)
+        return matriz
+
+    @staticmethod
+    def get_accesos(db: Session, rol_id: int) -> AccesosRol:
+        """Permisos y menús activos del rol (vacíos si no tiene)"""
+        return RolService.get_matriz_autorizacion(db).get(rol_id, SIN_ACCESOS)
+
+    @staticmethod
+    def has_permission(db: Session, rol_id: int, permiso_nombre: str) -> bool:
+        """Verificar si un rol tiene un permiso específico"""
+        return permiso_nombre in RolService.get_accesos(db, rol_id).permisos
+
     @staticmethod
     def has_menu_access(db: Session, rol_id: int, menu_url: str) -> bool:
         """Verificar si un rol tiene acceso a un menú específico"""
-        return (
-            db.query(RolMenu)
-            .join(Menu)
-            .filter(
-                and_(
-                    RolMenu.rol_id == rol_id,
-                    RolMenu.estado_id == 1,
-                    Menu.url == menu_url,
-                    Menu.estado_id == 1,
-                )
-            )
-            .first()
-            is not None
-        )
+        return menu_url in RolService.get_accesos(db, rol_id).menus
+
+    @staticmethod
+    def verificar_accesos(
+        db: Session, rol_id: int, permisos: List[str], menus: List[str]
+    ) -> Dict[str, Dict[str, bool]]:
+        """Resolver varias verificaciones de permisos y menús a la vez"""
+        accesos = RolService.get_accesos(db, rol_id)
+        return {
+            "permisos": {nombre: nombre in accesos.permisos for nombre in permisos},
+            "menus": {url: url in accesos.menus for url in menus},
+        }
@@ -0,0 +1,435 @@
+# backend/app/services/rollup_service.py
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.interface_historico import InterfaceHistorico
+from app.models.interface_historico_rollup import (
+    InterfaceHistoricoRollup,
+    RollupWatermark,
+)
+from sqlalchemy import and_, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Periodos mantenidos y su tamaño de bucket en segundos
+PERIODOS_ROLLUP = {"5min": 300, "hourly": 3600, "daily": 86400}
+
+# Nombre del watermark de interface_historico en monitoreo.rollup_watermark
+WATERMARK_INTERFACES = "interface_historico"
+
+# Métricas con suma/cuenta/mín/máx en el rollup
+METRICAS_ROLLUP = ("input", "output", "ifutil")
+
+# Último valor entregado por la secuencia de ids y xmax del snapshot en que se
+# leyó: cuando terminan todas las transacciones con xid menor que ese xmax,
+# ningún id hasta ese valor puede aparecer después
+_limite_pendiente: Optional[Tuple[int, int]] = None
+
+
+class RollupService:
+
+    @staticmethod
+    def expresion_bucket(periodo: str):
+        """Inicio del bucket del periodo para cada muestra (PostgreSQL)"""
+        if periodo == "hourly":
+            return func.date_trunc("hour", InterfaceHistorico.timestamp)
+        if periodo == "daily":
+            return func.date_trunc("day", InterfaceHistorico.timestamp)
+
+        segundos = PERIODOS_ROLLUP[periodo]
+        return func.to_timestamp(
+            func.floor(func.extract("epoch", InterfaceHistorico.timestamp) / segundos)
+            * segundos
+        )
+
+    @staticmethod
+    def _agregados() -> Dict[str, Any]:
+        """Columnas del rollup calculadas sobre un conjunto de muestras"""
+        h = InterfaceHistorico
+        columnas: Dict[str, Any] = {}
+        for metrica in METRICAS_ROLLUP:
+            columna = getattr(h, metrica)
+            columnas[f"{metrica}_suma"] = func.sum(columna)
+            columnas[f"{metrica}_cuenta"] = func.count(columna)
+            columnas[f"{metrica}_minimo"] = func.min(columna)
+            columnas[f"{metrica}_maximo"] = func.max(columna)
+
+        columnas["errores_total"] = func.sum(
+            func.coalesce(h.ifinerr, 0) + func.coalesce(h.ifouterr, 0)
+        )
+        columnas["descartes_total"] = func.sum(
+            func.coalesce(h.ifindis, 0) + func.coalesce(h.ifoutdis, 0)
+        )
+        columnas["muestras"] = func.count(h.id)
+        return columnas
+
+    @staticmethod
+    def _obtener_watermark(db: Session) -> RollupWatermark:
+        """Leer (y bloquear) el watermark; lo crea en la primera ejecución"""
+        db.execute(
+            pg_insert(RollupWatermark)
+            .values(nombre=WATERMARK_INTERFACES, ultimo_id=0)
+            .on_conflict_do_nothing(index_elements=["nombre"])
+        )
+        # FOR UPDATE serializa ejecuciones concurrentes (varios workers)
+        return (
+            db.query(RollupWatermark)
+            .filter(RollupWatermark.nombre == WATERMARK_INTERFACES)
+            .with_for_update()
+            .one()
+        )
+
+    @staticmethod
+    def _limite_confirmado(db: Session) -> Optional[int]:
+        """Mayor id que ya no puede pertenecer a una transacción en curso
+
+        Los ids se asignan al insertar pero las filas se ven al confirmar: una
+        transacción larga puede tener ids menores que otros ya visibles. Se
+        anota el último valor de la secuencia junto con el xmax del snapshot y
+        ese valor sólo se da por asentado cuando el xmin de un snapshot
+        posterior lo supera (terminaron todas las transacciones de entonces).
+        Debe llamarse antes de escribir en la transacción (PostgreSQL 13+).
+        """
+        global _limite_pendiente
+
+        ultimo, xmin, xmax = db.execute(
+            text(
+                "SELECT coalesce(pg_sequence_last_value(pg_get_serial_sequence("
+                "'monitoreo.interface_historico', 'id')::regclass), 0), "
+                "pg_snapshot_xmin(pg_current_snapshot())::text::bigint, "
+                "pg_snapshot_xmax(pg_current_snapshot())::text::bigint"
+            )
+        ).one()
+
+        limite = None
+        if _limite_pendiente is not None and xmin >= _limite_pendiente[1]:
+            limite = _limite_pendiente[0]
+            _limite_pendiente = None
+        if xmin >= xmax:
+            # Ninguna transacción en curso: todo lo entregado está asentado
+            limite = ultimo
+        # El pendiente no se renueva hasta asentarse, o nunca lo haría con carga
+        if _limite_pendiente is None:
+            _limite_pendiente = (ultimo, xmax)
+        return limite
+
+    @staticmethod
+    def procesar_lote(
+        db: Session, tamano_lote: int = 50000, margen_segundos: int = 60
+    ) -> int:
+        """Incorporar a los rollups el siguiente lote de muestras nuevas
+
+        Procesa las filas con id posterior al watermark y avanza el watermark
+        en la misma transacción que los upserts: si el proceso se interrumpe
+        no queda nada a medias y la siguiente ejecución retoma el mismo lote
+        (idempotente y reanudable).
+
+        El watermark nunca pasa de `_limite_confirmado`, para no saltar ids
+        de transacciones que aún no han confirmado aunque duren más que el
+        margen; además se omiten las filas insertadas hace menos de
+        `margen_segundos`.
+
+        Devuelve la cantidad de muestras procesadas.
+        """
+
+        limite = RollupService._limite_confirmado(db)
+        watermark = RollupService._obtener_watermark(db)
+        desde = watermark.ultimo_id
+
+        if limite is None or limite <= desde:
+            db.commit()
+            return 0
+
+        # El lote termina antes de la primera fila demasiado reciente, para que
+        # el watermark nunca quede por delante de una fila sin procesar
+        corte = (
+            db.query(func.min(InterfaceHistorico.id))
+            .filter(
+                and_(
+                    InterfaceHistorico.id > desde,
+                    InterfaceHistorico.created_at
+                    > func.now() - timedelta(seconds=margen_segundos),
+                )
+            )
+            .scalar()
+        )
+
+        condiciones = [InterfaceHistorico.id > desde, InterfaceHistorico.id <= limite]
+        if corte is not None:
+            condiciones.append(InterfaceHistorico.id < corte)
+
+        lote = (
+            select(InterfaceHistorico.id)
+            .where(and_(*condiciones))
+            .order_by(InterfaceHistorico.id)
+            .limit(tamano_lote)
+            .subquery()
+        )
+        hasta, filas = db.query(func.max(lote.c.id), func.count(lote.c.id)).one()
+
+        if not filas:
+            db.commit()
+            return 0
+
+        tabla = InterfaceHistoricoRollup.__table__
+        agregados = RollupService._agregados()
+
+        for periodo in PERIODOS_ROLLUP:
+            bucket = RollupService.expresion_bucket(periodo)
+            seleccion = (
+                select(
+                    literal(periodo),
+                    InterfaceHistorico.devid,
+                    InterfaceHistorico.devif,
+                    bucket,
+                    *agregados.values(),
+                )
+                .where(
+                    and_(InterfaceHistorico.id > desde, InterfaceHistorico.id <= hasta)
+                )
+                .group_by(InterfaceHistorico.devid, InterfaceHistorico.devif, bucket)
+            )
+
+            stmt = pg_insert(tabla).from_select(
+                ["periodo", "devid", "devif", "bucket", *agregados.keys()], seleccion
+            )
+            nuevo = stmt.excluded
+
+            # Acumular el lote sobre el bucket existente
+            acumular: Dict[str, Any] = {
+                "muestras": tabla.c.muestras + nuevo.muestras,
+                "errores_total": func.coalesce(tabla.c.errores_total, 0)
+                + func.coalesce(nuevo.errores_total, 0),
+                "descartes_total": func.coalesce(tabla.c.descartes_total, 0)
+                + func.coalesce(nuevo.descartes_total, 0),
+                "actualizado_en": func.now(),
+            }
+            for metrica in METRICAS_ROLLUP:
+                suma, cuenta = f"{metrica}_suma", f"{metrica}_cuenta"
+                minimo, maximo = f"{metrica}_minimo", f"{metrica}_maximo"
+                acumular[suma] = func.coalesce(tabla.c[suma], 0) + func.coalesce(
+                    nuevo[suma], 0
+                )
+                acumular[cuenta] = tabla.c[cuenta] + nuevo[cuenta]
+                # LEAST/GREATEST ignoran NULL en PostgreSQL
+                acumular[minimo] = func.least(tabla.c[minimo], nuevo[minimo])
+                acumular[maximo] = func.greatest(tabla.c[maximo], nuevo[maximo])
+
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["periodo", "devid", "devif", "bucket"],
+                    set_=acumular,
+                )
+            )
+
+        watermark.ultimo_id = hasta
+        db.commit()
+
+        return filas
+
+    @staticmethod
+    def ejecutar_pendientes(max_lotes: int = 20) -> int:
+        """Procesar lotes hasta alcanzar los datos recientes (tarea periódica)"""
+
+        db = SessionLocal()
+        try:
+            if db.get_bind().dialect.name != "postgresql":
+                logger.warning("Rollups de interfaces requieren PostgreSQL; omitido")
+                return 0
+
+            total = 0
+            for _ in range(max_lotes):
+                procesadas = RollupService.procesar_lote(
+                    db, tamano_lote=settings.ROLLUP_TAMANO_LOTE
+                )
+                total += procesadas
+                if procesadas < settings.ROLLUP_TAMANO_LOTE:
+                    break
+
+            if total:
+                logger.info(f"Rollups de interfaces: {total} muestras incorporadas")
+            return total
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_buckets(
+        db: Session,
+        periodo: str,
+        devid: int,
+        devif: int,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+    ) -> List[Dict[str, Any]]:
+        """Buckets del periodo combinando rollup y muestras aún no procesadas
+
+        Los buckets precalculados se completan con las muestras posteriores
+        al watermark (la "cola" reciente), que se agregan al vuelo.
+        """
+
+        rollups = (
+            db.query(InterfaceHistoricoRollup)
+            .filter(
+                and_(
+                    InterfaceHistoricoRollup.periodo == periodo,
+                    InterfaceHistoricoRollup.devid == devid,
+                    InterfaceHistoricoRollup.devif == devif,
+                    InterfaceHistoricoRollup.bucket >= fecha_inicio,
+                    InterfaceHistoricoRollup.bucket < fecha_fin,
+                )
+            )
+            .all()
+        )
+
+        buckets: Dict[datetime, Dict[str, Any]] = {
+            fila.bucket: {
+                columna: getattr(fila, columna)
+                for columna in RollupService._agregados().keys()
+            }
+            for fila in rollups
+        }
+
+        ultimo_id = (
+            db.query(RollupWatermark.ultimo_id)
+            .filter(RollupWatermark.nombre == WATERMARK_INTERFACES)
+            .scalar()
+        ) or 0
+
+        for bucket, cola in RollupService._agregar_al_vuelo(
+            db, periodo, devid, devif, fecha_inicio, fecha_fin, desde_id=ultimo_id
+        ).items():
+            buckets[bucket] = RollupService._combinar(buckets.get(bucket), cola)
+
+        return [{"bucket": bucket, **buckets[bucket]} for bucket in sorted(buckets)]
+
+    @staticmethod
+    def _agregar_al_vuelo(
+        db: Session,
+        periodo: str,
+        devid: int,
+        devif: int,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+        desde_id: int = 0,
+        hasta_id: Optional[int] = None,
+    ) -> Dict[datetime, Dict[str, Any]]:
+        """Agregar muestras crudas por bucket (mismas columnas que el rollup)
+
+        Igual que en la tabla de rollup, se consideran los buckets cuyo
+        inicio está en [fecha_inicio, fecha_fin), completos.
+        """
+
+        bucket = RollupService.expresion_bucket(periodo)
+        agregados = RollupService._agregados()
+
+        condiciones = [
+            InterfaceHistorico.devid == devid,
+            InterfaceHistorico.devif == devif,
+            # Rango de timestamp para usar el índice; el bucket acota el resto
+            InterfaceHistorico.timestamp >= fecha_inicio,
+            InterfaceHistorico.timestamp
+            < fecha_fin + timedelta(seconds=PERIODOS_ROLLUP[periodo]),
+            bucket >= fecha_inicio,
+            bucket < fecha_fin,
+            InterfaceHistorico.id > desde_id,
+        ]
+        if hasta_id is not None:
+            condiciones.append(InterfaceHistorico.id <= hasta_id)
+
+        filas = (
+            db.query(bucket.label("bucket"), *agregados.values())
+            .filter(and_(*condiciones))
+            .group_by(bucket)
+            .all()
+        )
+
+        return {fila[0]: dict(zip(agregados.keys(), fila[1:])) for fila in filas}
+
+    @staticmethod
+    def _combinar(
+        base: Optional[Dict[str, Any]], extra: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combinar dos agregados del mismo bucket (misma regla que el upsert)"""
+        if base is None:
+            return dict(extra)
+
+        combinado: Dict[str, Any] = {}
+        for columna, valor in base.items():
+            otro = extra.get(columna)
+            if columna.endswith("_minimo"):
+                valores = [v for v in (valor, otro) if v is not None]
+                combinado[columna] = min(valores) if valores else None
+            elif columna.endswith("_maximo"):
+                valores = [v for v in (valor, otro) if v is not None]
+                combinado[columna] = max(valores) if valores else None
+            else:
+                combinado[columna] = (valor or 0) + (otro or 0)
+        return combinado
+
+    @staticmethod
+    def verificar(
+        db: Session,
+        periodo: str,
+        devid: int,
+        devif: int,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+    ) -> List[Dict[str, Any]]:
+        """Comparar el rollup con la agregación al vuelo de las muestras crudas
+
+        Sólo considera muestras ya incorporadas (id <= watermark). Devuelve
+        la lista de diferencias por bucket; vacía si el rollup es correcto.
+        """
+
+        ultimo_id = (
+            db.query(RollupWatermark.ultimo_id)
+            .filter(RollupWatermark.nombre == WATERMARK_INTERFACES)
+            .scalar()
+        ) or 0
+
+        esperado = RollupService._agregar_al_vuelo(
+            db, periodo, devid, devif, fecha_inicio, fecha_fin, hasta_id=ultimo_id
+        )
+
+        rollups = {
+            fila.bucket: fila
+            for fila in db.query(InterfaceHistoricoRollup).filter(
+                and_(
+                    InterfaceHistoricoRollup.periodo == periodo,
+                    InterfaceHistoricoRollup.devid == devid,
+                    InterfaceHistoricoRollup.devif == devif,
+                    InterfaceHistoricoRollup.bucket >= fecha_inicio,
+                    InterfaceHistoricoRollup.bucket < fecha_fin,
+                )
+            )
+        }
+
+        diferencias = []
+        for bucket in sorted(set(esperado) | set(rollups)):
+            fila = rollups.get(bucket)
+            valores = esperado.get(bucket, {})
+            for columna in RollupService._agregados().keys():
+                obtenido = getattr(fila, columna) if fila is not None else None
+                calculado = valores.get(columna)
+                # Las sumas vacías se guardan como 0 al acumular lotes
+                if columna.endswith(("_suma", "_total")):
+                    obtenido, calculado = obtenido or 0, calculado or 0
+                if obtenido != calculado:
+                    diferencias.append(
+                        {
+                            "bucket": bucket,
+                            "columna": columna,
+                            "rollup": obtenido,
+                            "esperado": calculado,
+                        }
+                    )
+
+        return diferencias
@@ -0,0 +1,163 @@
+# backend/app/services/stream_service.py
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from app.core.busqueda import es_postgresql
+from app.core.config import settings
+from app.core.database import get_async_engine
+from app.core.eventos import Difusor
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Canal de LISTEN/NOTIFY; el trigger de dispositivos del script 15 usa el mismo
+CANAL_ESTADO = "monitoreo_estado"
+
+# Espera antes de reintentar la conexión del listener
+REINTENTO_SEGUNDOS = 5
+
+difusor_estado = Difusor(
+    "estado",
+    maximo_cola=settings.STREAM_COLA_MAXIMO,
+    maximo_suscriptores=settings.STREAM_MAX_SUSCRIPTORES,
+)
+
+_listener: Optional[asyncio.Task] = None
+
+
+def _usa_notify(db: Session) -> bool:
+    return settings.STREAM_FUENTE == "postgres" and es_postgresql(db)
+
+
+class StreamService:
+
+    @staticmethod
+    def eventos_interfaces(
+        filas: Iterable[Any], ubicaciones: Mapping[int, Any]
+    ) -> List[Dict[str, Any]]:
+        """Eventos de las interfaces cuyo estado cambió en un lote de la ingesta
+
+        `filas` es el RETURNING del upsert (id, devid, devif, ifname, ifstatus,
+        iflc, time, insertada): el upsert fija iflc = time cuando ifstatus
+        cambia y también al insertar una interface nueva, que no es un cambio
+        de estado y se omite. `ubicaciones` da zona y área por devid.
+        """
+        eventos = []
+        for fila in filas:
+            if fila.insertada:
+                continue
+            if fila.ifstatus is None or fila.iflc is None or fila.iflc != fila.time:
+                continue
+            ubicacion = ubicaciones.get(fila.devid)
+            eventos.append(
+                {
+                    "tipo": "interface",
+                    "id": fila.id,
+                    "devid": fila.devid,
+                    "devif": fila.devif,
+                    "ifname": fila.ifname,
+                    "ifstatus": fila.ifstatus,
+                    "zona": ubicacion.zona if ubicacion else None,
+                    "area": ubicacion.area if ubicacion else None,
+                    "time": fila.time.isoformat(),
+                }
+            )
+        return eventos
+
+    @staticmethod
+    def notificar(db: Session, eventos: List[Dict[str, Any]]) -> None:
+        """Enviar los eventos con NOTIFY dentro de la transacción del llamador
+
+        PostgreSQL los entrega a los listeners sólo si la transacción se
+        confirma. Sin NOTIFY (fuente "memoria" u otro motor) no hace nada: el
+        llamador usa publicar_local después de confirmar.
+        """
+        if not eventos or not _usa_notify(db):
+            return
+        db.execute(
+            text(
+                "SELECT pg_notify(:canal, p) FROM unnest(CAST(:payloads AS text[])) p"
+            ),
+            {
+                "canal": CANAL_ESTADO,
+                "payloads": [
+                    json.dumps(evento, default=str, separators=(",", ":"))
+                    for evento in eventos
+                ],
+            },
+        )
+
+    @staticmethod
+    def publicar_local(db: Session, eventos: List[Dict[str, Any]]) -> None:
+        """Publicar en el difusor de este proceso (ya confirmados, sin NOTIFY)"""
+        if eventos and not _usa_notify(db):
+            difusor_estado.publicar_desde_hilo(eventos)
+
+    @staticmethod
+    def _recibir(conexion: Any, pid: int, canal: str, payload: str) -> None:
+        try:
+            evento = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Notificación inválida en '{canal}': {payload[:200]}")
+            return
+        difusor_estado.publicar([evento])
+
+    @staticmethod
+    async def _escuchar() -> None:
+        """Mantener un LISTEN sobre CANAL_ESTADO y reenviar al difusor
+
+        Usa una conexión dedicada del engine asíncrono (asyncpg). Si se
+        pierde, se reconecta; los eventos emitidos mientras tanto se pierden
+        y los clientes se resincronizan con /cambios.
+        """
+        while True:
+            try:
+                async with get_async_engine().connect() as conexion:
+                    crudo = (await conexion.get_raw_connection()).driver_connection
+                    await crudo.add_listener(CANAL_ESTADO, StreamService._recibir)
+                    logger.info(f"Stream: escuchando el canal '{CANAL_ESTADO}'")
+                    try:
+                        while not crudo.is_closed():
+                            await asyncio.sleep(settings.STREAM_LATIDO_SEGUNDOS)
+                    finally:
+                        if not crudo.is_closed():
+                            await crudo.remove_listener(
+                                CANAL_ESTADO, StreamService._recibir
+                            )
+                logger.warning("Stream: se cerró la conexión del listener")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Stream: error en el listener de LISTEN/NOTIFY")
+            await asyncio.sleep(REINTENTO_SEGUNDOS)
+
+    @staticmethod
+    async def iniciar() -> None:
+        global _listener
+        difusor_estado.iniciar(asyncio.get_running_loop())
+        if settings.STREAM_FUENTE == "postgres" and _listener is None:
+            _listener = asyncio.create_task(StreamService._escuchar())
+
+    @staticmethod
+    async def detener() -> None:
+        global _listener
+        await difusor_estado.detener()
+        if _listener is None:
+            return
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+
+    @staticmethod
+    def estadisticas() -> Dict[str, Any]:
+        return {
+            "fuente": settings.STREAM_FUENTE,
+            "escuchando": _listener is not None and not _listener.done(),
+            **difusor_estado.estadisticas(),
+        }
@@ -0,0 +1,235 @@
+# backend/app/services/typeahead_service.py
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.typeahead import EntradaTypeahead, IndiceTypeahead, normalizar
+from app.models.dispositivos import Dispositivos
+from app.models.interfaces import Interfaces
+from app.services.dispositivos_service import DispositivosService
+from app.services.interfaces_service import InterfacesService
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Índice del proceso (cada worker mantiene el suyo)
+indice_typeahead = IndiceTypeahead()
+
+# Ventana que se relee antes de la última marca en cada refresco
+MARGEN_REFRESCO = timedelta(seconds=60)
+
+
+class _EstadoTypeahead:
+    listo = False
+    marca_dispositivos: Optional[datetime] = None
+    marca_interfaces: Optional[datetime] = None
+    ultima_reconstruccion: float = 0.0
+    ultimo_refresco: Optional[datetime] = None
+
+
+def _entrada_dispositivo(fila) -> EntradaTypeahead:
+    devip = str(fila.devip) if fila.devip is not None else None
+    return EntradaTypeahead(
+        clave=("dispositivo", fila.devid),
+        tipo="dispositivo",
+        id=fila.devid,
+        etiqueta=fila.devname or devip or str(fila.devid),
+        detalle=devip,
+        devid=fila.devid,
+        textos=tuple(t for t in (normalizar(fila.devname), normalizar(devip)) if t),
+    )
+
+
+def _entrada_interface(fila) -> EntradaTypeahead:
+    return EntradaTypeahead(
+        clave=("interface", fila.id),
+        tipo="interface",
+        id=fila.id,
+        etiqueta=fila.ifname or str(fila.devif),
+        detalle=" · ".join(t for t in (fila.dispositivo_nombre, fila.ifalias) if t)
+        or None,
+        devid=fila.devid,
+        textos=tuple(
+            t for t in (normalizar(fila.ifname), normalizar(fila.ifalias)) if t
+        ),
+    )
+
+
+class TypeaheadService:
+
+    @staticmethod
+    def _dispositivos(db: Session, desde: Optional[datetime]) -> List[Any]:
+        query = db.query(
+            Dispositivos.devid,
+            Dispositivos.devname,
+            Dispositivos.devip,
+            Dispositivos.updated_at,
+        )
+        if desde is not None:
+            query = query.filter(Dispositivos.updated_at >= desde)
+        return query.all()
+
+    @staticmethod
+    def _interfaces(db: Session, desde: Optional[datetime]) -> List[Any]:
+        query = (
+            db.query(
+                Interfaces.id,
+                Interfaces.devid,
+                Interfaces.devif,
+                Interfaces.ifname,
+                Interfaces.ifalias,
+                Interfaces.updated_at,
+                Dispositivos.devname.label("dispositivo_nombre"),
+            )
+            .select_from(Interfaces)
+            .outerjoin(Interfaces.dispositivo)
+        )
+        if desde is not None:
+            query = query.filter(Interfaces.updated_at >= desde)
+        return query.all()
+
+    @staticmethod
+    def _marca(filas: Iterable[Any], actual: Optional[datetime]) -> Optional[datetime]:
+        marcas = [f.updated_at for f in filas if f.updated_at is not None]
+        if actual is not None:
+            marcas.append(actual)
+        return max(marcas) if marcas else None
+
+    @staticmethod
+    def reconstruir(db: Session) -> int:
+        """Cargar el índice completo desde Dispositivos e Interfaces"""
+
+        dispositivos = TypeaheadService._dispositivos(db, None)
+        interfaces = TypeaheadService._interfaces(db, None)
+
+        indice_typeahead.reemplazar(
+            [_entrada_dispositivo(f) for f in dispositivos]
+            + [_entrada_interface(f) for f in interfaces]
+        )
+
+        _EstadoTypeahead.marca_dispositivos = TypeaheadService._marca(
+            dispositivos, None
+        )
+        _EstadoTypeahead.marca_interfaces = TypeaheadService._marca(interfaces, None)
+        _EstadoTypeahead.ultima_reconstruccion = time.monotonic()
+        _EstadoTypeahead.listo = True
+        return len(dispositivos) + len(interfaces)
+
+    @staticmethod
+    def refrescar(db: Session) -> int:
+        """Reindexar las filas con updated_at desde la última marca
+
+        updated_at es la hora de inicio de la transacción que modificó la
+        fila, por lo que una transacción larga puede confirmar filas con una
+        marca anterior a la ya vista: se relee una ventana de
+        MARGEN_REFRESCO antes de la marca y se omiten las entradas sin
+        cambios. Las filas eliminadas sólo desaparecen en la siguiente
+        reconstrucción completa.
+        """
+
+        def desde(marca: Optional[datetime]) -> Optional[datetime]:
+            return marca - MARGEN_REFRESCO if marca is not None else None
+
+        dispositivos = TypeaheadService._dispositivos(
+            db, desde(_EstadoTypeahead.marca_dispositivos)
+        )
+        interfaces = TypeaheadService._interfaces(
+            db, desde(_EstadoTypeahead.marca_interfaces)
+        )
+
+        cantidad = indice_typeahead.actualizar(
+            [_entrada_dispositivo(f) for f in dispositivos]
+            + [_entrada_interface(f) for f in interfaces]
+        )
+
+        _EstadoTypeahead.marca_dispositivos = TypeaheadService._marca(
+            dispositivos, _EstadoTypeahead.marca_dispositivos
+        )
+        _EstadoTypeahead.marca_interfaces = TypeaheadService._marca(
+            interfaces, _EstadoTypeahead.marca_interfaces
+        )
+        return cantidad
+
+    @staticmethod
+    def ejecutar_refresco() -> None:
+        """Tarea periódica: reconstrucción inicial/periódica o refresco"""
+
+        db = SessionLocal()
+        try:
+            inicio = time.perf_counter()
+            vencida = (
+                time.monotonic() - _EstadoTypeahead.ultima_reconstruccion
+                >= settings.TYPEAHEAD_RECONSTRUIR_SEGUNDOS
+            )
+            if not _EstadoTypeahead.listo or vencida:
+                cantidad = TypeaheadService.reconstruir(db)
+                logger.info(
+                    f"Índice typeahead reconstruido: {cantidad} entradas en "
+                    f"{time.perf_counter() - inicio:.2f}s"
+                )
+            else:
+                cantidad = TypeaheadService.refrescar(db)
+                if cantidad:
+                    logger.debug(f"Índice typeahead: {cantidad} entradas refrescadas")
+            _EstadoTypeahead.ultimo_refresco = datetime.now()
+        finally:
+            db.close()
+
+    @staticmethod
+    def listo() -> bool:
+        return _EstadoTypeahead.listo
+
+    @staticmethod
+    def buscar(
+        termino: str, limite: int = 10, tipo: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Mejores coincidencias desde el índice en memoria"""
+        return [
+            TypeaheadService._resultado(entrada)
+            for entrada in indice_typeahead.buscar(termino, limite, tipo)
+        ]
+
+    @staticmethod
+    def buscar_en_bd(
+        db: Session, termino: str, limite: int = 10, tipo: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Alternativa con las búsquedas de la BD (índice no disponible)"""
+
+        entradas: List[EntradaTypeahead] = []
+        if tipo in (None, "dispositivo"):
+            dispositivos, _, _ = DispositivosService.buscar(
+                db, termino, limit=limite, modo_total="omitir", orden="relevancia"
+            )
+            entradas += [_entrada_dispositivo(d) for d in dispositivos]
+        if tipo in (None, "interface"):
+            interfaces, _, _ = InterfacesService.buscar(
+                db, termino, limit=limite, modo_total="omitir", orden="relevancia"
+            )
+            entradas += [_entrada_interface(i) for i in interfaces]
+
+        return [TypeaheadService._resultado(e) for e in entradas[:limite]]
+
+    @staticmethod
+    def _resultado(entrada: EntradaTypeahead) -> Dict[str, Any]:
+        return {
+            "tipo": entrada.tipo,
+            "id": entrada.id,
+            "etiqueta": entrada.etiqueta,
+            "detalle": entrada.detalle,
+            "devid": entrada.devid,
+        }
+
+    @staticmethod
+    def estadisticas() -> Dict[str, Any]:
+        return {
+            "listo": _EstadoTypeahead.listo,
+            "ultimo_refresco": (
+                _EstadoTypeahead.ultimo_refresco.isoformat()
+                if _EstadoTypeahead.ultimo_refresco
+                else None
+            ),
+            **indice_typeahead.estadisticas(),
+        }
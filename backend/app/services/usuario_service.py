@@ -1,13 +1,23 @@
 # backend/app/services/usuario_service.py
-from datetime import datetime
-from typing import List, Optional
-
-from app.core.security import get_password_hash, verify_password
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.auditoria import ColaEscritura
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import ClaveOrden, Conteo, contar_total, paginar
+from app.core.security import get_password_hash, invalidar_usuario, verify_password
 from app.models import Usuario, UsuarioHistoria
 from app.schemas.usuario import UsuarioChangePassword, UsuarioCreate, UsuarioUpdate
-from sqlalchemy import or_
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session, joinedload
 
+# Orden del historial (más reciente primero); claves del cursor keyset
+ORDEN_HISTORIA = [
+    ClaveOrden(UsuarioHistoria.fecha, True, lambda h: h.fecha),
+    ClaveOrden(UsuarioHistoria.id, True, lambda h: h.id),
+]
+
 
 class UsuarioService:
 
@@ -91,13 +101,11 @@ class UsuarioService:
         db.add(db_usuario)
         db.flush()  # Para obtener el ID
 
-        # Crear registro de auditoría
-        UsuarioService._create_historia(
-            db=db,
-            usuario=db_usuario,
-        )
+        # Registro de auditoría (se escribe en segundo plano tras confirmar)
+        historia = UsuarioService._registro_historia(usuario=db_usuario)
 
         db.commit()
+        cola_historia.encolar(historia)
         db.refresh(db_usuario)
         return db_usuario
 
@@ -138,13 +146,18 @@ class UsuarioService:
 
         db_usuario.fecha_modificacion = datetime.utcnow()
 
-        # Crear registro de auditoría
-        UsuarioService._create_historia(
-            db=db,
+        # Registro de auditoría (se escribe en segundo plano tras confirmar)
+        historia = UsuarioService._registro_historia(
             usuario=usuario_anterior,  # Estado anterior
         )
 
         db.commit()
+        cola_historia.encolar(historia)
+
+        # El usuario cacheado puede tener email, rol o estado anteriores
+        invalidar_usuario(usuario_anterior.email)
+        invalidar_usuario(db_usuario.email)
+
         db.refresh(db_usuario)
         return db_usuario
 
@@ -171,14 +184,15 @@ class UsuarioService:
         db_usuario.clave_hash = get_password_hash(password_data.clave_nueva)
         db_usuario.fecha_modificacion = datetime.utcnow()
 
-        # Crear registro de auditoría (sin incluir hash de contraseña)
-        UsuarioService._create_historia(
-            db=db,
+        # Registro de auditoría (sin incluir hash de contraseña)
+        historia = UsuarioService._registro_historia(
             usuario=db_usuario,
             include_password=False,
         )
 
         db.commit()
+        cola_historia.encolar(historia)
+        invalidar_usuario(db_usuario.email)
         return True
 
     @staticmethod
@@ -199,53 +213,92 @@ class UsuarioService:
         db_usuario.estado_id = 2
         db_usuario.fecha_modificacion = datetime.utcnow()
 
-        # Crear registro de auditoría
-        UsuarioService._create_historia(
-            db=db,
-            usuario=db_usuario,
-        )
+        # Registro de auditoría (se escribe en segundo plano tras confirmar)
+        historia = UsuarioService._registro_historia(usuario=db_usuario)
 
         db.commit()
+        cola_historia.encolar(historia)
+        invalidar_usuario(db_usuario.email)
         return True
 
     @staticmethod
     def get_historia(
-        db: Session, usuario_id: Optional[int] = None, skip: int = 0, limit: int = 100
-    ) -> tuple[List[UsuarioHistoria], int]:
-        """Obtener historial de auditoría de usuarios"""
-
-        query = db.query(UsuarioHistoria).options(
-            joinedload(UsuarioHistoria.usuario),
-            joinedload(UsuarioHistoria.rol),
-            joinedload(UsuarioHistoria.estado),
-            joinedload(UsuarioHistoria.usuario_modificador),
-        )
+        db: Session,
+        usuario_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        modo_total: str = "exacto",
+    ) -> Tuple[List[UsuarioHistoria], Conteo, Optional[str]]:
+        """Obtener historial de auditoría de usuarios
+
+        Orden (fecha, id) descendente con cursor keyset; los filtros por
+        usuario y rango de fechas usan los índices del script de auditoría.
+        """
+
+        query = db.query(UsuarioHistoria)
 
         if usuario_id:
             query = query.filter(UsuarioHistoria.usuario_id == usuario_id)
 
-        query = query.order_by(UsuarioHistoria.fecha.desc())
+        if desde:
+            query = query.filter(UsuarioHistoria.fecha >= desde)
 
-        total = query.count()
-        historia = query.offset(skip).limit(limit).all()
+        if hasta:
+            query = query.filter(UsuarioHistoria.fecha < hasta)
 
-        return historia, total
+        conteo = contar_total(db, query, modo_total)
+        historia, siguiente_cursor = paginar(
+            query, "historia", ORDEN_HISTORIA, skip, limit, cursor
+        )
+
+        return historia, conteo, siguiente_cursor
 
     @staticmethod
-    def _create_historia(
-        db: Session,
+    def _registro_historia(
         usuario: Usuario,
         include_password: bool = False,
-    ):
-        """Crear registro de auditoría en usuario_historia"""
-
-        historia = UsuarioHistoria(
-            usuario_id=usuario.id,
-            rol_id=usuario.rol_id,
-            email=usuario.email,
-            nombre_usuario=usuario.nombre_usuario,
-            clave_hash=usuario.clave_hash if include_password else None,
-            estado_id=usuario.estado_id,
-        )
+    ) -> Dict[str, Any]:
+        """Registro de auditoría para usuario_historia (estado del usuario)"""
+
+        return {
+            "usuario_id": usuario.id,
+            "rol_id": usuario.rol_id,
+            "email": usuario.email,
+            "nombre_usuario": usuario.nombre_usuario,
+            "clave_hash": usuario.clave_hash if include_password else None,
+            "estado_id": usuario.estado_id,
+            # Momento del cambio, no el de la escritura en segundo plano. Con
+            # zona horaria (UTC): al guardarlo en la columna TIMESTAMP (sin
+            # zona) PostgreSQL lo convierte a la zona de la sesión, igual que
+            # el DEFAULT now() con el que se registraban los cambios antes
+            "fecha": datetime.now(timezone.utc),
+        }
 
-        db.add(historia)
+    @staticmethod
+    def escribir_historia(registros: List[Dict[str, Any]]) -> None:
+        """Insertar un lote de registros de auditoría (hilo de cola_historia)"""
+
+        db = SessionLocal()
+        try:
+            db.execute(insert(UsuarioHistoria), registros)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Auditoría write-behind: las mutaciones de usuarios sólo encolan el registro
+cola_historia = ColaEscritura(
+    "usuario_historia",
+    UsuarioService.escribir_historia,
+    maximo=settings.AUDITORIA_COLA_MAXIMO,
+    tamano_lote=settings.AUDITORIA_TAMANO_LOTE,
+    intervalo_segundos=settings.AUDITORIA_INTERVALO_SEGUNDOS,
+    plazo_segundos=settings.AUDITORIA_PLAZO_SEGUNDOS,
+    identificar=lambda registro: registro["usuario_id"],
+)
@@ -118,4 +118,13 @@ BEGIN
     IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_usuario_estado') THEN
         CREATE INDEX idx_usuario_estado ON seguridad.usuario (estado_id);
     END IF;
+
+    -- Historial de auditoría: por usuario y completo, en orden (fecha, id)
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_usuario_historia_usuario_fecha') THEN
+        CREATE INDEX idx_usuario_historia_usuario_fecha ON seguridad.usuario_historia (usuario_id, fecha DESC, id DESC);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'idx_usuario_historia_fecha') THEN
+        CREATE INDEX idx_usuario_historia_fecha ON seguridad.usuario_historia (fecha DESC, id DESC);
+    END IF;
 END $$;
\ No newline at end of file
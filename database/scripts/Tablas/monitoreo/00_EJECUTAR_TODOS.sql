@@ -10,7 +10,9 @@
 -- 3. Ejecutar todo el script (F5 o botón Execute)
 --
 -- NOTA: Los scripts individuales también pueden ejecutarse por separado
--- en el orden indicado (01, 02, 03, etc.)
+-- en el orden indicado (01, 02, 03, etc.). Los pasos 7 a 14 reproducen los
+-- scripts de optimización 08 a 15, que el backend requiere; al modificar uno
+-- de ellos, actualizar también su paso en este archivo.
 -- ============================================================================
 
 DO $$
@@ -28,7 +30,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 1/7: Creando esquema monitoreo...';
+    RAISE NOTICE 'PASO 1/15: Creando esquema monitoreo...';
 END $$;
 
 DROP SCHEMA IF EXISTS monitoreo CASCADE;
@@ -46,7 +48,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 2/7: Creando tabla dispositivos...';
+    RAISE NOTICE 'PASO 2/15: Creando tabla dispositivos...';
 END $$;
 
 CREATE TABLE monitoreo.dispositivos (
@@ -90,7 +92,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 3/7: Creando tabla interfaces...';
+    RAISE NOTICE 'PASO 3/15: Creando tabla interfaces...';
 END $$;
 
 CREATE TABLE monitoreo.interfaces (
@@ -154,7 +156,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 4/7: Creando tabla interface_historico...';
+    RAISE NOTICE 'PASO 4/15: Creando tabla interface_historico...';
 END $$;
 
 CREATE TABLE monitoreo.interface_historico (
@@ -198,7 +200,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 5/7: Creando tabla dispositivo_historico...';
+    RAISE NOTICE 'PASO 5/15: Creando tabla dispositivo_historico...';
 END $$;
 
 CREATE TABLE monitoreo.dispositivo_historico (
@@ -236,7 +238,7 @@ END $$;
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 6/7: Creando funciones y triggers...';
+    RAISE NOTICE 'PASO 6/15: Creando funciones y triggers...';
 END $$;
 
 -- Función para actualizar timestamp
@@ -288,11 +290,697 @@ BEGIN
 END $$;
 
 -- ============================================================================
--- PASO 7: Resumen final
+-- PASO 7: Crear índices de paginación keyset (08_create_indexes_keyset.sql)
 -- ============================================================================
 DO $$
 BEGIN
-    RAISE NOTICE 'PASO 7/7: Verificando creación...';
+    RAISE NOTICE 'PASO 7/15: Creando índices de paginación keyset...';
+END $$;
+
+-- Listado de dispositivos: ORDER BY devname, devid
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devname_devid
+    ON monitoreo.dispositivos(devname, devid);
+
+-- Listado general de interfaces: ORDER BY devid, devif
+-- (cubierto por la restricción UNIQUE (devid, devif))
+
+-- Alta utilización: ORDER BY ifutil DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifutil_id
+    ON monitoreo.interfaces(ifutil DESC, id DESC)
+    WHERE ifutil IS NOT NULL AND ifgraficar = 1;
+
+-- Por velocidad: ORDER BY ifspeed DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifspeed_id
+    ON monitoreo.interfaces(ifspeed DESC, id DESC)
+    WHERE ifspeed IS NOT NULL;
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_devname_devid IS 'Paginación keyset del listado de dispositivos';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifutil_id IS 'Paginación keyset de interfaces con alta utilización';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifspeed_id IS 'Paginación keyset de interfaces por velocidad';
+
+-- Mantener estadísticas al día: el modo_total=estimado usa el planificador
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 08_create_indexes_keyset.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 8: Crear tablas de rollup (09_create_rollup_tables.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 8/15: Creando tablas de rollup...';
+END $$;
+
+-- Agregados por bucket: se guardan suma y cuenta para poder acumular lotes
+-- nuevos sobre un bucket existente (promedio = suma / cuenta)
+CREATE TABLE IF NOT EXISTS monitoreo.interface_historico_rollup (
+    periodo VARCHAR(10) NOT NULL,
+    devid INTEGER NOT NULL,
+    devif INTEGER NOT NULL,
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+
+    input_suma NUMERIC,
+    input_cuenta INTEGER,
+    input_minimo BIGINT,
+    input_maximo BIGINT,
+
+    output_suma NUMERIC,
+    output_cuenta INTEGER,
+    output_minimo BIGINT,
+    output_maximo BIGINT,
+
+    ifutil_suma NUMERIC,
+    ifutil_cuenta INTEGER,
+    ifutil_minimo DECIMAL(5,2),
+    ifutil_maximo DECIMAL(5,2),
+
+    errores_total BIGINT,
+    descartes_total BIGINT,
+    muestras INTEGER NOT NULL,
+
+    actualizado_en TIMESTAMP DEFAULT NOW(),
+
+    CONSTRAINT pk_interface_historico_rollup
+        PRIMARY KEY (periodo, devid, devif, bucket),
+    CONSTRAINT chk_rollup_periodo
+        CHECK (periodo IN ('5min', 'hourly', 'daily'))
+);
+
+-- Último id de interface_historico incorporado a los rollups
+CREATE TABLE IF NOT EXISTS monitoreo.rollup_watermark (
+    nombre VARCHAR(50) PRIMARY KEY,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE monitoreo.interface_historico_rollup IS 'Agregados de interface_historico por periodo (5min, hourly, daily)';
+COMMENT ON COLUMN monitoreo.interface_historico_rollup.bucket IS 'Inicio del bucket';
+COMMENT ON COLUMN monitoreo.interface_historico_rollup.muestras IS 'Muestras acumuladas en el bucket';
+COMMENT ON TABLE monitoreo.rollup_watermark IS 'Progreso del proceso incremental de rollups';
+
+-- El proceso incremental recorre interface_historico por id (PK)
+-- y filtra por created_at para no adelantarse a transacciones en curso
+CREATE INDEX IF NOT EXISTS idx_interface_historico_created_at
+    ON monitoreo.interface_historico(created_at);
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 09_create_rollup_tables.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 9: Particionar tablas históricas (10_particionar_historicos.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 9/15: Particionando tablas históricas...';
+END $$;
+
+-- ============================================================================
+-- Política de particionamiento por tabla
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS monitoreo.particion_politica (
+    tabla VARCHAR(63) PRIMARY KEY,
+    intervalo VARCHAR(5) NOT NULL,
+    anticipacion INTEGER NOT NULL DEFAULT 7,
+    retencion INTERVAL,
+    actualizado_en TIMESTAMP DEFAULT NOW(),
+
+    CONSTRAINT chk_particion_intervalo CHECK (intervalo IN ('day', 'month')),
+    CONSTRAINT chk_particion_anticipacion CHECK (anticipacion >= 0)
+);
+
+COMMENT ON TABLE monitoreo.particion_politica IS 'Intervalo, particiones futuras y retención de las tablas históricas';
+COMMENT ON COLUMN monitoreo.particion_politica.intervalo IS 'Rango de cada partición: day o month';
+COMMENT ON COLUMN monitoreo.particion_politica.anticipacion IS 'Particiones futuras que se mantienen creadas';
+COMMENT ON COLUMN monitoreo.particion_politica.retencion IS 'Antigüedad a partir de la cual se elimina la partición (NULL = sin retención)';
+
+INSERT INTO monitoreo.particion_politica (tabla, intervalo, anticipacion, retencion)
+VALUES
+    ('interface_historico', 'day', 7, INTERVAL '90 days'),
+    ('dispositivo_historico', 'month', 3, INTERVAL '2 years')
+ON CONFLICT (tabla) DO NOTHING;
+
+-- ============================================================================
+-- Funciones de mantenimiento
+-- ============================================================================
+
+-- Inicio (UTC) de la partición que contiene p_momento
+CREATE OR REPLACE FUNCTION monitoreo.inicio_particion(p_intervalo TEXT, p_momento TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_trunc(p_intervalo, p_momento AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Crear (si no existe) la partición de p_tabla que contiene p_momento
+CREATE OR REPLACE FUNCTION monitoreo.crear_particion(
+    p_tabla TEXT,
+    p_intervalo TEXT,
+    p_momento TIMESTAMPTZ
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_desde TIMESTAMPTZ := monitoreo.inicio_particion(p_intervalo, p_momento);
+    v_hasta TIMESTAMPTZ := v_desde + ('1 ' || p_intervalo)::INTERVAL;
+    v_nombre TEXT := p_tabla || '_p' || to_char(
+        v_desde AT TIME ZONE 'UTC',
+        CASE p_intervalo WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END
+    );
+BEGIN
+    IF to_regclass('monitoreo.' || v_nombre) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE monitoreo.%I PARTITION OF monitoreo.%I FOR VALUES FROM (%L) TO (%L)',
+        v_nombre, p_tabla, v_desde, v_hasta
+    );
+    RETURN TRUE;
+EXCEPTION
+    -- Típicamente: la partición por defecto ya tiene filas de ese rango
+    WHEN others THEN
+        RAISE WARNING 'No se pudo crear la partición %: %', v_nombre, SQLERRM;
+        RETURN FALSE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Crear las particiones futuras y eliminar las vencidas de todas las tablas
+-- con política. La invoca periódicamente el backend (o pg_cron).
+CREATE OR REPLACE FUNCTION monitoreo.mantener_particiones()
+RETURNS TABLE (nombre_tabla TEXT, particiones_creadas INTEGER, particiones_eliminadas INTEGER) AS $$
+DECLARE
+    v_politica RECORD;
+    v_particion RECORD;
+    v_limite TIMESTAMPTZ;
+    v_fin_particion TIMESTAMPTZ;
+    v_paso INTEGER;
+BEGIN
+    FOR v_politica IN SELECT * FROM monitoreo.particion_politica ORDER BY tabla LOOP
+        nombre_tabla := v_politica.tabla;
+        particiones_creadas := 0;
+        particiones_eliminadas := 0;
+
+        -- Particiones no creadas aún: la actual y las `anticipacion` siguientes
+        FOR v_paso IN 0..v_politica.anticipacion LOOP
+            IF monitoreo.crear_particion(
+                v_politica.tabla,
+                v_politica.intervalo,
+                now() + (v_paso || ' ' || v_politica.intervalo)::INTERVAL
+            ) THEN
+                particiones_creadas := particiones_creadas + 1;
+            END IF;
+        END LOOP;
+
+        -- Retención: DROP de particiones cuyo rango terminó antes del límite
+        IF v_politica.retencion IS NOT NULL THEN
+            v_limite := now() - v_politica.retencion;
+
+            FOR v_particion IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = ('monitoreo.' || v_politica.tabla)::REGCLASS
+                  AND c.relname ~ ('^' || v_politica.tabla || '_p[0-9]+$')
+            LOOP
+                v_fin_particion := (
+                    to_date(
+                        substring(v_particion.relname FROM '_p([0-9]+)$'),
+                        CASE v_politica.intervalo WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END
+                    )::TIMESTAMP AT TIME ZONE 'UTC'
+                ) + ('1 ' || v_politica.intervalo)::INTERVAL;
+
+                IF v_fin_particion <= v_limite THEN
+                    EXECUTE format('DROP TABLE monitoreo.%I', v_particion.relname);
+                    particiones_eliminadas := particiones_eliminadas + 1;
+                END IF;
+            END LOOP;
+        END IF;
+
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.mantener_particiones() IS 'Crea particiones futuras y elimina las vencidas según particion_politica';
+
+-- ============================================================================
+-- Migración de interface_historico
+-- ============================================================================
+DO $$
+DECLARE
+    v_desde TIMESTAMPTZ;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'monitoreo.interface_historico'::REGCLASS
+    ) THEN
+        RAISE NOTICE 'interface_historico ya está particionada';
+        RETURN;
+    END IF;
+
+    -- La secuencia se conserva: los ids siguen creciendo sin saltos y el
+    -- watermark de los rollups sigue siendo válido
+    ALTER SEQUENCE monitoreo.interface_historico_id_seq OWNED BY NONE;
+
+    ALTER TABLE monitoreo.interface_historico RENAME TO interface_historico_sin_particion;
+    ALTER INDEX monitoreo.interface_historico_pkey RENAME TO interface_historico_sin_particion_pkey;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devid;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devif;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devid_devif_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_created_at;
+
+    -- La clave primaria debe incluir la columna de partición
+    CREATE TABLE monitoreo.interface_historico (
+        id BIGINT NOT NULL DEFAULT nextval('monitoreo.interface_historico_id_seq'),
+        devid INTEGER NOT NULL,
+        devif INTEGER NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        input BIGINT,
+        output BIGINT,
+        ifspeed INTEGER,
+        ifindis INTEGER,
+        ifoutdis INTEGER,
+        ifinerr INTEGER,
+        ifouterr INTEGER,
+        ifutil DECIMAL(5, 2),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+        CONSTRAINT interface_historico_pkey PRIMARY KEY (id, timestamp),
+        CONSTRAINT fk_interface_historico_interfaces
+            FOREIGN KEY (devid, devif)
+            REFERENCES monitoreo.interfaces(devid, devif)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        CONSTRAINT check_historico_ifutil_range
+            CHECK (ifutil >= 0 AND ifutil <= 100)
+    ) PARTITION BY RANGE (timestamp);
+
+    -- Muestras fuera de las particiones creadas (p.ej. relojes desfasados)
+    CREATE TABLE monitoreo.interface_historico_default
+        PARTITION OF monitoreo.interface_historico DEFAULT;
+
+    -- Particiones que cubren los datos existentes
+    SELECT min(timestamp) INTO v_desde FROM monitoreo.interface_historico_sin_particion;
+    v_desde := coalesce(v_desde, now());
+    WHILE v_desde < now() LOOP
+        PERFORM monitoreo.crear_particion('interface_historico', 'day', v_desde);
+        v_desde := v_desde + INTERVAL '1 day';
+    END LOOP;
+    PERFORM monitoreo.crear_particion('interface_historico', 'day', now());
+
+    INSERT INTO monitoreo.interface_historico
+        (id, devid, devif, timestamp, input, output, ifspeed,
+         ifindis, ifoutdis, ifinerr, ifouterr, ifutil, created_at)
+    SELECT id, devid, devif, timestamp, input, output, ifspeed,
+           ifindis, ifoutdis, ifinerr, ifouterr, ifutil, created_at
+    FROM monitoreo.interface_historico_sin_particion;
+
+    DROP TABLE monitoreo.interface_historico_sin_particion;
+    ALTER SEQUENCE monitoreo.interface_historico_id_seq OWNED BY monitoreo.interface_historico.id;
+
+    -- Índices (se propagan a cada partición). Las consultas por dispositivo
+    -- usan el compuesto; el proceso de rollups recorre la PK (id, timestamp)
+    -- y el índice de created_at, creado a continuación del bloque.
+    CREATE INDEX idx_interface_historico_devid_devif_timestamp
+        ON monitoreo.interface_historico(devid, devif, timestamp DESC);
+    CREATE INDEX idx_interface_historico_timestamp
+        ON monitoreo.interface_historico(timestamp DESC);
+
+    RAISE NOTICE 'interface_historico particionada por día';
+END $$;
+
+-- Índice del script 09 para el corte de los rollups (filtro por created_at).
+-- Fuera del bloque anterior para crearlo también en bases ya particionadas
+-- con una versión previa de este script, que lo eliminaba sin recrearlo.
+CREATE INDEX IF NOT EXISTS idx_interface_historico_created_at
+    ON monitoreo.interface_historico(created_at);
+
+-- ============================================================================
+-- Migración de dispositivo_historico
+-- ============================================================================
+DO $$
+DECLARE
+    v_desde TIMESTAMPTZ;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'monitoreo.dispositivo_historico'::REGCLASS
+    ) THEN
+        RAISE NOTICE 'dispositivo_historico ya está particionada';
+        RETURN;
+    END IF;
+
+    ALTER SEQUENCE monitoreo.dispositivo_historico_id_seq OWNED BY NONE;
+
+    ALTER TABLE monitoreo.dispositivo_historico RENAME TO dispositivo_historico_sin_particion;
+    ALTER INDEX monitoreo.dispositivo_historico_pkey RENAME TO dispositivo_historico_sin_particion_pkey;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devid;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devid_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devstatus;
+
+    CREATE TABLE monitoreo.dispositivo_historico (
+        id BIGINT NOT NULL DEFAULT nextval('monitoreo.dispositivo_historico_id_seq'),
+        devid INTEGER NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        devstatus INTEGER NOT NULL,
+        latitud DECIMAL(10, 8),
+        longitud DECIMAL(11, 8),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+        CONSTRAINT dispositivo_historico_pkey PRIMARY KEY (id, timestamp),
+        CONSTRAINT fk_dispositivo_historico_dispositivos
+            FOREIGN KEY (devid)
+            REFERENCES monitoreo.dispositivos(devid)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        CONSTRAINT check_historico_devstatus
+            CHECK (devstatus IN (0, 1, 2, 5))
+    ) PARTITION BY RANGE (timestamp);
+
+    CREATE TABLE monitoreo.dispositivo_historico_default
+        PARTITION OF monitoreo.dispositivo_historico DEFAULT;
+
+    SELECT min(timestamp) INTO v_desde FROM monitoreo.dispositivo_historico_sin_particion;
+    v_desde := coalesce(v_desde, now());
+    WHILE v_desde < now() LOOP
+        PERFORM monitoreo.crear_particion('dispositivo_historico', 'month', v_desde);
+        v_desde := v_desde + INTERVAL '1 month';
+    END LOOP;
+    PERFORM monitoreo.crear_particion('dispositivo_historico', 'month', now());
+
+    INSERT INTO monitoreo.dispositivo_historico
+        (id, devid, timestamp, devstatus, latitud, longitud, created_at)
+    SELECT id, devid, timestamp, devstatus, latitud, longitud, created_at
+    FROM monitoreo.dispositivo_historico_sin_particion;
+
+    DROP TABLE monitoreo.dispositivo_historico_sin_particion;
+    ALTER SEQUENCE monitoreo.dispositivo_historico_id_seq OWNED BY monitoreo.dispositivo_historico.id;
+
+    CREATE INDEX idx_dispositivo_historico_devid_timestamp
+        ON monitoreo.dispositivo_historico(devid, timestamp DESC);
+    CREATE INDEX idx_dispositivo_historico_timestamp
+        ON monitoreo.dispositivo_historico(timestamp DESC);
+
+    RAISE NOTICE 'dispositivo_historico particionada por mes';
+END $$;
+
+-- Particiones futuras según la política
+SELECT * FROM monitoreo.mantener_particiones();
+
+-- Verificación
+SELECT
+    parent.relname AS tabla,
+    count(*) AS particiones
+FROM pg_inherits i
+JOIN pg_class parent ON parent.oid = i.inhparent
+JOIN pg_namespace n ON n.oid = parent.relnamespace
+WHERE n.nspname = 'monitoreo'
+GROUP BY parent.relname
+ORDER BY parent.relname;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 10_particionar_historicos.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 10: Crear índices de búsqueda (11_indices_busqueda.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 10/15: Creando índices de búsqueda (pg_trgm)...';
+END $$;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================================================
+-- Dispositivos: nombre, operador, zona, área y fabricante
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devname_trgm
+    ON monitoreo.dispositivos USING gin (devname gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_operador_trgm
+    ON monitoreo.dispositivos USING gin (operador gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_zona_trgm
+    ON monitoreo.dispositivos USING gin (zona gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_area_trgm
+    ON monitoreo.dispositivos USING gin (area gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_enterprise_trgm
+    ON monitoreo.dispositivos USING gin (enterprise gin_trgm_ops);
+
+-- IP y subred: devip <<= '10.0.1.0/24'
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devip_inet
+    ON monitoreo.dispositivos USING gist (devip inet_ops);
+
+-- ============================================================================
+-- Interfaces: nombre y alias (devif se busca por igualdad con idx_interfaces_devif)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifname_trgm
+    ON monitoreo.interfaces USING gin (ifname gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifalias_trgm
+    ON monitoreo.interfaces USING gin (ifalias gin_trgm_ops);
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_devname_trgm IS 'Búsqueda por subcadena en el nombre';
+COMMENT ON INDEX monitoreo.idx_dispositivos_operador_trgm IS 'Búsqueda por subcadena en el operador';
+COMMENT ON INDEX monitoreo.idx_dispositivos_zona_trgm IS 'Búsqueda por subcadena en la zona';
+COMMENT ON INDEX monitoreo.idx_dispositivos_area_trgm IS 'Búsqueda por subcadena en el área';
+COMMENT ON INDEX monitoreo.idx_dispositivos_enterprise_trgm IS 'Búsqueda por subcadena en el fabricante';
+COMMENT ON INDEX monitoreo.idx_dispositivos_devip_inet IS 'Búsqueda por IP o subred (<<=)';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifname_trgm IS 'Búsqueda por subcadena en el nombre de interface';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifalias_trgm IS 'Búsqueda por subcadena en el alias de interface';
+
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 11_indices_busqueda.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 11: Crear resumen de interfaces por dispositivo (12_resumen_interfaces_dispositivo.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 11/15: Creando resumen de interfaces por dispositivo...';
+END $$;
+
+CREATE TABLE IF NOT EXISTS monitoreo.dispositivo_resumen_interfaces (
+    devid INTEGER PRIMARY KEY
+        REFERENCES monitoreo.dispositivos(devid) ON DELETE CASCADE,
+    interfaces_count INTEGER NOT NULL DEFAULT 0,
+    interfaces_activas INTEGER NOT NULL DEFAULT 0,
+    interfaces_down INTEGER NOT NULL DEFAULT 0,
+    interfaces_shutdown INTEGER NOT NULL DEFAULT 0,
+    interfaces_monitoreadas INTEGER NOT NULL DEFAULT 0,
+    interfaces_con_errores INTEGER NOT NULL DEFAULT 0,
+    utilizacion_maxima DECIMAL(5, 2),
+    utilizacion_promedio DECIMAL(5, 2),
+    actualizado_en TIMESTAMP DEFAULT NOW()
+);
+
+-- Filtros y órdenes de los listados ("dispositivos con más interfaces caídas")
+CREATE INDEX IF NOT EXISTS idx_resumen_interfaces_down
+    ON monitoreo.dispositivo_resumen_interfaces(interfaces_down DESC)
+    WHERE interfaces_down > 0;
+
+CREATE INDEX IF NOT EXISTS idx_resumen_utilizacion_maxima
+    ON monitoreo.dispositivo_resumen_interfaces(utilizacion_maxima DESC)
+    WHERE utilizacion_maxima IS NOT NULL;
+
+COMMENT ON TABLE monitoreo.dispositivo_resumen_interfaces IS 'Resumen de interfaces por dispositivo (mantenido por el backend)';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.interfaces_activas IS 'Interfaces con ifstatus = 1 (UP)';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.interfaces_con_errores IS 'Interfaces con ifinerr o ifouterr > 0';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.utilizacion_maxima IS 'Máxima ifutil de las interfaces monitoreadas';
+
+-- Carga inicial (el backend la mantiene actualizada después)
+INSERT INTO monitoreo.dispositivo_resumen_interfaces (
+    devid, interfaces_count, interfaces_activas, interfaces_down,
+    interfaces_shutdown, interfaces_monitoreadas, interfaces_con_errores,
+    utilizacion_maxima, utilizacion_promedio
+)
+SELECT
+    d.devid,
+    COUNT(i.id),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 1),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 2),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 3),
+    COUNT(i.id) FILTER (WHERE i.ifgraficar = 1),
+    COUNT(i.id) FILTER (WHERE i.ifinerr > 0 OR i.ifouterr > 0),
+    MAX(i.ifutil) FILTER (WHERE i.ifgraficar = 1),
+    ROUND(AVG(i.ifutil) FILTER (WHERE i.ifgraficar = 1), 2)
+FROM monitoreo.dispositivos d
+LEFT JOIN monitoreo.interfaces i ON i.devid = d.devid
+GROUP BY d.devid
+ON CONFLICT (devid) DO NOTHING;
+
+ANALYZE monitoreo.dispositivo_resumen_interfaces;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 12_resumen_interfaces_dispositivo.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 12: Crear índice espacial de dispositivos (13_indice_espacial_dispositivos.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 12/15: Creando índice espacial de dispositivos...';
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_punto
+    ON monitoreo.dispositivos
+    USING gist (point(CAST(longitud AS FLOAT), CAST(latitud AS FLOAT)))
+    WHERE latitud IS NOT NULL AND longitud IS NOT NULL;
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_punto IS 'Vista del mapa por bounding box (point <@ box)';
+
+ANALYZE monitoreo.dispositivos;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 13_indice_espacial_dispositivos.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 13: Crear feed de cambios y eliminaciones (14_feed_cambios.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 13/15: Creando feed de cambios y eliminaciones...';
+END $$;
+
+-- Lectura de cambios en orden (updated_at, clave)
+CREATE INDEX IF NOT EXISTS idx_dispositivos_updated_at
+    ON monitoreo.dispositivos(updated_at, devid);
+
+CREATE INDEX IF NOT EXISTS idx_interfaces_updated_at
+    ON monitoreo.interfaces(updated_at, id);
+
+-- ============================================================================
+-- TABLA: eliminaciones (tombstones)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS monitoreo.eliminaciones (
+    id BIGSERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    clave INTEGER NOT NULL,
+    eliminado_en TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_eliminaciones_tabla_fecha
+    ON monitoreo.eliminaciones(tabla, eliminado_en, id);
+
+COMMENT ON TABLE monitoreo.eliminaciones IS 'Filas eliminadas de dispositivos e interfaces para el feed de cambios';
+COMMENT ON COLUMN monitoreo.eliminaciones.tabla IS 'Tabla de origen: dispositivos o interfaces';
+COMMENT ON COLUMN monitoreo.eliminaciones.clave IS 'devid o id de la fila eliminada';
+
+-- ============================================================================
+-- FUNCIÓN: Registrar la eliminación de una fila
+-- El argumento del trigger es el nombre de la columna clave
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION monitoreo.registrar_eliminacion()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_clave INTEGER;
+BEGIN
+    EXECUTE format('SELECT ($1).%I', TG_ARGV[0]) INTO v_clave USING OLD;
+    INSERT INTO monitoreo.eliminaciones (tabla, clave)
+    VALUES (TG_TABLE_NAME, v_clave);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.registrar_eliminacion() IS 'Registra en monitoreo.eliminaciones la clave de la fila borrada';
+
+-- Las interfaces borradas en cascada con su dispositivo también se registran
+DROP TRIGGER IF EXISTS trigger_dispositivos_eliminacion ON monitoreo.dispositivos;
+CREATE TRIGGER trigger_dispositivos_eliminacion
+    AFTER DELETE ON monitoreo.dispositivos
+    FOR EACH ROW
+    EXECUTE FUNCTION monitoreo.registrar_eliminacion('devid');
+
+DROP TRIGGER IF EXISTS trigger_interfaces_eliminacion ON monitoreo.interfaces;
+CREATE TRIGGER trigger_interfaces_eliminacion
+    AFTER DELETE ON monitoreo.interfaces
+    FOR EACH ROW
+    EXECUTE FUNCTION monitoreo.registrar_eliminacion('id');
+
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 14_feed_cambios.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 14: Crear notificaciones de cambio de estado (15_notificaciones_estado.sql)
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 14/15: Creando notificaciones de cambio de estado...';
+END $$;
+
+CREATE OR REPLACE FUNCTION monitoreo.notificar_estado_dispositivo()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'monitoreo_estado',
+        json_build_object(
+            'tipo', 'dispositivo',
+            'devid', NEW.devid,
+            'devname', NEW.devname,
+            'devstatus', NEW.devstatus,
+            'zona', NEW.zona,
+            'area', NEW.area,
+            'time', COALESCE(NEW.devstatus_lc, NOW())
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.notificar_estado_dispositivo() IS 'Publica en monitoreo_estado el nuevo estado del dispositivo';
+
+-- Sólo se dispara cuando el estado efectivamente cambia
+DROP TRIGGER IF EXISTS trigger_dispositivos_notificar_estado ON monitoreo.dispositivos;
+CREATE TRIGGER trigger_dispositivos_notificar_estado
+    AFTER UPDATE OF devstatus ON monitoreo.dispositivos
+    FOR EACH ROW
+    WHEN (OLD.devstatus IS DISTINCT FROM NEW.devstatus)
+    EXECUTE FUNCTION monitoreo.notificar_estado_dispositivo();
+
+DO $$
+BEGIN
+    RAISE NOTICE '  ✓ 15_notificaciones_estado.sql aplicado';
+    RAISE NOTICE '';
+END $$;
+
+-- ============================================================================
+-- PASO 15: Resumen final
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'PASO 15/15: Verificando creación...';
     RAISE NOTICE '';
 END $$;
 
@@ -324,8 +1012,12 @@ BEGIN
     RAISE NOTICE 'Tablas creadas:';
     RAISE NOTICE '  1. monitoreo.dispositivos';
     RAISE NOTICE '  2. monitoreo.interfaces';
-    RAISE NOTICE '  3. monitoreo.interface_historico';
-    RAISE NOTICE '  4. monitoreo.dispositivo_historico';
+    RAISE NOTICE '  3. monitoreo.interface_historico (particionada)';
+    RAISE NOTICE '  4. monitoreo.dispositivo_historico (particionada)';
+    RAISE NOTICE '  5. monitoreo.interface_historico_rollup y rollup_watermark';
+    RAISE NOTICE '  6. monitoreo.particion_politica';
+    RAISE NOTICE '  7. monitoreo.dispositivo_resumen_interfaces';
+    RAISE NOTICE '  8. monitoreo.eliminaciones';
     RAISE NOTICE '';
     RAISE NOTICE 'Próximos pasos:';
     RAISE NOTICE '  - Ejecutar 07_insert_sample_data.sql para insertar datos de prueba (OPCIONAL)';
@@ -0,0 +1,32 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Índices para paginación keyset (cursor)
+-- Descripción: Índices compuestos que coinciden con el orden de los listados,
+--              de modo que "página siguiente" sea un rango de índice y no un
+--              OFFSET que recorre todas las filas anteriores.
+-- ============================================================================
+
+-- Listado de dispositivos: ORDER BY devname, devid
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devname_devid
+    ON monitoreo.dispositivos(devname, devid);
+
+-- Listado general de interfaces: ORDER BY devid, devif
+-- (cubierto por la restricción UNIQUE (devid, devif))
+
+-- Alta utilización: ORDER BY ifutil DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifutil_id
+    ON monitoreo.interfaces(ifutil DESC, id DESC)
+    WHERE ifutil IS NOT NULL AND ifgraficar = 1;
+
+-- Por velocidad: ORDER BY ifspeed DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifspeed_id
+    ON monitoreo.interfaces(ifspeed DESC, id DESC)
+    WHERE ifspeed IS NOT NULL;
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_devname_devid IS 'Paginación keyset del listado de dispositivos';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifutil_id IS 'Paginación keyset de interfaces con alta utilización';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifspeed_id IS 'Paginación keyset de interfaces por velocidad';
+
+-- Mantener estadísticas al día: el modo_total=estimado usa el planificador
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
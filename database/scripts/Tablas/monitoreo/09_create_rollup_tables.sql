@@ -0,0 +1,59 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Tablas de rollup de interface_historico
+-- Descripción: Agregados precalculados por interface en buckets de 5 minutos,
+--              1 hora y 1 día. Los mantiene el backend de forma incremental
+--              (tarea periódica "rollup_interfaces") a partir del watermark.
+-- ============================================================================
+
+-- Agregados por bucket: se guardan suma y cuenta para poder acumular lotes
+-- nuevos sobre un bucket existente (promedio = suma / cuenta)
+CREATE TABLE IF NOT EXISTS monitoreo.interface_historico_rollup (
+    periodo VARCHAR(10) NOT NULL,
+    devid INTEGER NOT NULL,
+    devif INTEGER NOT NULL,
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+
+    input_suma NUMERIC,
+    input_cuenta INTEGER,
+    input_minimo BIGINT,
+    input_maximo BIGINT,
+
+    output_suma NUMERIC,
+    output_cuenta INTEGER,
+    output_minimo BIGINT,
+    output_maximo BIGINT,
+
+    ifutil_suma NUMERIC,
+    ifutil_cuenta INTEGER,
+    ifutil_minimo DECIMAL(5,2),
+    ifutil_maximo DECIMAL(5,2),
+
+    errores_total BIGINT,
+    descartes_total BIGINT,
+    muestras INTEGER NOT NULL,
+
+    actualizado_en TIMESTAMP DEFAULT NOW(),
+
+    CONSTRAINT pk_interface_historico_rollup
+        PRIMARY KEY (periodo, devid, devif, bucket),
+    CONSTRAINT chk_rollup_periodo
+        CHECK (periodo IN ('5min', 'hourly', 'daily'))
+);
+
+-- Último id de interface_historico incorporado a los rollups
+CREATE TABLE IF NOT EXISTS monitoreo.rollup_watermark (
+    nombre VARCHAR(50) PRIMARY KEY,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE monitoreo.interface_historico_rollup IS 'Agregados de interface_historico por periodo (5min, hourly, daily)';
+COMMENT ON COLUMN monitoreo.interface_historico_rollup.bucket IS 'Inicio del bucket';
+COMMENT ON COLUMN monitoreo.interface_historico_rollup.muestras IS 'Muestras acumuladas en el bucket';
+COMMENT ON TABLE monitoreo.rollup_watermark IS 'Progreso del proceso incremental de rollups';
+
+-- El proceso incremental recorre interface_historico por id (PK)
+-- y filtra por created_at para no adelantarse a transacciones en curso
+CREATE INDEX IF NOT EXISTS idx_interface_historico_created_at
+    ON monitoreo.interface_historico(created_at);
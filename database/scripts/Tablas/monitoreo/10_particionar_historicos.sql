@@ -0,0 +1,316 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Particionamiento por rango de interface_historico y dispositivo_historico
+-- Descripción: Convierte las tablas históricas en tablas particionadas por
+--              `timestamp` (diario para interfaces, mensual para
+--              dispositivos), crea las particiones futuras y aplica la
+--              retención eliminando particiones completas en lugar de DELETE.
+--
+-- NOTA: La migración copia los datos existentes a la nueva tabla dentro de
+--       una transacción; en bases grandes conviene ejecutarla en una ventana
+--       de mantenimiento. El script es re-ejecutable: si la tabla ya está
+--       particionada sólo actualiza las funciones.
+-- ============================================================================
+
+-- ============================================================================
+-- Política de particionamiento por tabla
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS monitoreo.particion_politica (
+    tabla VARCHAR(63) PRIMARY KEY,
+    intervalo VARCHAR(5) NOT NULL,
+    anticipacion INTEGER NOT NULL DEFAULT 7,
+    retencion INTERVAL,
+    actualizado_en TIMESTAMP DEFAULT NOW(),
+
+    CONSTRAINT chk_particion_intervalo CHECK (intervalo IN ('day', 'month')),
+    CONSTRAINT chk_particion_anticipacion CHECK (anticipacion >= 0)
+);
+
+COMMENT ON TABLE monitoreo.particion_politica IS 'Intervalo, particiones futuras y retención de las tablas históricas';
+COMMENT ON COLUMN monitoreo.particion_politica.intervalo IS 'Rango de cada partición: day o month';
+COMMENT ON COLUMN monitoreo.particion_politica.anticipacion IS 'Particiones futuras que se mantienen creadas';
+COMMENT ON COLUMN monitoreo.particion_politica.retencion IS 'Antigüedad a partir de la cual se elimina la partición (NULL = sin retención)';
+
+INSERT INTO monitoreo.particion_politica (tabla, intervalo, anticipacion, retencion)
+VALUES
+    ('interface_historico', 'day', 7, INTERVAL '90 days'),
+    ('dispositivo_historico', 'month', 3, INTERVAL '2 years')
+ON CONFLICT (tabla) DO NOTHING;
+
+-- ============================================================================
+-- Funciones de mantenimiento
+-- ============================================================================
+
+-- Inicio (UTC) de la partición que contiene p_momento
+CREATE OR REPLACE FUNCTION monitoreo.inicio_particion(p_intervalo TEXT, p_momento TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_trunc(p_intervalo, p_momento AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Crear (si no existe) la partición de p_tabla que contiene p_momento
+CREATE OR REPLACE FUNCTION monitoreo.crear_particion(
+    p_tabla TEXT,
+    p_intervalo TEXT,
+    p_momento TIMESTAMPTZ
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_desde TIMESTAMPTZ := monitoreo.inicio_particion(p_intervalo, p_momento);
+    v_hasta TIMESTAMPTZ := v_desde + ('1 ' || p_intervalo)::INTERVAL;
+    v_nombre TEXT := p_tabla || '_p' || to_char(
+        v_desde AT TIME ZONE 'UTC',
+        CASE p_intervalo WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END
+    );
+BEGIN
+    IF to_regclass('monitoreo.' || v_nombre) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE monitoreo.%I PARTITION OF monitoreo.%I FOR VALUES FROM (%L) TO (%L)',
+        v_nombre, p_tabla, v_desde, v_hasta
+    );
+    RETURN TRUE;
+EXCEPTION
+    -- Típicamente: la partición por defecto ya tiene filas de ese rango
+    WHEN others THEN
+        RAISE WARNING 'No se pudo crear la partición %: %', v_nombre, SQLERRM;
+        RETURN FALSE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Crear las particiones futuras y eliminar las vencidas de todas las tablas
+-- con política. La invoca periódicamente el backend (o pg_cron).
+CREATE OR REPLACE FUNCTION monitoreo.mantener_particiones()
+RETURNS TABLE (nombre_tabla TEXT, particiones_creadas INTEGER, particiones_eliminadas INTEGER) AS $$
+DECLARE
+    v_politica RECORD;
+    v_particion RECORD;
+    v_limite TIMESTAMPTZ;
+    v_fin_particion TIMESTAMPTZ;
+    v_paso INTEGER;
+BEGIN
+    FOR v_politica IN SELECT * FROM monitoreo.particion_politica ORDER BY tabla LOOP
+        nombre_tabla := v_politica.tabla;
+        particiones_creadas := 0;
+        particiones_eliminadas := 0;
+
+        -- Particiones no creadas aún: la actual y las `anticipacion` siguientes
+        FOR v_paso IN 0..v_politica.anticipacion LOOP
+            IF monitoreo.crear_particion(
+                v_politica.tabla,
+                v_politica.intervalo,
+                now() + (v_paso || ' ' || v_politica.intervalo)::INTERVAL
+            ) THEN
+                particiones_creadas := particiones_creadas + 1;
+            END IF;
+        END LOOP;
+
+        -- Retención: DROP de particiones cuyo rango terminó antes del límite
+        IF v_politica.retencion IS NOT NULL THEN
+            v_limite := now() - v_politica.retencion;
+
+            FOR v_particion IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = ('monitoreo.' || v_politica.tabla)::REGCLASS
+                  AND c.relname ~ ('^' || v_politica.tabla || '_p[0-9]+$')
+            LOOP
+                v_fin_particion := (
+                    to_date(
+                        substring(v_particion.relname FROM '_p([0-9]+)$'),
+                        CASE v_politica.intervalo WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END
+                    )::TIMESTAMP AT TIME ZONE 'UTC'
+                ) + ('1 ' || v_politica.intervalo)::INTERVAL;
+
+                IF v_fin_particion <= v_limite THEN
+                    EXECUTE format('DROP TABLE monitoreo.%I', v_particion.relname);
+                    particiones_eliminadas := particiones_eliminadas + 1;
+                END IF;
+            END LOOP;
+        END IF;
+
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.mantener_particiones() IS 'Crea particiones futuras y elimina las vencidas según particion_politica';
+
+-- ============================================================================
+-- Migración de interface_historico
+-- ============================================================================
+DO $$
+DECLARE
+    v_desde TIMESTAMPTZ;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'monitoreo.interface_historico'::REGCLASS
+    ) THEN
+        RAISE NOTICE 'interface_historico ya está particionada';
+        RETURN;
+    END IF;
+
+    -- La secuencia se conserva: los ids siguen creciendo sin saltos y el
+    -- watermark de los rollups sigue siendo válido
+    ALTER SEQUENCE monitoreo.interface_historico_id_seq OWNED BY NONE;
+
+    ALTER TABLE monitoreo.interface_historico RENAME TO interface_historico_sin_particion;
+    ALTER INDEX monitoreo.interface_historico_pkey RENAME TO interface_historico_sin_particion_pkey;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devid;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devif;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_devid_devif_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_interface_historico_created_at;
+
+    -- La clave primaria debe incluir la columna de partición
+    CREATE TABLE monitoreo.interface_historico (
+        id BIGINT NOT NULL DEFAULT nextval('monitoreo.interface_historico_id_seq'),
+        devid INTEGER NOT NULL,
+        devif INTEGER NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        input BIGINT,
+        output BIGINT,
+        ifspeed INTEGER,
+        ifindis INTEGER,
+        ifoutdis INTEGER,
+        ifinerr INTEGER,
+        ifouterr INTEGER,
+        ifutil DECIMAL(5, 2),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+        CONSTRAINT interface_historico_pkey PRIMARY KEY (id, timestamp),
+        CONSTRAINT fk_interface_historico_interfaces
+            FOREIGN KEY (devid, devif)
+            REFERENCES monitoreo.interfaces(devid, devif)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        CONSTRAINT check_historico_ifutil_range
+            CHECK (ifutil >= 0 AND ifutil <= 100)
+    ) PARTITION BY RANGE (timestamp);
+
+    -- Muestras fuera de las particiones creadas (p.ej. relojes desfasados)
+    CREATE TABLE monitoreo.interface_historico_default
+        PARTITION OF monitoreo.interface_historico DEFAULT;
+
+    -- Particiones que cubren los datos existentes
+    SELECT min(timestamp) INTO v_desde FROM monitoreo.interface_historico_sin_particion;
+    v_desde := coalesce(v_desde, now());
+    WHILE v_desde < now() LOOP
+        PERFORM monitoreo.crear_particion('interface_historico', 'day', v_desde);
+        v_desde := v_desde + INTERVAL '1 day';
+    END LOOP;
+    PERFORM monitoreo.crear_particion('interface_historico', 'day', now());
+
+    INSERT INTO monitoreo.interface_historico
+        (id, devid, devif, timestamp, input, output, ifspeed,
+         ifindis, ifoutdis, ifinerr, ifouterr, ifutil, created_at)
+    SELECT id, devid, devif, timestamp, input, output, ifspeed,
+           ifindis, ifoutdis, ifinerr, ifouterr, ifutil, created_at
+    FROM monitoreo.interface_historico_sin_particion;
+
+    DROP TABLE monitoreo.interface_historico_sin_particion;
+    ALTER SEQUENCE monitoreo.interface_historico_id_seq OWNED BY monitoreo.interface_historico.id;
+
+    -- Índices (se propagan a cada partición). Las consultas por dispositivo
+    -- usan el compuesto; el proceso de rollups recorre la PK (id, timestamp)
+    -- y el índice de created_at, creado a continuación del bloque.
+    CREATE INDEX idx_interface_historico_devid_devif_timestamp
+        ON monitoreo.interface_historico(devid, devif, timestamp DESC);
+    CREATE INDEX idx_interface_historico_timestamp
+        ON monitoreo.interface_historico(timestamp DESC);
+
+    RAISE NOTICE 'interface_historico particionada por día';
+END $$;
+
+-- Índice del script 09 para el corte de los rollups (filtro por created_at).
+-- Fuera del bloque anterior para crearlo también en bases ya particionadas
+-- con una versión previa de este script, que lo eliminaba sin recrearlo.
+CREATE INDEX IF NOT EXISTS idx_interface_historico_created_at
+    ON monitoreo.interface_historico(created_at);
+
+-- ============================================================================
+-- Migración de dispositivo_historico
+-- ============================================================================
+DO $$
+DECLARE
+    v_desde TIMESTAMPTZ;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'monitoreo.dispositivo_historico'::REGCLASS
+    ) THEN
+        RAISE NOTICE 'dispositivo_historico ya está particionada';
+        RETURN;
+    END IF;
+
+    ALTER SEQUENCE monitoreo.dispositivo_historico_id_seq OWNED BY NONE;
+
+    ALTER TABLE monitoreo.dispositivo_historico RENAME TO dispositivo_historico_sin_particion;
+    ALTER INDEX monitoreo.dispositivo_historico_pkey RENAME TO dispositivo_historico_sin_particion_pkey;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devid;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devid_timestamp;
+    DROP INDEX IF EXISTS monitoreo.idx_dispositivo_historico_devstatus;
+
+    CREATE TABLE monitoreo.dispositivo_historico (
+        id BIGINT NOT NULL DEFAULT nextval('monitoreo.dispositivo_historico_id_seq'),
+        devid INTEGER NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        devstatus INTEGER NOT NULL,
+        latitud DECIMAL(10, 8),
+        longitud DECIMAL(11, 8),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+        CONSTRAINT dispositivo_historico_pkey PRIMARY KEY (id, timestamp),
+        CONSTRAINT fk_dispositivo_historico_dispositivos
+            FOREIGN KEY (devid)
+            REFERENCES monitoreo.dispositivos(devid)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        CONSTRAINT check_historico_devstatus
+            CHECK (devstatus IN (0, 1, 2, 5))
+    ) PARTITION BY RANGE (timestamp);
+
+    CREATE TABLE monitoreo.dispositivo_historico_default
+        PARTITION OF monitoreo.dispositivo_historico DEFAULT;
+
+    SELECT min(timestamp) INTO v_desde FROM monitoreo.dispositivo_historico_sin_particion;
+    v_desde := coalesce(v_desde, now());
+    WHILE v_desde < now() LOOP
+        PERFORM monitoreo.crear_particion('dispositivo_historico', 'month', v_desde);
+        v_desde := v_desde + INTERVAL '1 month';
+    END LOOP;
+    PERFORM monitoreo.crear_particion('dispositivo_historico', 'month', now());
+
+    INSERT INTO monitoreo.dispositivo_historico
+        (id, devid, timestamp, devstatus, latitud, longitud, created_at)
+    SELECT id, devid, timestamp, devstatus, latitud, longitud, created_at
+    FROM monitoreo.dispositivo_historico_sin_particion;
+
+    DROP TABLE monitoreo.dispositivo_historico_sin_particion;
+    ALTER SEQUENCE monitoreo.dispositivo_historico_id_seq OWNED BY monitoreo.dispositivo_historico.id;
+
+    CREATE INDEX idx_dispositivo_historico_devid_timestamp
+        ON monitoreo.dispositivo_historico(devid, timestamp DESC);
+    CREATE INDEX idx_dispositivo_historico_timestamp
+        ON monitoreo.dispositivo_historico(timestamp DESC);
+
+    RAISE NOTICE 'dispositivo_historico particionada por mes';
+END $$;
+
+-- Particiones futuras según la política
+SELECT * FROM monitoreo.mantener_particiones();
+
+-- Verificación
+SELECT
+    parent.relname AS tabla,
+    count(*) AS particiones
+FROM pg_inherits i
+JOIN pg_class parent ON parent.oid = i.inhparent
+JOIN pg_namespace n ON n.oid = parent.relnamespace
+WHERE n.nspname = 'monitoreo'
+GROUP BY parent.relname
+ORDER BY parent.relname;
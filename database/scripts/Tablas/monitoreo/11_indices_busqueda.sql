@@ -0,0 +1,57 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Índices de búsqueda (/dispositivos/buscar e /interfaces/buscar)
+-- Descripción: Índices GIN de trigramas (pg_trgm) para las búsquedas por
+--              subcadena (ILIKE '%termino%') y un índice GiST inet_ops para
+--              buscar dispositivos por IP o subred (devip <<= '10.0.0.0/16').
+--              Los índices B-tree existentes no sirven para '%termino%'.
+--
+-- NOTA: Los trigramas requieren al menos 3 caracteres; con términos de 2
+--       caracteres el planificador recorre el índice completo. La relevancia
+--       (orden=relevancia) usa word_similarity de pg_trgm.
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================================================
+-- Dispositivos: nombre, operador, zona, área y fabricante
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devname_trgm
+    ON monitoreo.dispositivos USING gin (devname gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_operador_trgm
+    ON monitoreo.dispositivos USING gin (operador gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_zona_trgm
+    ON monitoreo.dispositivos USING gin (zona gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_area_trgm
+    ON monitoreo.dispositivos USING gin (area gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_enterprise_trgm
+    ON monitoreo.dispositivos USING gin (enterprise gin_trgm_ops);
+
+-- IP y subred: devip <<= '10.0.1.0/24'
+CREATE INDEX IF NOT EXISTS idx_dispositivos_devip_inet
+    ON monitoreo.dispositivos USING gist (devip inet_ops);
+
+-- ============================================================================
+-- Interfaces: nombre y alias (devif se busca por igualdad con idx_interfaces_devif)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifname_trgm
+    ON monitoreo.interfaces USING gin (ifname gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_interfaces_ifalias_trgm
+    ON monitoreo.interfaces USING gin (ifalias gin_trgm_ops);
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_devname_trgm IS 'Búsqueda por subcadena en el nombre';
+COMMENT ON INDEX monitoreo.idx_dispositivos_operador_trgm IS 'Búsqueda por subcadena en el operador';
+COMMENT ON INDEX monitoreo.idx_dispositivos_zona_trgm IS 'Búsqueda por subcadena en la zona';
+COMMENT ON INDEX monitoreo.idx_dispositivos_area_trgm IS 'Búsqueda por subcadena en el área';
+COMMENT ON INDEX monitoreo.idx_dispositivos_enterprise_trgm IS 'Búsqueda por subcadena en el fabricante';
+COMMENT ON INDEX monitoreo.idx_dispositivos_devip_inet IS 'Búsqueda por IP o subred (<<=)';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifname_trgm IS 'Búsqueda por subcadena en el nombre de interface';
+COMMENT ON INDEX monitoreo.idx_interfaces_ifalias_trgm IS 'Búsqueda por subcadena en el alias de interface';
+
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
@@ -0,0 +1,60 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Resumen de interfaces por dispositivo
+-- Descripción: Conteos por estado, utilización y errores de las interfaces de
+--              cada dispositivo, mantenidos por el backend (ingesta y tarea
+--              periódica). Los listados de dispositivos leen de aquí en lugar
+--              de agrupar todas las interfaces en cada petición, y pueden
+--              ordenar y filtrar por estas columnas.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS monitoreo.dispositivo_resumen_interfaces (
+    devid INTEGER PRIMARY KEY
+        REFERENCES monitoreo.dispositivos(devid) ON DELETE CASCADE,
+    interfaces_count INTEGER NOT NULL DEFAULT 0,
+    interfaces_activas INTEGER NOT NULL DEFAULT 0,
+    interfaces_down INTEGER NOT NULL DEFAULT 0,
+    interfaces_shutdown INTEGER NOT NULL DEFAULT 0,
+    interfaces_monitoreadas INTEGER NOT NULL DEFAULT 0,
+    interfaces_con_errores INTEGER NOT NULL DEFAULT 0,
+    utilizacion_maxima DECIMAL(5, 2),
+    utilizacion_promedio DECIMAL(5, 2),
+    actualizado_en TIMESTAMP DEFAULT NOW()
+);
+
+-- Filtros y órdenes de los listados ("dispositivos con más interfaces caídas")
+CREATE INDEX IF NOT EXISTS idx_resumen_interfaces_down
+    ON monitoreo.dispositivo_resumen_interfaces(interfaces_down DESC)
+    WHERE interfaces_down > 0;
+
+CREATE INDEX IF NOT EXISTS idx_resumen_utilizacion_maxima
+    ON monitoreo.dispositivo_resumen_interfaces(utilizacion_maxima DESC)
+    WHERE utilizacion_maxima IS NOT NULL;
+
+COMMENT ON TABLE monitoreo.dispositivo_resumen_interfaces IS 'Resumen de interfaces por dispositivo (mantenido por el backend)';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.interfaces_activas IS 'Interfaces con ifstatus = 1 (UP)';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.interfaces_con_errores IS 'Interfaces con ifinerr o ifouterr > 0';
+COMMENT ON COLUMN monitoreo.dispositivo_resumen_interfaces.utilizacion_maxima IS 'Máxima ifutil de las interfaces monitoreadas';
+
+-- Carga inicial (el backend la mantiene actualizada después)
+INSERT INTO monitoreo.dispositivo_resumen_interfaces (
+    devid, interfaces_count, interfaces_activas, interfaces_down,
+    interfaces_shutdown, interfaces_monitoreadas, interfaces_con_errores,
+    utilizacion_maxima, utilizacion_promedio
+)
+SELECT
+    d.devid,
+    COUNT(i.id),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 1),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 2),
+    COUNT(i.id) FILTER (WHERE i.ifstatus = 3),
+    COUNT(i.id) FILTER (WHERE i.ifgraficar = 1),
+    COUNT(i.id) FILTER (WHERE i.ifinerr > 0 OR i.ifouterr > 0),
+    MAX(i.ifutil) FILTER (WHERE i.ifgraficar = 1),
+    ROUND(AVG(i.ifutil) FILTER (WHERE i.ifgraficar = 1), 2)
+FROM monitoreo.dispositivos d
+LEFT JOIN monitoreo.interfaces i ON i.devid = d.devid
+GROUP BY d.devid
+ON CONFLICT (devid) DO NOTHING;
+
+ANALYZE monitoreo.dispositivo_resumen_interfaces;
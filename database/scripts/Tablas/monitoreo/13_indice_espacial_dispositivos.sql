@@ -0,0 +1,23 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Índice espacial de dispositivos (/dispositivos/geolocalizados/clusters)
+-- Descripción: Índice GiST sobre point(longitud, latitud) con los tipos
+--              geométricos nativos de PostgreSQL (no requiere PostGIS). El
+--              endpoint filtra la vista del mapa con `point <@ box` y agrupa
+--              por celdas de una grilla según el zoom (floor(coord / celda)).
+--
+-- NOTA: La expresión del índice debe coincidir con la consulta del backend:
+--       point(CAST(longitud AS FLOAT), CAST(latitud AS FLOAT)).
+--       Con PostGIS instalado puede crearse además un índice sobre
+--       ST_SetSRID(ST_MakePoint(longitud, latitud), 4326); el backend no lo
+--       necesita.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_dispositivos_punto
+    ON monitoreo.dispositivos
+    USING gist (point(CAST(longitud AS FLOAT), CAST(latitud AS FLOAT)))
+    WHERE latitud IS NOT NULL AND longitud IS NOT NULL;
+
+COMMENT ON INDEX monitoreo.idx_dispositivos_punto IS 'Vista del mapa por bounding box (point <@ box)';
+
+ANALYZE monitoreo.dispositivos;
@@ -0,0 +1,75 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Feed de cambios incrementales (/dispositivos/cambios, /interfaces/cambios)
+-- Descripción: Índices sobre updated_at para leer sólo las filas modificadas
+--              desde el cursor del cliente, y registro de eliminaciones
+--              (tombstones) mantenido por triggers para informar las bajas.
+--              El backend purga las eliminaciones más antiguas que
+--              CAMBIOS_RETENCION_DIAS; un cursor más viejo exige resincronizar.
+--
+-- NOTA: updated_at lo fija el trigger update_timestamp() (script 06) con
+--       NOW(), el inicio de la transacción. Una transacción larga puede
+--       confirmar filas con un updated_at anterior al de otras ya leídas; el
+--       backend vuelve a leer los últimos CAMBIOS_MARGEN_SEGUNDOS en cada
+--       consulta para no perderlas.
+-- ============================================================================
+
+-- Lectura de cambios en orden (updated_at, clave)
+CREATE INDEX IF NOT EXISTS idx_dispositivos_updated_at
+    ON monitoreo.dispositivos(updated_at, devid);
+
+CREATE INDEX IF NOT EXISTS idx_interfaces_updated_at
+    ON monitoreo.interfaces(updated_at, id);
+
+-- ============================================================================
+-- TABLA: eliminaciones (tombstones)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS monitoreo.eliminaciones (
+    id BIGSERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    clave INTEGER NOT NULL,
+    eliminado_en TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_eliminaciones_tabla_fecha
+    ON monitoreo.eliminaciones(tabla, eliminado_en, id);
+
+COMMENT ON TABLE monitoreo.eliminaciones IS 'Filas eliminadas de dispositivos e interfaces para el feed de cambios';
+COMMENT ON COLUMN monitoreo.eliminaciones.tabla IS 'Tabla de origen: dispositivos o interfaces';
+COMMENT ON COLUMN monitoreo.eliminaciones.clave IS 'devid o id de la fila eliminada';
+
+-- ============================================================================
+-- FUNCIÓN: Registrar la eliminación de una fila
+-- El argumento del trigger es el nombre de la columna clave
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION monitoreo.registrar_eliminacion()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_clave INTEGER;
+BEGIN
+    EXECUTE format('SELECT ($1).%I', TG_ARGV[0]) INTO v_clave USING OLD;
+    INSERT INTO monitoreo.eliminaciones (tabla, clave)
+    VALUES (TG_TABLE_NAME, v_clave);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.registrar_eliminacion() IS 'Registra en monitoreo.eliminaciones la clave de la fila borrada';
+
+-- Las interfaces borradas en cascada con su dispositivo también se registran
+DROP TRIGGER IF EXISTS trigger_dispositivos_eliminacion ON monitoreo.dispositivos;
+CREATE TRIGGER trigger_dispositivos_eliminacion
+    AFTER DELETE ON monitoreo.dispositivos
+    FOR EACH ROW
+    EXECUTE FUNCTION monitoreo.registrar_eliminacion('devid');
+
+DROP TRIGGER IF EXISTS trigger_interfaces_eliminacion ON monitoreo.interfaces;
+CREATE TRIGGER trigger_interfaces_eliminacion
+    AFTER DELETE ON monitoreo.interfaces
+    FOR EACH ROW
+    EXECUTE FUNCTION monitoreo.registrar_eliminacion('id');
+
+ANALYZE monitoreo.dispositivos;
+ANALYZE monitoreo.interfaces;
@@ -0,0 +1,42 @@
+-- ============================================================================
+-- VNM - Visual Network Monitoring
+-- Notificaciones de cambio de estado (/monitoreo/stream)
+-- Descripción: Trigger que publica con NOTIFY en el canal monitoreo_estado
+--              cada cambio de devstatus de un dispositivo, cualquiera sea el
+--              proceso que lo escriba. Los cambios de estado de interfaces
+--              los publica la ingesta del backend en el mismo canal. Cada
+--              proceso del backend escucha el canal (LISTEN) y reparte los
+--              eventos a sus clientes SSE.
+--
+-- NOTA: NOTIFY se entrega al confirmar la transacción; si se revierte, el
+--       evento no se envía. El payload (JSON) debe ser menor a 8000 bytes.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION monitoreo.notificar_estado_dispositivo()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'monitoreo_estado',
+        json_build_object(
+            'tipo', 'dispositivo',
+            'devid', NEW.devid,
+            'devname', NEW.devname,
+            'devstatus', NEW.devstatus,
+            'zona', NEW.zona,
+            'area', NEW.area,
+            'time', COALESCE(NEW.devstatus_lc, NOW())
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION monitoreo.notificar_estado_dispositivo() IS 'Publica en monitoreo_estado el nuevo estado del dispositivo';
+
+-- Sólo se dispara cuando el estado efectivamente cambia
+DROP TRIGGER IF EXISTS trigger_dispositivos_notificar_estado ON monitoreo.dispositivos;
+CREATE TRIGGER trigger_dispositivos_notificar_estado
+    AFTER UPDATE OF devstatus ON monitoreo.dispositivos
+    FOR EACH ROW
+    WHEN (OLD.devstatus IS DISTINCT FROM NEW.devstatus)
+    EXECUTE FUNCTION monitoreo.notificar_estado_dispositivo();
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades Comunes de las Mediciones del Backend VNM
+====================================================
+
+Lo comparten los scripts `medir_*.py` de esta carpeta:
+
+- Agrega `backend/` al path para importar `app`.
+- Crea una sesión sobre SQLite en memoria (por defecto, con los esquemas
+  `monitoreo` y `seguridad` adjuntos) o sobre la base indicada con --url.
+  Con --url todo corre dentro de una transacción que se revierte al final:
+  los datos sembrados y lo que confirmen los servicios no quedan en la base.
+- Siembra dispositivos e interfaces sintéticos.
+- Cuenta las consultas SQL y mide latencias.
+"""
+
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+RAIZ_BACKEND = Path(__file__).resolve().parent.parent / "backend"
+if str(RAIZ_BACKEND) not in sys.path:
+    sys.path.insert(0, str(RAIZ_BACKEND))
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.dialects.postgresql import INET  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+
+@compiles(INET, "sqlite")
+def _inet_sqlite(tipo, compilador, **kw):
+    return "TEXT"
+
+
+def crear_engine(url=None):
+    """Engine de la medición: la URL indicada o SQLite en memoria"""
+    if url:
+        return create_engine(url)
+
+    from app.models import Base
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _adjuntar_esquemas(conexion_dbapi, registro):
+        conexion_dbapi.execute("ATTACH ':memory:' AS monitoreo")
+        conexion_dbapi.execute("ATTACH ':memory:' AS seguridad")
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@contextmanager
+def sesion_medicion(url=None):
+    """Sesión dentro de una transacción que se revierte al terminar
+
+    Los commit() de los servicios confirman sólo un SAVEPOINT.
+    """
+    engine = crear_engine(url)
+    conexion = engine.connect()
+    transaccion = conexion.begin()
+    db = Session(bind=conexion, join_transaction_mode="create_savepoint")
+    try:
+        yield db
+    finally:
+        db.close()
+        transaccion.rollback()
+        conexion.close()
+        engine.dispose()
+
+
+def sembrar(db, dispositivos=1000, interfaces_por_dispositivo=50, semilla=7):
+    """Insertar dispositivos e interfaces sintéticos; devuelve los devid"""
+    from app.models import Dispositivos, Interfaces
+
+    azar = random.Random(semilla)
+    ahora = datetime.now(timezone.utc)
+    base_devid = 900000
+
+    filas_dispositivos = [
+        {
+            "devid": base_devid + d,
+            "devname": f"medicion-{d:06d}",
+            "operador": azar.choice(["ENTEL", "MOVISTAR", "CLARO"]),
+            "zona": azar.choice(["NORTE", "CENTRO", "SUR"]),
+            "area": azar.choice(["A1", "A2", "A3", "A4"]),
+            "hub": f"HUB{d % 20}",
+            "enterprise": azar.choice(["cisco", "huawei", "juniper"]),
+            "devstatus": azar.choice([0, 1, 1, 1, 2, 5]),
+            "devip": f"10.{(d >> 16) & 255}.{(d >> 8) & 255}.{d & 255}",
+            "latitud": Decimal(f"{-33 + azar.random():.6f}"),
+            "longitud": Decimal(f"{-70 + azar.random():.6f}"),
+            "created_at": ahora,
+            "updated_at": ahora,
+        }
+        for d in range(1, dispositivos + 1)
+    ]
+    db.execute(insert(Dispositivos), filas_dispositivos)
+
+    lote = []
+    for d in range(1, dispositivos + 1):
+        for i in range(1, interfaces_por_dispositivo + 1):
+            lote.append(
+                {
+                    "devid": base_devid + d,
+                    "devif": i,
+                    "ifname": f"Gi0/{i}",
+                    "ifalias": f"enlace {d}-{i}",
+                    "ifadmin": 1,
+                    "ifoper": azar.choice([1, 1, 2]),
+                    "ifstatus": azar.choice([1, 1, 1, 2, 3]),
+                    "ifgraficar": azar.choice([0, 1]),
+                    "ifspeed": azar.choice([100, 1000, 10000]),
+                    "input": azar.randint(0, 10**9),
+                    "output": azar.randint(0, 10**9),
+                    "ifindis": azar.choice([0, 0, 3]),
+                    "ifoutdis": 0,
+                    "ifinerr": azar.choice([0, 0, 0, 2]),
+                    "ifouterr": azar.choice([0, 0, 1]),
+                    "ifutil": azar.choice(
+                        [None, Decimal(f"{azar.uniform(0, 100):.2f}")]
+                    ),
+                    "time": ahora - timedelta(seconds=azar.randint(0, 300)),
+                    "created_at": ahora,
+                    "updated_at": ahora,
+                }
+            )
+            if len(lote) >= 10000:
+                db.execute(insert(Interfaces), lote)
+                lote = []
+    if lote:
+        db.execute(insert(Interfaces), lote)
+    db.flush()
+
+    return [fila["devid"] for fila in filas_dispositivos]
+
+
+@contextmanager
+def contar_consultas(db):
+    """Contar las sentencias SQL ejecutadas por la sesión dentro del bloque"""
+    contador = {"consultas": 0}
+    engine = db.get_bind().engine
+
+    def _contar(*args, **kwargs):
+        contador["consultas"] += 1
+
+    event.listen(engine, "before_cursor_execute", _contar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", _contar)
+
+
+def medir(funcion, repeticiones=10, calentamiento=1):
+    """Latencias en ms (media, p50, máxima) de `funcion()`"""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "media": statistics.mean(tiempos),
+        "p50": statistics.median(tiempos),
+        "maxima": max(tiempos),
+    }
+
+
+def argumentos_comunes(parser):
+    parser.add_argument(
+        "--url",
+        help="Base de datos (por defecto SQLite en memoria). Todo se revierte "
+        "al terminar",
+    )
+    parser.add_argument("--repeticiones", type=int, default=10)
+    return parser
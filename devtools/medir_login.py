@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medición de Inicios de Sesión Concurrentes (bcrypt)
+===================================================
+
+Simula N inicios de sesión simultáneos en un event loop y compara:
+
+- anterior: verify_password (bcrypt) ejecutado dentro de la corrutina, como
+  hacían los handlers de /auth/login; bloquea el event loop.
+- actual: verificar_clave, que ejecuta bcrypt en pool_hash
+  (HASH_MAX_WORKERS hilos).
+
+Mientras tanto, una corrutina "latido" duerme 10 ms en bucle y registra su
+mayor retraso: es el tiempo que cualquier otra petición habría esperado.
+Reporta tiempo total, latencia por login (p50/p95) y el mayor bloqueo del
+loop. No usa base de datos.
+
+Uso:
+    python medir_login.py
+    python medir_login.py --concurrentes 50 --costo 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from base_medicion import RAIZ_BACKEND  # noqa: F401  (agrega backend/ al path)
+
+INTERVALO_LATIDO = 0.01
+
+
+async def latido(detener, retrasos):
+    """Registrar cuánto se atrasa un sleep de INTERVALO_LATIDO"""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(INTERVALO_LATIDO)
+        retrasos.append(time.perf_counter() - inicio - INTERVALO_LATIDO)
+
+
+async def login_anterior(clave, hash_clave):
+    from app.core.security import verify_password
+
+    verify_password(clave, hash_clave)
+    return time.perf_counter()
+
+
+async def login_actual(clave, hash_clave):
+    from app.core.security import verificar_clave
+
+    await verificar_clave(clave, hash_clave)
+    return time.perf_counter()
+
+
+async def medir_concurrencia(login, concurrentes, clave, hash_clave):
+    detener = asyncio.Event()
+    retrasos = []
+    tarea_latido = asyncio.create_task(latido(detener, retrasos))
+    await asyncio.sleep(INTERVALO_LATIDO * 2)
+
+    # Todas las peticiones llegan juntas: la latencia se mide desde `inicio`
+    inicio = time.perf_counter()
+    finales = await asyncio.gather(
+        *[login(clave, hash_clave) for _ in range(concurrentes)]
+    )
+    total = time.perf_counter() - inicio
+
+    detener.set()
+    await tarea_latido
+    latencias = sorted(fin - inicio for fin in finales)
+    return {
+        "total": total,
+        "p50": statistics.median(latencias),
+        "p95": latencias[min(int(len(latencias) * 0.95), len(latencias) - 1)],
+        "bloqueo": max(retrasos, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medición de logins concurrentes")
+    parser.add_argument("--concurrentes", type=int, default=20)
+    parser.add_argument(
+        "--costo", type=int, help="Costo bcrypt (por defecto BCRYPT_ROUNDS)"
+    )
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.core.security import pool_hash, pwd_context
+
+    contexto = pwd_context
+    if args.costo:
+        contexto = pwd_context.copy(
+            bcrypt__default_rounds=args.costo,
+            bcrypt__min_rounds=args.costo,
+            bcrypt__max_rounds=args.costo,
+        )
+        import app.core.security as security
+
+        security.pwd_context = contexto
+
+    clave = "clave-de-medicion"
+    hash_clave = contexto.hash(clave)
+    costo = args.costo or settings.BCRYPT_ROUNDS
+    print(
+        f"\n🔐 {args.concurrentes} logins simultáneos, bcrypt costo {costo}, "
+        f"HASH_MAX_WORKERS={settings.HASH_MAX_WORKERS}"
+    )
+
+    print("=" * 72)
+    print(
+        f"{'Implementación':<16} {'total s':>9} {'p50 ms':>10} {'p95 ms':>10} "
+        f"{'bloqueo loop ms':>17}"
+    )
+    print("-" * 72)
+    for nombre, login in (("anterior", login_anterior), ("actual", login_actual)):
+        r = asyncio.run(medir_concurrencia(login, args.concurrentes, clave, hash_clave))
+        print(
+            f"{nombre:<16} {r['total']:>9.2f} {r['p50'] * 1000:>10.0f} "
+            f"{r['p95'] * 1000:>10.0f} {r['bloqueo'] * 1000:>17.0f}"
+        )
+    print("=" * 72)
+    pool_hash.shutdown()
+
+
+if __name__ == "__main__":
+    main()
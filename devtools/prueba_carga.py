@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba de Carga de Endpoints del Backend VNM
+============================================
+
+Lanza N clientes concurrentes contra una o más rutas de la API durante un
+tiempo fijo y reporta peticiones por segundo y latencias (p50/p95/p99).
+Permite comparar, por ejemplo, los endpoints de monitoreo (sesión asíncrona)
+con un endpoint que aún usa la sesión síncrona.
+
+Uso:
+    python prueba_carga.py --token <JWT>
+    python prueba_carga.py --token <JWT> --clientes 50 --segundos 30 \\
+        --ruta /api/v1/monitoreo/interfaces/ --ruta /api/v1/usuarios/
+
+Sólo usa la biblioteca estándar (un hilo por cliente).
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+RUTAS_POR_DEFECTO = [
+    "/api/v1/monitoreo/interfaces/?limit=50",
+    "/api/v1/monitoreo/interfaces/metricas",
+    "/api/v1/monitoreo/dispositivos/?limit=50",
+    "/api/v1/monitoreo/dispositivos/estadisticas",
+]
+
+
+def cliente(url, token, fin, latencias, errores, lock):
+    """Ejecutar peticiones secuenciales hasta el instante `fin`"""
+    encabezados = {"Authorization": f"Bearer {token}"} if token else {}
+    while time.monotonic() < fin:
+        inicio = time.monotonic()
+        try:
+            peticion = urllib.request.Request(url, headers=encabezados)
+            with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+                respuesta.read()
+            with lock:
+                latencias.append(time.monotonic() - inicio)
+        except (urllib.error.URLError, OSError):
+            with lock:
+                errores[0] += 1
+
+
+def medir_ruta(base, ruta, token, clientes, segundos):
+    """Carga sostenida sobre una ruta; devuelve el resumen de la medición"""
+    latencias = []
+    errores = [0]
+    lock = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        for _ in range(clientes):
+            pool.submit(cliente, base + ruta, token, fin, latencias, errores, lock)
+
+    latencias.sort()
+
+    def percentil(p):
+        if not latencias:
+            return 0.0
+        return latencias[min(int(len(latencias) * p), len(latencias) - 1)] * 1000
+
+    return {
+        "ruta": ruta,
+        "peticiones": len(latencias),
+        "errores": errores[0],
+        "rps": len(latencias) / segundos,
+        "p50": percentil(0.50),
+        "p95": percentil(0.95),
+        "p99": percentil(0.99),
+        "media": statistics.mean(latencias) * 1000 if latencias else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del backend VNM")
+    parser.add_argument("--base", default="http://localhost:8000")
+    parser.add_argument("--token", help="JWT obtenido de /api/v1/auth/login")
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--segundos", type=int, default=20)
+    parser.add_argument("--ruta", action="append", dest="rutas")
+    args = parser.parse_args()
+
+    rutas = args.rutas or RUTAS_POR_DEFECTO
+
+    print(f"\n🚀 {args.clientes} clientes concurrentes, {args.segundos}s por ruta")
+    print("=" * 96)
+    print(
+        f"{'Ruta':<48} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errores':>8}"
+    )
+    print("-" * 96)
+
+    for ruta in rutas:
+        r = medir_ruta(args.base, ruta, args.token, args.clientes, args.segundos)
+        print(
+            f"{r['ruta']:<48} {r['rps']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+            f"{r['p99']:>8.1f} {r['errores']:>8}"
+        )
+
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# tests/conftest.py
+"""
+Configuración común de las pruebas del backend VNM
+
+Las pruebas importan `app` desde backend/ y corren sobre SQLite en memoria
+con los esquemas `monitoreo` y `seguridad` adjuntos; cada prueba usa una
+transacción que se revierte al terminar.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ_BACKEND = Path(__file__).resolve().parent.parent / "backend"
+if str(RAIZ_BACKEND) not in sys.path:
+    sys.path.insert(0, str(RAIZ_BACKEND))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.dialects.postgresql import INET  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+
+@compiles(INET, "sqlite")
+def _inet_sqlite(tipo, compilador, **kw):
+    return "TEXT"
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.models import Base
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _adjuntar_esquemas(conexion_dbapi, registro):
+        conexion_dbapi.execute("ATTACH ':memory:' AS monitoreo")
+        conexion_dbapi.execute("ATTACH ':memory:' AS seguridad")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Sesión cuyos commit() confirman sólo un SAVEPOINT de la prueba"""
+    conexion = engine.connect()
+    transaccion = conexion.begin()
+    sesion = Session(bind=conexion, join_transaction_mode="create_savepoint")
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+        transaccion.rollback()
+        conexion.close()
@@ -0,0 +1,131 @@
+# tests/test_auditoria.py
+"""ColaEscritura: reintentos con espera, escritura registro por registro y logs"""
+
+import logging
+
+import pytest
+from app.core import auditoria
+from app.core.auditoria import ColaEscritura
+
+
+class EscritorFalla:
+    """Rechaza todo lote que contenga un registro marcado como inválido"""
+
+    def __init__(self):
+        self.escritos = []
+        self.llamadas = 0
+
+    def __call__(self, lote):
+        self.llamadas += 1
+        if any(registro.get("invalido") for registro in lote):
+            raise ValueError(f"registro inválido: {lote}")
+        self.escritos.extend(lote)
+
+
+def _registro(usuario_id, invalido=False):
+    return {
+        "usuario_id": usuario_id,
+        "email": f"usuario{usuario_id}@ejemplo.cl",
+        "invalido": invalido,
+    }
+
+
+class Reloj:
+    """Reemplaza time.monotonic y la espera del hilo; registra las pausas"""
+
+    def __init__(self):
+        self.ahora = 1000.0
+        self.pausas = []
+
+    def monotonic(self):
+        return self.ahora
+
+    def is_set(self):
+        return False
+
+    def wait(self, segundos):
+        self.pausas.append(segundos)
+        self.ahora += segundos
+        return False
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(auditoria.time, "monotonic", reloj.monotonic)
+    return reloj
+
+
+def _cola(escritor, reloj, **opciones):
+    cola = ColaEscritura("prueba", escritor, **opciones)
+    cola._parar = reloj
+    return cola
+
+
+@pytest.mark.unit
+def test_caida_breve_reintenta_el_lote_completo(reloj):
+    escritor = EscritorFalla()
+    caidas = iter([ConnectionError] * 3)
+
+    def escribir(lote):
+        error = next(caidas, None)
+        if error:
+            raise error("base no disponible")
+        escritor(lote)
+
+    cola = _cola(escribir, reloj)
+    cola._escribir([_registro(1), _registro(2)])
+
+    assert reloj.pausas == [0.5, 1.0, 2.0]
+    assert cola.lotes == 1
+    assert cola.escritos == 2
+    assert cola.perdidos == 0
+
+
+@pytest.mark.unit
+def test_espera_acotada_por_pausa_maxima(reloj):
+    cola = _cola(EscritorFalla(), reloj, plazo_segundos=60, pausa_maxima=4)
+
+    cola._escribir([_registro(1, invalido=True)])
+
+    assert reloj.pausas == [0.5, 1.0, 2.0] + [4.0] * 14
+    # 3.5 + 14 * 4 = 59.5: otra pausa de 4 vencería el plazo
+    assert sum(reloj.pausas) <= 60 < sum(reloj.pausas) + 4
+    assert cola.perdidos == 1
+
+
+@pytest.mark.unit
+def test_vencido_el_plazo_se_escribe_registro_por_registro(reloj, caplog):
+    escritor = EscritorFalla()
+    cola = _cola(
+        escritor,
+        reloj,
+        plazo_segundos=10,
+        identificar=lambda registro: registro["usuario_id"],
+    )
+    lote = [_registro(1), _registro(2, invalido=True), _registro(3)]
+
+    with caplog.at_level(logging.ERROR, logger=auditoria.__name__):
+        cola._escribir(lote)
+
+    # 0.5 + 1 + 2 + 4 = 7.5; la siguiente espera (8) vencería el plazo
+    assert reloj.pausas == [0.5, 1.0, 2.0, 4.0]
+    assert [r["usuario_id"] for r in escritor.escritos] == [1, 3]
+    assert cola.escritos == 2
+    assert cola.perdidos == 1
+    assert "[2]" in caplog.text
+    assert "@ejemplo.cl" not in caplog.text
+
+
+@pytest.mark.unit
+def test_escritura_directa_no_pausa(reloj):
+    escritor = EscritorFalla()
+    cola = _cola(escritor, reloj)
+
+    cola.encolar(_registro(1, invalido=True))
+    cola.encolar(_registro(2))
+
+    assert reloj.pausas == []
+    assert cola.directos == 2
+    assert cola.perdidos == 1
+    assert [r["usuario_id"] for r in escritor.escritos] == [2]
@@ -0,0 +1,120 @@
+# tests/test_dispositivos_detalle.py
+"""DispositivosService.get_detalle frente a un recuento en Python"""
+
+import random
+from decimal import Decimal
+
+import pytest
+from app.models import Dispositivos, Interfaces
+from app.services.dispositivos_service import DispositivosService
+
+DEVID_SIN_INTERFACES = 99
+
+
+@pytest.fixture
+def interfaces_sembradas(db):
+    """Tres dispositivos con interfaces al azar y uno sin interfaces"""
+    azar = random.Random(3)
+    por_dispositivo = {}
+    for devid in (1, 2, 3, DEVID_SIN_INTERFACES):
+        db.add(Dispositivos(devid=devid, devname=f"equipo-{devid}"))
+        por_dispositivo[devid] = []
+    db.flush()
+
+    for devid in (1, 2, 3):
+        for devif in range(1, azar.randint(20, 60)):
+            interface = Interfaces(
+                devid=devid,
+                devif=devif,
+                ifname=f"Gi0/{devif}",
+                ifstatus=azar.choice([None, 1, 1, 2, 3]),
+                ifgraficar=azar.choice([0, 1]),
+                ifinerr=azar.choice([0, 0, 4]),
+                ifouterr=azar.choice([0, 0, 1]),
+                ifutil=azar.choice([None, Decimal(f"{azar.uniform(0, 100):.2f}")]),
+            )
+            db.add(interface)
+            por_dispositivo[devid].append(interface)
+    db.flush()
+    return por_dispositivo
+
+
+def _recuento(interfaces):
+    monitoreadas = [i for i in interfaces if i.ifgraficar == 1]
+    utilizaciones = [i.ifutil for i in monitoreadas if i.ifutil is not None]
+    return {
+        "interfaces_count": len(interfaces),
+        "interfaces_activas": sum(i.ifstatus == 1 for i in interfaces),
+        "interfaces_down": sum(i.ifstatus == 2 for i in interfaces),
+        "interfaces_shutdown": sum(i.ifstatus == 3 for i in interfaces),
+        "interfaces_monitoreadas": len(monitoreadas),
+        "interfaces_con_errores": sum(
+            i.ifinerr > 0 or i.ifouterr > 0 for i in interfaces
+        ),
+        "utilizacion_maxima": max(utilizaciones, default=None),
+        "utilizacion_promedio": (
+            sum(utilizaciones) / len(utilizaciones) if utilizaciones else None
+        ),
+        "top": sorted(utilizaciones, reverse=True)[:5],
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("devid", [1, 2, 3])
+def test_conteos_coinciden_con_recuento(db, interfaces_sembradas, devid):
+    esperado = _recuento(interfaces_sembradas[devid])
+
+    detalle = DispositivosService.get_detalle(db, devid, top_n=5)
+
+    assert detalle["dispositivo"].devid == devid
+    for campo in (
+        "interfaces_count",
+        "interfaces_activas",
+        "interfaces_down",
+        "interfaces_shutdown",
+        "interfaces_monitoreadas",
+        "interfaces_con_errores",
+    ):
+        assert detalle[campo] == esperado[campo], campo
+    assert Decimal(str(detalle["utilizacion_maxima"])) == esperado["utilizacion_maxima"]
+    assert float(detalle["utilizacion_promedio"]) == pytest.approx(
+        float(esperado["utilizacion_promedio"]), abs=0.005
+    )
+    assert [i.ifutil for i in detalle["top_utilizadas"]] == esperado["top"]
+    assert {i.devid for i in detalle["top_utilizadas"]} <= {devid}
+
+
+@pytest.mark.unit
+def test_dispositivo_sin_interfaces(db, interfaces_sembradas):
+    detalle = DispositivosService.get_detalle(db, DEVID_SIN_INTERFACES)
+
+    assert detalle["interfaces_count"] == 0
+    assert detalle["interfaces_activas"] == 0
+    assert detalle["utilizacion_maxima"] is None
+    assert detalle["top_utilizadas"] == []
+
+
+@pytest.mark.unit
+def test_devid_inexistente_devuelve_none(db, interfaces_sembradas):
+    assert DispositivosService.get_detalle(db, 12345) is None
+
+
+@pytest.mark.unit
+def test_listado_min_interfaces_down_cero_incluye_sin_resumen(db, interfaces_sembradas):
+    from app.schemas.dispositivos import DispositivosFiltros
+
+    filas, _, _ = DispositivosService.get_with_interfaces_count(
+        db,
+        skip=0,
+        limit=10,
+        filtros=DispositivosFiltros(devstatus=None, min_interfaces_down=0),
+    )
+
+    # Ningún dispositivo tiene aún fila en dispositivo_resumen_interfaces
+    assert {fila["dispositivo"].devid for fila in filas} == {
+        1,
+        2,
+        3,
+        DEVID_SIN_INTERFACES,
+    }
+    assert all(fila["interfaces_down"] == 0 for fila in filas)
@@ -0,0 +1,87 @@
+# tests/test_eventos.py
+"""Difusor de eventos del stream y eventos de interfaces de la ingesta"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from app.core.eventos import Difusor
+from app.services.stream_service import StreamService
+
+AHORA = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _evento(devid, zona="NORTE"):
+    return {"tipo": "interface", "devid": devid, "zona": zona}
+
+
+@pytest.mark.unit
+def test_publicar_reparte_en_tandas_cediendo_el_loop():
+    async def escenario():
+        difusor = Difusor("prueba", maximo_cola=5000, tamano_tanda=100)
+        suscripcion = difusor.suscribir(zona="norte")
+        intercalados = []
+
+        async def otra_peticion():
+            while difusor.publicados < 1000:
+                intercalados.append(difusor.publicados)
+                await asyncio.sleep(0)
+
+        tarea = asyncio.create_task(otra_peticion())
+        difusor.publicar([_evento(n) for n in range(1000)] + [_evento(0, "SUR")])
+        await asyncio.sleep(0.1)
+        await tarea
+        return difusor, suscripcion, intercalados
+
+    difusor, suscripcion, intercalados = asyncio.run(escenario())
+
+    assert difusor.publicados == 1001
+    assert suscripcion.cola.qsize() == 1000
+    assert [suscripcion.cola.get_nowait().devid for _ in range(3)] == [0, 1, 2]
+    # La otra corrutina corrió entre tandas, no sólo antes y después
+    assert len({n for n in intercalados if 0 < n < 1000}) >= 5
+
+
+@pytest.mark.unit
+def test_cancelar_libera_la_suscripcion():
+    async def escenario():
+        difusor = Difusor("prueba", maximo_suscriptores=1)
+        suscripcion = difusor.suscribir()
+        with pytest.raises(RuntimeError):
+            difusor.suscribir()
+        difusor.cancelar(suscripcion)
+        difusor.cancelar(suscripcion)
+        return difusor.suscribir()
+
+    assert asyncio.run(escenario()) is not None
+
+
+def _fila(insertada, iflc=AHORA, ifstatus=2):
+    return SimpleNamespace(
+        id=1,
+        devid=10,
+        devif=3,
+        ifname="Gi0/3",
+        ifstatus=ifstatus,
+        iflc=iflc,
+        time=AHORA,
+        insertada=insertada,
+    )
+
+
+@pytest.mark.unit
+def test_eventos_interfaces_omite_insertadas_y_sin_cambio():
+    ubicaciones = {10: SimpleNamespace(zona="NORTE", area="A1")}
+    filas = [
+        _fila(insertada=False),
+        _fila(insertada=True),
+        _fila(insertada=False, iflc=datetime(2025, 1, 1, tzinfo=timezone.utc)),
+        _fila(insertada=False, ifstatus=None),
+    ]
+
+    eventos = StreamService.eventos_interfaces(filas, ubicaciones)
+
+    assert len(eventos) == 1
+    assert eventos[0]["ifstatus"] == 2
+    assert eventos[0]["zona"] == "NORTE"
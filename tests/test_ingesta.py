@@ -0,0 +1,92 @@
+# tests/test_ingesta.py
+"""Validación de muestras y manejo de lotes rechazados en IngestaService"""
+
+import json
+from decimal import Decimal
+
+import pytest
+from app.models import Dispositivos
+from app.services.ingesta_service import IngestaService
+from sqlalchemy.exc import IntegrityError
+
+
+def _muestra(**campos):
+    return {"devid": 1, "devif": 1, "time": "2026-01-01T00:00:00Z", **campos}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "campos",
+    [
+        {"ifutil": "NaN"},
+        {"ifutil": "Infinity"},
+        {"ifutil": -0.5},
+        {"ifutil": 100.01},
+        {"ifutil": "1e3"},
+        {"ifstatus": 0},
+        {"ifstatus": 4},
+        {"ifspeed": 2**31},
+        {"ifspeed": 1.5},
+        {"time": 1e20},
+        {"time": "99999999999999999"},
+        {"ifinerr": -(2**31) - 1},
+        {"ifouterr": float("inf")},
+        {"devif": 2**31},
+        {"input": 2**63},
+    ],
+)
+def test_normalizar_rechaza_valores_fuera_de_rango(campos):
+    with pytest.raises(ValueError):
+        IngestaService._normalizar(_muestra(**campos))
+
+
+@pytest.mark.unit
+def test_normalizar_acepta_limites_y_redondea_utilizacion():
+    muestra = IngestaService._normalizar(
+        _muestra(
+            ifutil="99.999",
+            ifstatus=3,
+            ifspeed=2**31 - 1,
+            input=2**40,
+        )
+    )
+
+    assert muestra["ifutil"] == Decimal("100.00")
+    assert muestra["ifstatus"] == 3
+    assert muestra["ifspeed"] == 2**31 - 1
+    assert muestra["input"] == 2**40
+    assert muestra["ifoper"] is None
+
+
+@pytest.mark.unit
+def test_ingerir_cuenta_lineas_invalidas_como_rechazadas(db):
+    lineas = [
+        json.dumps(_muestra(ifutil="NaN")),
+        json.dumps(_muestra(ifstatus=9)),
+        "no es json",
+    ]
+
+    resultado = IngestaService.ingerir(db, lineas)
+
+    assert resultado["rechazadas"] == 3
+    assert resultado["filas"] == 0
+    assert len(resultado["errores"]) == 3
+
+
+@pytest.mark.unit
+def test_error_de_la_base_rechaza_el_lote_sin_interrumpir(db, monkeypatch):
+    db.add(Dispositivos(devid=1, devname="equipo-1"))
+    db.commit()
+
+    def _violacion(db, muestras):
+        raise IntegrityError("INSERT ...", {}, Exception("viola la llave foránea"))
+
+    monkeypatch.setattr(IngestaService, "_upsert_interfaces", _violacion)
+    lineas = [json.dumps(_muestra(devif=devif)) for devif in range(1, 6)]
+
+    resultado = IngestaService.ingerir(db, lineas, tamano_lote=2)
+
+    assert resultado["lotes_fallidos"] == 3
+    assert resultado["rechazadas"] == 5
+    assert resultado["lotes"] == 0
+    assert "viola la llave foránea" in resultado["errores"][0]